@@ -0,0 +1,164 @@
+"""Columnar history archive, partitioned by month and card.
+
+The saved history is mirrored into a hive-partitioned Parquet dataset
+(``month=2025-01/card=Chase%20...%20(...1234)/data.parquet``) so a filtered
+view reads only what it needs: the date range and card selection prune whole
+partitions, and the category selection is pushed down to row groups
+(partition files are sorted by category, so their statistics are tight).
+Loading one month of one card costs the same no matter how many years are
+stored.
+
+A small ``_catalog.json`` next to the partitions holds the date range,
+cards and categories for the filter widgets, the store revision the archive
+mirrors and the rules version its categories were computed with.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from categorizer import categorize_transactions
+
+DEFAULT_ARCHIVE_DIR = Path(os.environ.get("BUDGET_TRACKER_ARCHIVE", Path.home() / ".budget_tracker" / "archive"))
+
+ROW_GROUP_ROWS = 16_384
+COLUMNS = ['Date', 'Description', 'Amount', 'Card', 'Card_Last4', 'Category', 'Fingerprint']
+
+_PARTITION_FILE = "data.parquet"
+_CATALOG_FILE = "_catalog.json"
+_SCHEMA = pa.schema([("Date", pa.timestamp("ns")), ("Description", pa.string()), ("Amount", pa.float64()),
+                     ("Card_Last4", pa.string()), ("Category", pa.string()), ("Fingerprint", pa.int64())])
+_PARTITIONING = ds.partitioning(pa.schema([("month", pa.string()), ("card", pa.string())]), flavor="hive")
+
+
+class HistoryArchive:
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        self.root = Path(root)
+        self.catalog = self._read_catalog()
+
+    def _read_catalog(self):
+        try:
+            with open(self.root / _CATALOG_FILE) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"store_revision": None, "rules_version": None, "start": None, "end": None,
+                    "cards": [], "categories": []}
+
+    def _write_catalog(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f".{_CATALOG_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.catalog, f)
+        os.replace(tmp_path, self.root / _CATALOG_FILE)
+
+    def _partition_path(self, month, card):
+        return self.root / f"month={month}" / f"card={quote(card, safe='')}" / _PARTITION_FILE
+
+    def _partition_files(self):
+        return sorted(self.root.glob(f"month=*/card=*/{_PARTITION_FILE}"))
+
+    @staticmethod
+    def _write_partition(path, frame):
+        # Category-major order gives each row group a narrow category range to prune on
+        frame = frame.sort_values(['Category', 'Date'], kind='stable')
+        table = pa.Table.from_pandas(frame[_SCHEMA.names], schema=_SCHEMA, preserve_index=False)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_ROWS, compression="zstd")
+        os.replace(tmp_path, path)
+
+    def append(self, df, store_revision=None, rules_version=None):
+        """Merge rows (deduplicated by ``Fingerprint``) into their month/card partitions.
+
+        Only the partitions the rows fall into are rewritten.
+        """
+        df = df[COLUMNS]
+        months = df['Date'].dt.strftime('%Y-%m')
+        for (month, card), rows in df.groupby([months, df['Card']], sort=False):
+            path = self._partition_path(month, card)
+            if path.exists():
+                rows = pd.concat([pd.read_parquet(path), rows.drop(columns='Card')], ignore_index=True)
+            self._write_partition(path, rows.drop_duplicates('Fingerprint'))
+
+        catalog = self.catalog
+        if len(df):
+            start, end = df['Date'].min().date().isoformat(), df['Date'].max().date().isoformat()
+            catalog['start'] = min(filter(None, [catalog['start'], start]))
+            catalog['end'] = max(filter(None, [catalog['end'], end]))
+            catalog['cards'] = sorted(set(catalog['cards']) | set(df['Card'].unique()))
+            catalog['categories'] = sorted(set(catalog['categories']) | set(df['Category'].unique()))
+        if store_revision is not None:
+            catalog['store_revision'] = store_revision
+        if rules_version is not None:
+            catalog['rules_version'] = rules_version
+        self._write_catalog()
+
+    def rebuild(self, df, store_revision=None, rules_version=None):
+        """Replace the whole archive with ``df``."""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.catalog = self._read_catalog()
+        self.append(df, store_revision, rules_version)
+
+    def restamp(self, rules, memo=None):
+        """Recategorize stored rows under ``rules`` so category pushdown stays exact.
+
+        Reads only the Description and Category columns to find partitions
+        whose categories changed, and rewrites just those.
+        """
+        if self.catalog['rules_version'] == rules.version:
+            return 0
+        categories = set()
+        rewritten = 0
+        for path in self._partition_files():
+            stored = pq.read_table(path, columns=['Description', 'Category']).to_pandas()
+            recategorized = stored.assign(Amount=0.0)
+            categorize_transactions(recategorized, memo, rules)
+            if not recategorized['Category'].equals(stored['Category']):
+                frame = pd.read_parquet(path)
+                categorize_transactions(frame, memo, rules)
+                self._write_partition(path, frame)
+                rewritten += 1
+            categories.update(recategorized['Category'].unique())
+        self.catalog['categories'] = sorted(categories)
+        self.catalog['rules_version'] = rules.version
+        self._write_catalog()
+        return rewritten
+
+    def labels(self):
+        """Description and Category of every stored row (e.g. to train the learned categorizer)."""
+        frames = [pq.read_table(path, columns=['Description', 'Category']).to_pandas()
+                  for path in self._partition_files()]
+        if not frames:
+            return pd.DataFrame({'Description': pd.Series(dtype=object), 'Category': pd.Series(dtype=object)})
+        return pd.concat(frames, ignore_index=True)
+
+    def load(self, start=None, end=None, categories=None, cards=None):
+        """Rows within [start, end] (dates) of the given categories and cards, sorted by date.
+
+        ``None`` means no restriction for that field.
+        """
+        if not self._partition_files():
+            return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in
+                                 zip(COLUMNS, ['datetime64[ns]', object, float, object, object, object, 'int64'])})
+        dataset = ds.dataset(self.root, format="parquet", partitioning=_PARTITIONING)
+        predicate = ds.scalar(True)
+        if start is not None:
+            start = pd.Timestamp(start)
+            predicate &= (ds.field('month') >= start.strftime('%Y-%m')) & (ds.field('Date') >= start)
+        if end is not None:
+            end = pd.Timestamp(end)
+            predicate &= (ds.field('month') <= end.strftime('%Y-%m')) & (ds.field('Date') <= end)
+        # Typed value sets, so an empty selection matches nothing instead of failing to bind
+        if cards is not None:
+            predicate &= ds.field('card').isin(pa.array(list(cards), type=pa.string()))
+        if categories is not None:
+            predicate &= ds.field('Category').isin(pa.array(list(categories), type=pa.string()))
+        table = dataset.to_table(columns=_SCHEMA.names + ['card'], filter=predicate)
+        df = table.to_pandas().rename(columns={'card': 'Card'})
+        return df[COLUMNS].sort_values('Date', kind='stable').reset_index(drop=True)
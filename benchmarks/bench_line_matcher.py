@@ -0,0 +1,131 @@
+"""Micro-benchmark for the transaction line matcher.
+
+Compares the precompiled, prefiltered matcher in statement_parser against the
+previous approach (every pattern tried on every line via uncompiled
+``re.match``), checks that both pick the same pattern for every line, and
+reports lines/sec.
+
+    python benchmarks/bench_line_matcher.py                  # synthetic corpus
+    python benchmarks/bench_line_matcher.py statements/*.pdf # lines from real PDFs
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from statement_parser import match_statement_year, match_transaction_line  # noqa: E402
+
+MERCHANTS = ["AMAZON MKTPL*AB12CD", "STARBUCKS STORE 1234", "SHELL OIL 57444", "KROGER #442",
+             "NETFLIX.COM", "UBER *TRIP", "THE HOME DEPOT #0931", "CVS/PHARMACY #0211",
+             "PAYPAL *WALMART COM WAL", "HOBBY-LOBBY #0231 CUMMING GA"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def _amount(rng):
+    return f"{rng.uniform(1, 2500):,.2f}"
+
+
+def synthetic_lines(count, seed=7):
+    rng = random.Random(seed)
+    makers = [
+        lambda: f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d} {rng.choice(MERCHANTS)} {rng.uniform(1, 900):.2f}",
+        lambda: f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d} {rng.choice(MERCHANTS)} 888-221-1161 Supermarkets ${_amount(rng)}",
+        lambda: f"{rng.randint(1, 12)}/{rng.randint(1, 28)} 70556 STORE 0678 CUMMING GA ${_amount(rng)}",
+        lambda: f"OCT{rng.randint(1, 28):02d} POS {rng.choice(MERCHANTS)} 251002 -{_amount(rng)} 9,278.35",
+        lambda: f"{rng.choice(MONTHS)} {rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.randint(1, 28)} {rng.choice(MERCHANTS)} {rng.randint(1, 9)} ${_amount(rng)}",
+        lambda: f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/25 {rng.choice(MERCHANTS)} G.CO/HELPPAY# CA ${_amount(rng)}",
+        lambda: f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2025 {rng.choice(MERCHANTS)} 96014 CA USA 3% $1.35 ${_amount(rng)}",
+        # Non-transaction lines: headers, totals, detail and boilerplate text
+        lambda: "-, - COLLATED 23G, 18G BRADS",
+        lambda: f"Total Transactions for This Period ${_amount(rng)}",
+        lambda: f"Statement Period Sep 10, 2025 - Oct {rng.randint(1, 28)}, 2025",
+        lambda: "Please see reverse side for important information about your account",
+        lambda: f"Interest Charge on Purchases ${_amount(rng)}",
+    ]
+    return [rng.choice(makers)() for _ in range(count)]
+
+
+def pdf_lines(paths):
+    import pdfplumber
+    lines = []
+    for path in paths:
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                lines.extend((page.extract_text() or "").split("\n"))
+    return lines
+
+
+def legacy_match(line):
+    # The matcher as it was: ten uncompiled patterns tried on every line
+    match_sync = re.match(r'^(\d{1,2}/\d{1,2})\s+(\d+\s+)?(.+?)\s+(\-?\$[\d,]+\.\d{2})\s*$', line.strip())
+    match_dcu = re.match(r'^([A-Z]{3})(\d{2})\s+(.+?)\s+([-]?[\d,]+\.\d{2})\s+([\d,]+\.\d{2})\s*$', line.strip())
+    match_barclays = re.match(r'^([A-Z][a-z]{2})\s+(\d{1,2})\s+([A-Z][a-z]{2})\s+(\d{1,2})\s+(.+?)\s+(\d+\s+)?(\-?\$[\d,]+\.\d{2})\s*$', line.strip())
+    match_cap1 = re.match(r'^([A-Z][a-z]{2})\s+(\d{1,2})\s+([A-Z][a-z]{2})\s+(\d{1,2})\s+(.+?)\s+(\-?\$[\d,]+\.\d{2})\s*$', line.strip())
+    match_amex = re.match(r'^(\d{2}/\d{2}/\d{2})\s+(.+?)\s+(\-?\$?[\d,]+\.\d{2})$', line.strip())
+    match_chase = re.match(r'^(\d{1,2}/\d{1,2})\s+(.+?)\s+([-]?\d+\.\d{2})$', line.strip())
+    match_apple = re.match(r'^(\d{2}/\d{2}/\d{4})\s+(.+?)\s+(\d+%)\s+\$?([\d.]+)\s+([-]?\$?[\d,]+\.\d{2})$', line.strip())
+    match_apple_payment = re.match(r'^(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([-]?\$?[\d,]+\.\d{2})$', line.strip())
+    match_discover = re.match(r'^(\d{2}/\d{2})\s+(.+?)\s+([-]?\$?[\d,]+\.\d{2})$', line.strip())
+    for name, match in (('sync', match_sync), ('dcu', match_dcu), ('barclays', match_barclays),
+                        ('cap1', match_cap1), ('amex', match_amex),
+                        ('chase', match_chase and not match_discover), ('discover', match_discover),
+                        ('apple', match_apple), ('apple_payment', match_apple_payment)):
+        if match:
+            return name
+    return None
+
+
+def legacy_year(line):
+    year = None
+    year_match = re.search(r'(December|November|October|September|August|July|June|May|April|March|February|January)\s+(\d{4})', line)
+    if year_match:
+        year = year_match.group(2)
+    cap1_year_match = re.search(r'(\w{3})\s+\d{1,2},\s+(\d{4})\s*-\s*\w{3}\s+\d{1,2},\s+(\d{4})', line)
+    if cap1_year_match:
+        year = cap1_year_match.group(3)
+    apple_date_match = re.search(r'(\w{3})\s+\d{1,2}\s*—\s*\w{3}\s+\d{1,2},\s*(\d{4})', line)
+    if apple_date_match:
+        year = apple_date_match.group(2)
+    return year
+
+
+def timed(label, func, lines):
+    start = time.perf_counter()
+    results = [func(line) for line in lines]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s  {len(lines) / elapsed:>12,.0f} lines/sec")
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", help="statement PDFs to take lines from (default: synthetic corpus)")
+    parser.add_argument("--lines", type=int, default=1_000_000, help="corpus size (default: 1,000,000)")
+    args = parser.parse_args()
+
+    if args.pdfs:
+        base = [line for line in pdf_lines(args.pdfs) if line.strip()]
+        lines = (base * (args.lines // len(base) + 1))[:args.lines]
+    else:
+        lines = synthetic_lines(args.lines)
+    print(f"Corpus: {len(lines):,} lines")
+
+    legacy, legacy_time = timed("legacy transaction match", legacy_match, lines)
+    current, current_time = timed("compiled + prefiltered", lambda line: match_transaction_line(line.strip())[0], lines)
+    match_mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+    print(f"  speedup {legacy_time / current_time:.1f}x, {match_mismatches} mismatches")
+
+    legacy, legacy_time = timed("legacy year detection", legacy_year, lines)
+    current, current_time = timed("gated year detection", match_statement_year, lines)
+    year_mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+    print(f"  speedup {legacy_time / current_time:.1f}x, {year_mismatches} mismatches")
+
+    return 1 if match_mismatches or year_mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
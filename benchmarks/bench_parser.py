@@ -0,0 +1,157 @@
+"""Parser benchmark suite over a synthetic per-issuer statement corpus.
+
+Two stages are measured for every supported issuer layout:
+
+* ``text``: page text to transactions (line classification, state machine
+  and frame build), i.e. everything after pdfplumber.
+* ``pdf``:  the full ``extract_transactions_from_pdf`` on generated PDFs.
+
+Each reports lines/sec, pages/sec and peak Python heap, and checks the row
+count against what the generator put in. Throughput can be saved as a
+baseline and later checked against it::
+
+    python benchmarks/bench_parser.py --save-baseline
+    python benchmarks/bench_parser.py --check            # exit 1 on regression
+    python benchmarks/bench_parser.py --text-pages 2500  # ~1M lines per issuer set
+
+Baselines are machine specific, so ``baseline.json`` is not committed; save
+one on the machine that runs --check.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from statement_parser import build_transactions_frame, extract_transactions_from_pdf, iter_statement_rows, new_card_info  # noqa: E402
+from synthetic_statements import LAYOUTS, generate_statement, write_pdf  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def parse_text(page_texts):
+    rows = [row for page_rows in iter_statement_rows(page_texts, new_card_info()) for row in page_rows]
+    return len(build_transactions_frame(rows))
+
+
+def parse_pdf(pdf_bytes):
+    df, _ = extract_transactions_from_pdf(io.BytesIO(pdf_bytes))
+    return 0 if df is None else len(df)
+
+
+def measure(run, inputs, repeat):
+    """Best-of-``repeat`` wall time, then one traced pass for peak memory."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = [run(item) for item in inputs]
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    for item in inputs:
+        run(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, rows
+
+
+def run_stage(name, statements, make_input, run, repeat):
+    inputs = [make_input(statement) for statement in statements]
+    results = {}
+    print(f"\n[{name}]")
+    print(f"{'issuer':<12} {'pages':>6} {'lines':>9} {'rows':>8} {'lines/s':>11} {'pages/s':>9} {'peak MB':>8}")
+    total_lines = total_pages = total_time = 0
+    peak_max = 0
+    failures = []
+    for statement, item in zip(statements, inputs):
+        elapsed, peak, (rows,) = measure(run, [item], repeat)
+        pages, lines = len(statement.pages), statement.line_count
+        print(f"{statement.issuer:<12} {pages:>6} {lines:>9} {rows:>8} {lines / elapsed:>11,.0f} "
+              f"{pages / elapsed:>9,.1f} {peak / 1e6:>8.1f}")
+        if rows != statement.expected_rows:
+            failures.append(f"{name}/{statement.issuer}: {rows} rows, expected {statement.expected_rows}")
+        total_lines += lines
+        total_pages += pages
+        total_time += elapsed
+        peak_max = max(peak_max, peak)
+    results = {
+        "lines_per_sec": total_lines / total_time,
+        "pages_per_sec": total_pages / total_time,
+        "peak_mb": peak_max / 1e6,
+    }
+    print(f"{'total':<12} {total_pages:>6} {total_lines:>9} {'':>8} {results['lines_per_sec']:>11,.0f} "
+          f"{results['pages_per_sec']:>9,.1f} {results['peak_mb']:>8.1f}")
+    return results, failures
+
+
+def check_baseline(results, baseline, tolerance):
+    regressions = []
+    for stage, metrics in baseline.get("stages", {}).items():
+        if stage not in results:
+            continue
+        for metric in ("lines_per_sec", "pages_per_sec"):
+            floor = metrics[metric] * (1 - tolerance)
+            if results[stage][metric] < floor:
+                regressions.append(f"{stage} {metric}: {results[stage][metric]:,.1f} < {floor:,.1f} "
+                                   f"(baseline {metrics[metric]:,.1f} - {tolerance:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--issuers", nargs="+", choices=sorted(LAYOUTS), default=list(LAYOUTS))
+    parser.add_argument("--text-pages", type=int, default=200, help="pages per statement for the text stage")
+    parser.add_argument("--pdf-pages", type=int, default=5, help="pages per statement for the pdf stage (0 skips it)")
+    parser.add_argument("--lines-per-page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per statement, best is kept")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run's throughput as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if throughput fell below the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown for --check (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    failures = []
+    text_statements = [generate_statement(issuer, args.text_pages, args.lines_per_page) for issuer in args.issuers]
+    results["text"], stage_failures = run_stage("text", text_statements, lambda s: s.page_texts(), parse_text, args.repeat)
+    failures += stage_failures
+    del text_statements
+
+    if args.pdf_pages > 0:
+        pdf_statements = [generate_statement(issuer, args.pdf_pages, args.lines_per_page) for issuer in args.issuers]
+        results["pdf"], stage_failures = run_stage("pdf", pdf_statements, lambda s: write_pdf(s.pages), parse_pdf, args.repeat)
+        failures += stage_failures
+
+    for failure in failures:
+        print(f"WRONG ROW COUNT {failure}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"stages": results, "params": {k: v for k, v in vars(args).items()
+                                                     if k in ("issuers", "text_pages", "pdf_pages", "lines_per_page")}},
+                      f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline saved to {args.baseline}")
+
+    regressions = []
+    if args.check:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        regressions = check_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if not regressions:
+            print(f"\nNo regressions against {args.baseline}")
+
+    return 1 if failures or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Synthetic statements in each supported issuer's layout.
+
+Pages are generated as plain text lines (for benchmarking the text parsing
+stage on its own) and can be written out as real PDFs with ``write_pdf``,
+a tiny standard-font PDF writer, so no PDF library is needed. Every
+statement knows how many transactions the parser should find in it.
+"""
+import random
+from dataclasses import dataclass
+
+MERCHANTS = ["AMAZON MKTPL*AB12CD", "STARBUCKS STORE 1234", "SHELL OIL 57444", "KROGER 442",
+             "NETFLIX.COM", "UBER *TRIP", "THE HOME DEPOT 0931", "CVS PHARMACY 0211",
+             "PAYPAL *WALMART COM", "TRADER JOE S 552", "DELTA AIR LINES", "COSTCO GAS 0042"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+BOILERPLATE = "Please see reverse side for important information about your account"
+
+
+@dataclass
+class SyntheticStatement:
+    issuer: str
+    pages: list  # list of pages, each a list of text lines
+    expected_rows: int
+
+    @property
+    def line_count(self):
+        return sum(len(page) for page in self.pages)
+
+    def page_texts(self):
+        return ["\n".join(page) for page in self.pages]
+
+
+def _amount(rng, commas=True):
+    if commas:
+        return f"{rng.uniform(1, 2500):,.2f}"
+    return f"{rng.uniform(1, 999):.2f}"
+
+
+def _mmdd(rng):
+    return f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+
+
+# Each layout: header lines (ending with the section marker), a function
+# returning the lines of one transaction, and footer lines closing the section
+LAYOUTS = {
+    'chase': (
+        ["Chase Prime Visa", "Account Number: XXXX XXXX XXXX 1234", "Opening/Closing Date 10/14/25 - 11/13/25",
+         "Payment Due Date: 12/10/25", "New Balance $994.09", "Minimum Payment Due: $40.00",
+         "Credit Access Line $10,000", "October 2025", "PURCHASE"],
+        lambda rng: [f"{_mmdd(rng)} {rng.choice(MERCHANTS)} {_amount(rng, commas=False)}"],
+        ["INTEREST CHARGES"],
+    ),
+    'apple': (
+        ["Apple Card", "Statement Oct 1 - Oct 31, 2025", "Your Balance Minimum Payment", "$1,234.56 $25.00",
+         "Payment Due By", "Nov 30, 2025", "Transactions by Jane"],
+        lambda rng: [f"{_mmdd(rng)}/2025 {rng.choice(MERCHANTS)} 96014 CA USA {rng.choice([1, 2, 3])}% "
+                     f"${rng.uniform(0.1, 9):.2f} ${_amount(rng)}"],
+        ["Total Daily Cash this month $12.34"],
+    ),
+    'discover': (
+        ["DISCOVER IT CARD ENDING IN 4321", "NewBalance MinimumPayment PaymentDueDate", "$516.16 $35.00 12/09/2025",
+         "CreditLine $5,000", "October 2025", "PURCHASES TRANS. DATE"],
+        lambda rng: [f"{_mmdd(rng)} {rng.choice(MERCHANTS)} 888-221-1161 Supermarkets ${_amount(rng)}"],
+        ["FeesandInterestCharged"],
+    ),
+    'amex': (
+        ["American Express Gold Card", "Account Ending5-05001", "Closing Date11/13/25", "Payment Due Date 12/08/25",
+         "New Balance $2,345.67", "Minimum Payment Due $40.00", "New Charges"],
+        lambda rng: [f"{_mmdd(rng)}/25 {rng.choice(MERCHANTS)} G.CO/HELPPAY# CA ${_amount(rng)}"],
+        ["Fees"],
+    ),
+    'capital_one': (
+        ["Capital One Quicksilver", "Visa Signature ending in 6165", "Sep 10, 2025 - Oct 10, 2025",
+         "Payment Due Date: Nov 04, 2025", "New Balance $1,100.00", "Minimum Payment Due $35.00",
+         "Credit Limit $9,000 Available Credit $8,882", "Trans Date Post Date Description Amount"],
+        lambda rng: [f"{rng.choice(MONTHS)} {rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.randint(1, 28)} "
+                     f"{rng.choice(MERCHANTS)} ${_amount(rng)}"],
+        ["Total Transactions for This Period $9,999.00"],
+    ),
+    'barclays': (
+        ["Barclays JetBlue Card", "Account Ending5459", "10/16/25 - 11/15/25", "Payment Due Date: 12/12/25",
+         "Statement Balance: $4.27", "Minimum Payment: $1.00", "Credit Line $5,000",
+         "Transaction Date Posting Date Description Miles Amount"],
+        lambda rng: [f"Nov {rng.randint(1, 28)} Nov {rng.randint(1, 28)} {rng.choice(MERCHANTS)} "
+                     f"{rng.randint(1, 99)} ${_amount(rng)}"],
+        ["Total Fees Charged This Period $0.00"],
+    ),
+    'dcu': (
+        ["Digital Federal Credit Union FREE CHECKING", "ACCT# 98765", "STATEMENT PERIOD 10-01-25 to 10-31-25",
+         "October 2025", "DATE TRANSACTION DESCRIPTION WITHDRAWALS DEPOSITS BALANCE"],
+        lambda rng: [f"{rng.choice(MONTHS).upper()}{rng.randint(1, 28):02d} POS {rng.choice(MERCHANTS)} 251002 "
+                     f"-{_amount(rng)} 9,278.35"],
+        ["DEPOSITS, DIVIDENDS AND OTHER CREDITS"],
+    ),
+    'synchrony': (
+        ["Lowe's Synchrony Bank lowes.com", "Account Number ending in 698 0", "New Balance: $150.00",
+         "Payment Due Date: 12/01/2025", "Minimum Payment: $29.00", "Credit Limit $3,000", "as of 11/12/2025",
+         "November 2025", "Transaction Detail"],
+        # Purchases carry a product detail line, which may land on the next page
+        lambda rng: [f"{_mmdd(rng)} 70556 STORE 0678 {rng.choice(MERCHANTS)} ${_amount(rng)}",
+                     "-, - COLLATED 23G, 18G BRADS"],
+        ["Total Fees Charged This Period $0.00"],
+    ),
+    'bofa': (
+        ["Bank of America Customized Cash Rewards Visa Signature", "Account Number: XXXX XXXX XXXX 4455",
+         "Payment Due Date 11/25/25", "New Balance Total $1,234.56", "Total Minimum Payment Due $35.00",
+         "October 2025", "Transactions"],
+        lambda rng: [f"{_mmdd(rng)} {_mmdd(rng)} {rng.choice(MERCHANTS)} {_amount(rng, commas=False)}"],
+        ["INTEREST CHARGES"],
+    ),
+}
+
+
+def generate_statement(issuer, pages, lines_per_page=50, seed=0):
+    """Build a ``pages``-page statement in ``issuer``'s layout."""
+    header, make_row, footer = LAYOUTS[issuer]
+    rng = random.Random(f"{issuer}-{seed}")
+    body_lines = pages * lines_per_page - len(header) - len(footer) - 1
+
+    lines = list(header)
+    expected_rows = 0
+    while len(lines) - len(header) < body_lines:
+        lines.extend(make_row(rng))
+        expected_rows += 1
+    lines.extend(footer)
+    lines.append(BOILERPLATE)
+
+    page_list = [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)]
+    return SyntheticStatement(issuer, page_list, expected_rows)
+
+
+def _pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def write_pdf(pages, font_size=9):
+    """Render pages of text lines as a minimal PDF and return its bytes."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for page in pages:
+        leading = min(12, 740 / max(len(page), 1))
+        ops = [f"BT /F1 {font_size} Tf {leading:.2f} TL 40 770 Td"]
+        ops.extend(f"{_pdf_string(line)} Tj T*" for line in page)
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>".encode())
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_start = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_start)
+    return bytes(out)
@@ -1,11 +1,25 @@
 
 import streamlit as st
 import pandas as pd
-import pdfplumber
+import numpy as np
+import os
+from functools import partial
 import plotly.express as px
 import plotly.graph_objects as go
-import re
 from datetime import datetime, timedelta
+from parse_cache import ParseCache
+from statement_parser import PARSER_VERSION, parse_pdf_bytes
+from ingest import consolidate_statements, ingest_statements
+from categorizer import categorize_transactions, current_rules
+from classifier import CategoryClassifier, classify_uncategorized
+from descriptions import DescriptionMemo, contains_any, map_unique
+from merchants import MerchantTable, merchant_ids
+from store import TransactionStore
+from archive import HistoryArchive
+from duplicates import find_fuzzy_duplicates
+from aggregates import DAY_ORDER, SpendingCube
+from result_cache import ResultCache, data_digest, filter_state
+from filter_index import FilterIndex
 
 st.set_page_config(page_title="Budget Tracker", layout="wide", initial_sidebar_state="expanded")
 
@@ -33,956 +47,208 @@ hr { margin: 2rem 0; border-color: #E2E8F0; }
 st.title("💳 Credit Card & Budget Tracker")
 st.title("� Credit Card & Budget Tracker")
 
-# Function to extract card info and transactions from PDF
-def extract_transactions_from_pdf(pdf_file):
-    transactions = []
-    raw_text = ""
-    in_transaction_section = False
-    current_year = None
-    pending_sync_transaction = None  # Track last Synchrony transaction for multi-line descriptions
-    card_info = {
-        'card_name': 'Unknown Card',
-        'last_4_digits': '****',
-        'statement_date': None,
-        'due_date': None,
-        'new_balance': 0.0,
-        'minimum_payment': 0.0,
-        'credit_limit': 0.0,
-        'available_credit': 0.0
+# Parsed statements are cached on disk, keyed by PDF content + parser version
+@st.cache_resource
+def get_parse_cache():
+    return ParseCache(PARSER_VERSION)
+
+# Categories (and other per-description results) are remembered across sessions
+@st.cache_resource
+def get_description_memo():
+    return DescriptionMemo()
+
+# Canonical merchant IDs are persisted so they stay stable across sessions
+@st.cache_resource
+def get_merchant_table():
+    return MerchantTable()
+
+# Transaction history survives browser refreshes in a local SQLite file
+@st.cache_resource
+def get_transaction_store():
+    return TransactionStore()
+
+# ...and mirrored into a month/card-partitioned Parquet archive that filtered views read from
+@st.cache_resource
+def get_history_archive():
+    return HistoryArchive()
+
+def sync_history_archive(store):
+    archive = get_history_archive()
+    if archive.catalog['store_revision'] != store.revision:
+        # Stored categories may predate a rules edit; the memo makes recategorizing cheap
+        history = store.load()
+        categorize_transactions(history, memo=get_description_memo())
+        archive.rebuild(history, store.revision, category_rules.version)
+    archive.restamp(category_rules, get_description_memo())
+    return archive
+
+# Frames and metrics derived from the data are reused while the data version and filters stay the same
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+def train_history_model(archive, default_category):
+    """Category model trained on every rule-labeled row of the saved history, not just the loaded slice."""
+    labels = archive.labels()
+    labeled = labels[labels['Category'] != default_category]
+    return CategoryClassifier.train(labeled['Description'], labeled['Category'])
+
+def prepare_data(df, guess_categories, default_category, merged_duplicates, model=None):
+    """Learned categories, merchant IDs and merged-duplicate removal for freshly loaded rows."""
+    guessed = classify_uncategorized(df, default=default_category, model=model) if guess_categories else 0
+    # Group merchant charts on a small int ID instead of raw description strings
+    df["Merchant_ID"] = merchant_ids(df["Description"], get_merchant_table(), memo=get_description_memo())
+    if merged_duplicates and 'Fingerprint' in df.columns:
+        df = df[~df['Fingerprint'].isin(merged_duplicates)]
+    return df, guessed
+
+def expense_rows(df):
+    """Spending rows (payments excluded) with amounts as positive numbers."""
+    expenses_df = df[(df["Amount"] < 0) & (df["Category"] != "Income/Payments")].copy()
+    expenses_df["Amount"] = abs(expenses_df["Amount"])
+    return expenses_df
+
+def overview_metrics(cube):
+    """The Financial Overview numbers; payment/credit transactions are left out."""
+    non_payment = cube.totals(payments=False)
+    metrics = {
+        'payment_count': int(cube.totals()["Count"] - non_payment["Count"]),
+        'total_income': non_payment["Received"],
+        'total_expenses': non_payment["Spent"],
+        'transaction_count': int(non_payment["Count"]),
+        'avg_daily_spending': 0,
+        'largest_expense': 0,
+        'days_in_period': 0,
+        'projected_monthly': 0,
     }
-    
-    with pdfplumber.open(pdf_file) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            text = page.extract_text()
-            if text:
-                raw_text += f"\n--- Page {page_num + 1} ---\n{text}\n"
-                lines = text.split("\n")
-                
-                # For Apple Card, look for the header structure and parse multiple lines together
-                for i, line in enumerate(lines):
-                    # Detect card type first - Chase
-                    if ("Prime Visa" in line or "PRIME VISA" in line) and card_info['card_name'] == 'Unknown Card':
-                        card_info['card_name'] = "Chase Prime Visa"
-                    elif ("Chase" in line and "Amazon" in line) and card_info['card_name'] == 'Unknown Card':
-                        card_info['card_name'] = "Chase Amazon Card"
-                    
-                    # Detect card type - Synchrony Bank (Store Cards)
-                    if card_info['card_name'] == 'Unknown Card':
-                        if "Synchrony Bank" in line or "SYNCHRONY BANK" in line or "synchrony" in line.lower():
-                            if "Lowe" in line or "LOWE" in line or "lowes.com" in line:
-                                card_info['card_name'] = "Lowe's Synchrony"
-                            elif "Amazon" in line:
-                                card_info['card_name'] = "Amazon Store Card"
-                            elif "PayPal" in line:
-                                card_info['card_name'] = "PayPal Credit"
-                            else:
-                                card_info['card_name'] = "Synchrony Bank"
-                    
-                    # Detect card type - DCU (Digital Federal Credit Union)
-                    if card_info['card_name'] == 'Unknown Card':
-                        if "Digital Federal Credit Union" in line or "DCU" in line:
-                            if "FREE CHECKING" in line or "Free Checking" in line:
-                                card_info['card_name'] = "DCU Free Checking"
-                            elif "PRIMARY SAVINGS" in line or "Primary Savings" in line:
-                                card_info['card_name'] = "DCU Primary Savings"
-                            else:
-                                card_info['card_name'] = "DCU"
-                    
-                    # Detect card type - Barclays
-                    if card_info['card_name'] == 'Unknown Card':
-                        if "Barclays" in line or "BARCLAYS" in line or "barclays" in line.lower():
-                            if "Frontier Airlines" in line:
-                                card_info['card_name'] = "Barclays Frontier Airlines"
-                            elif "JetBlue" in line:
-                                card_info['card_name'] = "Barclays JetBlue"
-                            elif "Wyndham" in line:
-                                card_info['card_name'] = "Barclays Wyndham Rewards"
-                            elif "Aviator" in line:
-                                card_info['card_name'] = "Barclays Aviator"
-                            else:
-                                card_info['card_name'] = "Barclays"
-                    
-                    # Detect card type - Capital One
-                    if card_info['card_name'] == 'Unknown Card':
-                        if "Capital One" in line or "CAPITAL ONE" in line or "capitalone" in line.lower():
-                            if "VentureOne" in line or "Venture One" in line:
-                                card_info['card_name'] = "Capital One VentureOne"
-                            elif "Venture X" in line:
-                                card_info['card_name'] = "Capital One Venture X"
-                            elif "Venture" in line:
-                                card_info['card_name'] = "Capital One Venture"
-                            elif "Quicksilver" in line:
-                                card_info['card_name'] = "Capital One Quicksilver"
-                            elif "Savor" in line:
-                                card_info['card_name'] = "Capital One Savor"
-                            else:
-                                card_info['card_name'] = "Capital One"
-                    
-                    # Detect card type - American Express
-                    if card_info['card_name'] == 'Unknown Card':
-                        if "American Express" in line or "AMERICAN EXPRESS" in line:
-                            # Try to get specific card name
-                            if "Cash Magnet" in line:
-                                card_info['card_name'] = "American Express Cash Magnet"
-                            elif "Gold" in line:
-                                card_info['card_name'] = "American Express Gold"
-                            elif "Platinum" in line:
-                                card_info['card_name'] = "American Express Platinum"
-                            elif "Blue Cash" in line:
-                                card_info['card_name'] = "American Express Blue Cash"
-                            else:
-                                card_info['card_name'] = "American Express"
-                    
-                    # Detect card type - Bank of America
-                    if card_info['card_name'] == 'Unknown Card':
-                        if "Bank of America" in line or "BANK OF AMERICA" in line:
-                            card_info['card_name'] = "Bank of America"
-                        elif "BankofAmerica" in line or "BANKOFAMERICA" in line:
-                            card_info['card_name'] = "Bank of America"
-                        elif "Customized Cash Rewards" in line:
-                            card_info['card_name'] = "Bank of America Cash Rewards"
-                        elif "Premium Rewards" in line:
-                            card_info['card_name'] = "Bank of America Premium Rewards"
-                        elif "Travel Rewards" in line:
-                            card_info['card_name'] = "Bank of America Travel Rewards"
-                    
-                    # Detect card type - Apple Card
-                    if "Apple Card" in line and "Co-Owners" not in line and "Installments" not in line and card_info['card_name'] == 'Unknown Card':
-                        card_info['card_name'] = "Apple Card"
-                    
-                    # Detect card type - Discover
-                    if "DISCOVER" in line.upper() and "CARD ENDING IN" in line.upper() and card_info['card_name'] == 'Unknown Card':
-                        card_info['card_name'] = "Discover Card"
-                        card_match = re.search(r'ENDING IN\s*(\d{4})', line, re.IGNORECASE)
-                        if card_match:
-                            card_info['last_4_digits'] = card_match.group(1)
-                    
-                    # Extract card information - Chase format
-                    if "Account Number:" in line and "XXXX" in line:
-                        account_match = re.search(r'XXXX XXXX XXXX (\d{4})', line)
-                        if account_match:
-                            card_info['last_4_digits'] = account_match.group(1)
-                            if card_info['card_name'] == 'Unknown Card':
-                                card_info['card_name'] = "Chase Card"
-                    
-                    # Amex: Account Ending
-                    if "Account Ending" in line or "Card Ending" in line:
-                        # Format: "Account Ending5-05001" or "Card Ending5-05001"
-                        amex_match = re.search(r'Ending\s*(\d[-\d]+)', line)
-                        if amex_match and card_info['last_4_digits'] == '****':
-                            # Extract last 4 or 5 digits
-                            acct = amex_match.group(1).replace('-', '')
-                            card_info['last_4_digits'] = acct[-4:] if len(acct) >= 4 else acct
-                    
-                    # Capital One/Barclays: ending in XXXX or Ending5459
-                    if ("ending in" in line.lower() or "Ending" in line) and card_info['last_4_digits'] == '****':
-                        # Try "ending in 6165" format
-                        cap1_match = re.search(r'ending in\s*(\d{4})', line, re.IGNORECASE)
-                        if cap1_match:
-                            card_info['last_4_digits'] = cap1_match.group(1)
-                        else:
-                            # Try "Ending5459" format (no space)
-                            barclays_match = re.search(r'Ending\s*(\d{4})', line)
-                            if barclays_match:
-                                card_info['last_4_digits'] = barclays_match.group(1)
-                    
-                    # DCU: ACCT# X
-                    if "ACCT#" in line and card_info['last_4_digits'] == '****':
-                        dcu_match = re.search(r'ACCT#\s*(\d+)', line)
-                        if dcu_match:
-                            acct_num = dcu_match.group(1)
-                            card_info['last_4_digits'] = acct_num if len(acct_num) <= 4 else acct_num[-4:]
-                    
-                    # Synchrony: Account Number ending in XXX
-                    if "Account Number ending in" in line and card_info['last_4_digits'] == '****':
-                        # Pattern: "Account Number ending in 698 0" - may have space in the number
-                        sync_match = re.search(r'ending in\s*([\d\s]+)', line, re.IGNORECASE)
-                        if sync_match:
-                            acct_num = sync_match.group(1).replace(' ', '').strip()
-                            card_info['last_4_digits'] = acct_num if len(acct_num) <= 4 else acct_num[-4:]
-                    
-                    # Chase/Amex/Capital One/Barclays/Synchrony: Payment Due Date
-                    if ("Payment Due Date" in line or "Payment Due:" in line) and not card_info['due_date']:
-                        # Try various formats
-                        # Format 1: MM/DD/YYYY (Synchrony, some Discover) - check this FIRST
-                        due_match_yyyy = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', line)
-                        if due_match_yyyy:
-                            try:
-                                card_info['due_date'] = pd.to_datetime(due_match_yyyy.group(1), format='%m/%d/%Y')
-                            except:
-                                pass
-                        
-                        # Format 2: "Nov 04, 2025" (Capital One)
-                        if not card_info['due_date']:
-                            due_match_word = re.search(r'(\w{3}\s+\d{1,2},\s+\d{4})', line)
-                            if due_match_word:
-                                try:
-                                    card_info['due_date'] = pd.to_datetime(due_match_word.group(1), format='%b %d, %Y')
-                                except:
-                                    pass
-                        
-                        # Format 3: MM/DD/YY (2-digit year) - LAST resort
-                        if not card_info['due_date']:
-                            due_match_yy = re.search(r'(\d{1,2}/\d{1,2}/\d{2})(?!\d)', line)
-                            if due_match_yy:
-                                try:
-                                    card_info['due_date'] = pd.to_datetime(due_match_yy.group(1), format='%m/%d/%y')
-                                except:
-                                    pass
-                    
-                    # Legacy check for "due date" (lowercase) - for other formats
-                    if "due date" in line.lower() and "Payment Due Date" not in line and not card_info['due_date']:
-                        # Try MM/DD/YY format for legacy cards
-                        due_match = re.search(r'(\d{1,2}/\d{1,2}/\d{2})(?!\d)', line)
-                        if due_match:
-                            try:
-                                card_info['due_date'] = pd.to_datetime(due_match.group(1), format='%m/%d/%y')
-                            except:
-                                pass
-                    
-                    # DCU: NEW BALANCE (statement balance)
-                    if "NEW BALANCE" in line and "$" not in line and card_info['new_balance'] == 0.0:
-                        # Look for balance on same line or parse the number
-                        balance_match = re.search(r'([\d,]+\.\d{2})', line)
-                        if balance_match:
-                            card_info['new_balance'] = float(balance_match.group(1).replace(',', ''))
-                    
-                    # Synchrony: New Balance with colon
-                    if "New Balance:" in line and "$" in line and card_info['new_balance'] == 0.0:
-                        balance_match = re.search(r'\$[\d,]+\.\d{2}', line)
-                        if balance_match:
-                            card_info['new_balance'] = float(balance_match.group().replace('$', '').replace(',', ''))
-                    
-                    # Chase/Amex/Barclays: New Balance or Statement Balance
-                    if ("New Balance" in line or "Statement Balance" in line) and "$" in line:
-                        # Look for pattern like "New Balance $994.09" or "Statement Balance: $4.27"
-                        balance_match = re.search(r'\$[\d,]+\.\d{2}', line)
-                        if balance_match and card_info['new_balance'] == 0.0:
-                            # Make sure this isn't from a reward balance, miles, or "as of" date line
-                            if "Reward" not in line and "Point" not in line and "Mile" not in line and "as of" not in line.lower():
-                                card_info['new_balance'] = float(balance_match.group().replace('$', '').replace(',', ''))
-                    
-                    # Chase/BofA/Amex/Barclays/Synchrony: Minimum Payment Due
-                    if ("Minimum Payment Due" in line or "Minimum payment due" in line.lower() or "Minimum Payment:" in line or "Total Minimum Payment Due:" in line) and "$" in line:
-                        min_match = re.search(r'\$[\d,]+\.\d{2}', line)
-                        if min_match and card_info['minimum_payment'] == 0.0:
-                            card_info['minimum_payment'] = float(min_match.group().replace('$', '').replace(',', ''))
-                    
-                    # Alternative: "Minimum Payment" without "Due"
-                    if "Minimum Payment" in line and "Due:" not in line and "Warning" not in line and "$" in line and card_info['minimum_payment'] == 0.0:
-                        min_match = re.search(r'\$[\d,]+\.\d{2}', line)
-                        if min_match:
-                            card_info['minimum_payment'] = float(min_match.group().replace('$', '').replace(',', ''))
-                    
-                    # Chase: Credit Access Line
-                    if "Credit Access Line" in line and "Available" not in line:
-                        credit_match = re.search(r'\$[\d,]+', line)
-                        if credit_match and card_info['credit_limit'] == 0.0:
-                            card_info['credit_limit'] = float(credit_match.group().replace('$', '').replace(',', ''))
-                    
-                    # Amex/Capital One/Barclays/Synchrony: Credit Limit or Credit Line
-                    # Must check this BEFORE available credit to avoid confusion
-                    if "Credit Limit" in line and "$" in line and "Cash Advance" not in line:
-                        # Match the FIRST dollar amount (which is the Credit Limit, not Available Credit)
-                        # Pattern: "Credit Limit $9,000 Available Credit $8,882"
-                        credit_match = re.search(r'Credit Limit\s+\$?([\d,]+(?:\.\d{2})?)', line, re.IGNORECASE)
-                        if credit_match and card_info['credit_limit'] == 0.0:
-                            card_info['credit_limit'] = float(credit_match.group(1).replace(',', ''))
-                    elif "Credit Line" in line and "$" in line and "Available" not in line and "Cash Advance" not in line:
-                        # Try with decimals first
-                        credit_match = re.search(r'\$[\d,]+\.\d{2}', line)
-                        if not credit_match:
-                            # Try without decimals
-                            credit_match = re.search(r'\$[\d,]+', line)
-                        if credit_match and card_info['credit_limit'] == 0.0:
-                            card_info['credit_limit'] = float(credit_match.group().replace('$', '').replace(',', ''))
-                    
-                    # Chase: Opening/Closing Date
-                    if "Opening/Closing Date" in line:
-                        date_match = re.search(r'(\d{2}/\d{2}/\d{2})\s*-\s*(\d{2}/\d{2}/\d{2})', line)
-                        if date_match and not card_info['statement_date']:
-                            try:
-                                card_info['statement_date'] = pd.to_datetime(date_match.group(2), format='%m/%d/%y')
-                            except:
-                                pass
-                    
-                    # Amex: Closing Date
-                    if "Closing Date" in line and not card_info['statement_date']:
-                        # Format: "Closing Date11/13/25"
-                        date_match = re.search(r'(\d{2}/\d{2}/\d{2})', line)
-                        if date_match:
-                            try:
-                                card_info['statement_date'] = pd.to_datetime(date_match.group(1), format='%m/%d/%y')
-                            except:
-                                pass
-                    
-                    # Capital One/Barclays/DCU/Synchrony: Statement date range
-                    if not card_info['statement_date']:
-                        # Format: "Sep 10, 2025 - Oct 10, 2025"
-                        if re.search(r'\w{3}\s+\d{1,2},\s+\d{4}\s*-\s*\w{3}\s+\d{1,2},\s+\d{4}', line):
-                            date_match = re.search(r'-\s*(\w{3}\s+\d{1,2},\s+\d{4})', line)
-                            if date_match:
-                                try:
-                                    card_info['statement_date'] = pd.to_datetime(date_match.group(1), format='%b %d, %Y')
-                                except:
-                                    pass
-                        # Format: "10/16/25 - 11/15/25" (Barclays)
-                        elif re.search(r'\d{1,2}/\d{1,2}/\d{2}\s*-\s*\d{1,2}/\d{1,2}/\d{2}', line):
-                            date_match = re.search(r'-\s*(\d{1,2}/\d{1,2}/\d{2})', line)
-                            if date_match:
-                                try:
-                                    card_info['statement_date'] = pd.to_datetime(date_match.group(1), format='%m/%d/%y')
-                                except:
-                                    pass
-                        # Format: "10-01-25 to 10-31-25" (DCU)
-                        elif re.search(r'\d{1,2}-\d{1,2}-\d{2}\s+to\s+\d{1,2}-\d{1,2}-\d{2}', line):
-                            date_match = re.search(r'to\s+(\d{1,2}-\d{1,2}-\d{2})', line)
-                            if date_match:
-                                try:
-                                    card_info['statement_date'] = pd.to_datetime(date_match.group(1), format='%m-%d-%y')
-                                except:
-                                    pass
-                        # Format: "as of 11/12/2025" (Synchrony)
-                        elif "as of" in line.lower() and re.search(r'\d{1,2}/\d{1,2}/\d{4}', line):
-                            date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', line)
-                            if date_match:
-                                try:
-                                    card_info['statement_date'] = pd.to_datetime(date_match.group(1), format='%m/%d/%Y')
-                                except:
-                                    pass
-                    
-                    # Apple Card: Special handling for balance/payment header
-                    if "Your" in line and "Balance" in line and "Minimum Payment" in line:
-                        # Look for the line with dollar amounts within next few lines
-                        for j in range(i+1, min(i+5, len(lines))):
-                            next_line = lines[j]
-                            # Find line with dollar amounts
-                            amounts = re.findall(r'\$[\d,]+\.\d{2}', next_line)
-                            if len(amounts) >= 2:
-                                # First amount is balance, second is minimum payment
-                                try:
-                                    if card_info['new_balance'] == 0.0:
-                                        card_info['new_balance'] = float(amounts[0].replace('$', '').replace(',', ''))
-                                    if card_info['minimum_payment'] == 0.0:
-                                        card_info['minimum_payment'] = float(amounts[1].replace('$', '').replace(',', ''))
-                                except:
-                                    pass
-                    
-                    # Apple Card: Look for "Payment Due By" - this is the actual due date!
-                    # This should ALWAYS override any other date found (like "as of" dates)
-                    if "Due By" in line or ("Payment" in line and "Due" in line):
-                        # Look for date in this line or next few lines
-                        for j in range(i, min(i+3, len(lines))):
-                            check_line = lines[j]
-                            # Skip lines with "as of" - those are statement dates, not due dates
-                            if "as of" in check_line.lower():
-                                continue
-                            
-                            due_match = re.search(r'(\w{3}\s+\d{1,2},\s+\d{4})', check_line)
-                            if due_match:
-                                try:
-                                    parsed_date = pd.to_datetime(due_match.group(1), format='%b %d, %Y')
-                                    # Payment due dates should be in the future or very recent (within last 3 days)
-                                    today = pd.Timestamp.now().normalize()
-                                    if parsed_date >= today - pd.Timedelta(days=3):
-                                        # Unconditionally set - this is the actual due date
-                                        card_info['due_date'] = parsed_date
-                                        break
-                                except:
-                                    pass
-                    
-                    # Discover Card: Look for the payment information section
-                    # Pattern: "NewBalance MinimumPayment PaymentDueDate" on one line
-                    # followed by "$516.16 $35.00 12/09/2025" on another line
-                    if "NewBalance" in line and "MinimumPayment" in line and "PaymentDueDate" in line:
-                        # Look in the next few lines for the values
-                        for j in range(i+1, min(i+5, len(lines))):
-                            next_line = lines[j]
-                            # Look for pattern with 2 dollar amounts and a date
-                            amounts = re.findall(r'\$[\d,]+\.\d{2}', next_line)
-                            date_match = re.search(r'(\d{2}/\d{2}/\d{4})', next_line)
-                            
-                            if len(amounts) >= 2:
-                                try:
-                                    if card_info['new_balance'] == 0.0:
-                                        card_info['new_balance'] = float(amounts[0].replace('$', '').replace(',', ''))
-                                    if card_info['minimum_payment'] == 0.0:
-                                        card_info['minimum_payment'] = float(amounts[1].replace('$', '').replace(',', ''))
-                                except:
-                                    pass
-                            
-                            if date_match and not card_info['due_date']:
-                                try:
-                                    card_info['due_date'] = pd.to_datetime(date_match.group(1), format='%m/%d/%Y')
-                                except:
-                                    pass
-                    
-                    # Discover: CreditLine
-                    if "CreditLine" in line and "$" in line and "Available" not in line:
-                        credit_match = re.search(r'\$[\d,]+', line)
-                        if credit_match and card_info['credit_limit'] == 0.0:
-                            card_info['credit_limit'] = float(credit_match.group().replace('$', '').replace(',', ''))
-                    
-                    # Detect transaction sections
-                    if "PAYMENTS AND OTHER CREDITS" in line or "PURCHASE" in line or "CASH ADVANCES" in line:
-                        in_transaction_section = True
-                        continue
-                    
-                    if "PAYMENTSANDCREDITS" in line.replace(" ", ""):  # Discover format
-                        in_transaction_section = True
-                        continue
-                    
-                    if "PURCHASES" in line and "TRANS." in line:  # Discover format
-                        in_transaction_section = True
-                        continue
-                    
-                    if "Transactions by" in line:  # Apple Card format
-                        in_transaction_section = True
-                        continue
-                    
-                    if "Payments" in line and ("made by" in line or "Payments made by" in line):  # Apple Card payments
-                        in_transaction_section = True
-                        continue
-                    
-                    # Amex format - New Charges section
-                    if "New Charges" in line:
-                        in_transaction_section = True
-                        continue
-                    
-                    # Amex format - Payments and Credits section
-                    if "Payments and Credits" in line and "Summary" not in lines[i-1] if i > 0 else False:
-                        in_transaction_section = True
-                        continue
-                    
-                    # Capital One/Barclays/DCU/Synchrony format - Transactions section
-                    # Look for "Transactions" header or the column headers
-                    if ("Transactions" in line and "Total" not in line and "see" not in line.lower()) or ("Trans Date" in line and "Post Date" in line and "Description" in line) or ("Transaction Date" in line and "Posting Date" in line and "Description" in line) or ("DATE" in line and "TRANSACTION DESCRIPTION" in line and "WITHDRAWALS" in line and "DEPOSITS" in line) or ("Transaction Detail" in line) or ("Date" in line and "Reference Number" in line and "Description" in line and "Amount" in line):
-                        in_transaction_section = True
-                        continue
-                    
-                    # Stop at certain sections
-                    # Note: Don't stop at "Daily Cash" alone - it appears in Apple Card transaction columns
-                    if "2025 Totals Year-to-Date" in line or "INTEREST CHARGES" in line or "Apple Card Monthly Installments" in line or "Total Daily Cash this month" in line:
-                        in_transaction_section = False
-                        continue
-                    
-                    if "FeesandInterestCharged" in line or "Fees and Interest Charged" in line or "TOTALS YEAR-TO-DATE" in line:
-                        in_transaction_section = False
-                        continue
-                    
-                    # Amex: Stop at Fees section
-                    if line.strip() == "Fees" or line.strip() == "Interest Charged" or "Continued on reverse" in line:
-                        in_transaction_section = False
-                        continue
-                    
-                    # Capital One: Stop at summary sections
-                    if "Total Transactions for This Period" in line or "Total Fees for This Period" in line or "Total Interest for This Period" in line or "DEPOSITS, DIVIDENDS AND OTHER CREDITS" in line or "WITHDRAWALS, FEES AND OTHER DEBITS" in line or "S T A T E M E N T  S U M M A R Y" in line or "Total Fees Charged This Period" in line or "Total Interest Charged This Period" in line or "2025 Year- to- Date Fees and Interest" in line:
-                        in_transaction_section = False
-                        continue
-                    
-                    # Extract year from statement
-                    year_match = re.search(r'(December|November|October|September|August|July|June|May|April|March|February|January)\s+(\d{4})', line)
-                    if year_match:
-                        current_year = year_match.group(2)
-                    
-                    # Extract year from Capital One statement header
-                    cap1_year_match = re.search(r'(\w{3})\s+\d{1,2},\s+(\d{4})\s*-\s*\w{3}\s+\d{1,2},\s+(\d{4})', line)
-                    if cap1_year_match:
-                        current_year = cap1_year_match.group(3)  # Use the ending year
-                    
-                    # Extract year from Apple Card statement header
-                    apple_date_match = re.search(r'(\w{3})\s+\d{1,2}\s*—\s*\w{3}\s+\d{1,2},\s*(\d{4})', line)
-                    if apple_date_match:
-                        current_year = apple_date_match.group(2)
-                    
-                    if in_transaction_section:
-                        # Synchrony format: 10/28 70556 STORE 0678 CUMMING GA $19.98
-                        # Followed by product details on next line(s): "-, - COLLATED 23G, 18G BRADS..."
-                        # Date Reference# Description Amount
-                        match_sync = re.match(r'^(\d{1,2}/\d{1,2})\s+(\d+\s+)?(.+?)\s+(\-?\$[\d,]+\.\d{2})\s*$', line.strip())
-                        
-                        # Synchrony product detail line (starts with "-, -" or similar, or just product text without date/amount)
-                        # Check if line has no date pattern and no dollar amount (likely a continuation)
-                        is_potential_detail = not re.match(r'^\d{1,2}/\d{1,2}', line.strip()) and not re.search(r'\$[\d,]+\.\d{2}', line.strip())
-                        match_sync_detail = is_potential_detail and pending_sync_transaction is not None and len(line.strip()) > 3
-                        
-                        # DCU format: OCT02 EFT ACH AMEX EPAYMENT ACH PMT 251002 Raj DCU -402.53 9,278.35
-                        # DATE TRANSACTION DESCRIPTION WITHDRAWALS DEPOSITS BALANCE
-                        # Pattern: MMMDD Description [optional withdrawal] [optional deposit] Balance
-                        match_dcu = re.match(r'^([A-Z]{3})(\d{2})\s+(.+?)\s+([-]?[\d,]+\.\d{2})\s+([\d,]+\.\d{2})\s*$', line.strip())
-                        
-                        # Barclays format: Nov 10 Nov 12 HOBBY-LOBBY #0231 CUMMING GA 4 $4.27
-                        # Transaction Date Posting Date Description Miles Amount
-                        # Pattern: Month Day Month Day Description [optional miles/points] $Amount
-                        match_barclays = re.match(r'^([A-Z][a-z]{2})\s+(\d{1,2})\s+([A-Z][a-z]{2})\s+(\d{1,2})\s+(.+?)\s+(\d+\s+)?(\-?\$[\d,]+\.\d{2})\s*$', line.strip())
-                        
-                        # Capital One format: Oct 2 Oct 4 ETIHAD AIRWAYSMUMBAIMAH $925.81
-                        # Trans Date Post Date Description Amount
-                        # Pattern: Month Day Month Day Description $Amount
-                        match_cap1 = re.match(r'^([A-Z][a-z]{2})\s+(\d{1,2})\s+([A-Z][a-z]{2})\s+(\d{1,2})\s+(.+?)\s+(\-?\$[\d,]+\.\d{2})\s*$', line.strip())
-                        
-                        # Amex format: MM/DD/YY Description $Amount
-                        # Example: "10/28/25 GOOGLE *YOUTUBEPREMIUM G.CO/HELPPAY# CA $22.99"
-                        match_amex = re.match(r'^(\d{2}/\d{2}/\d{2})\s+(.+?)\s+(\-?\$?[\d,]+\.\d{2})$', line.strip())
-                        
-                        # Chase format: MM/DD Description Amount
-                        match_chase = re.match(r'^(\d{1,2}/\d{1,2})\s+(.+?)\s+([-]?\d+\.\d{2})$', line.strip())
-                        
-                        # Apple Card format: MM/DD/YYYY Description Daily Cash% $X.XX $Amount
-                        # Example: "10/05/2025 APPLE.COM/BILL ONE APPLE PARK WAY 866-712-7753 96014 CA USA 3% $1.35 $44.99"
-                        match_apple = re.match(r'^(\d{2}/\d{2}/\d{4})\s+(.+?)\s+(\d+%)\s+\$?([\d.]+)\s+([-]?\$?[\d,]+\.\d{2})$', line.strip())
-                        
-                        # Apple Card payment format: MM/DD/YYYY Description -$Amount or $Amount
-                        match_apple_payment = re.match(r'^(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([-]?\$?[\d,]+\.\d{2})$', line.strip())
-                        
-                        # Discover format: MM/DD Description Category/Location $Amount or -$Amount
-                        # Example: "10/13 PAYPAL *WALMART COM WAL 888-221-1161 Supermarkets $42.76"
-                        match_discover = re.match(r'^(\d{2}/\d{2})\s+(.+?)\s+([-]?\$?[\d,]+\.\d{2})$', line.strip())
-                        
-                        if match_sync:
-                            date_str = match_sync.group(1)  # 10/28
-                            # Group 2 is optional reference number
-                            description = match_sync.group(3).strip()
-                            amount_str = match_sync.group(4).replace('$', '').replace(',', '')
-                            
-                            try:
-                                # Use current year or statement year
-                                year = current_year if current_year else "2025"
-                                full_date_str = f"{date_str}/{year}"
-                                date = pd.to_datetime(full_date_str, format='%m/%d/%Y')
-                                
-                                # Synchrony shows purchases as positive, payments/credits as negative
-                                # Convert purchases to negative (expenses), keep payments positive
-                                amount = float(amount_str)
-                                if amount > 0 and "PAYMENT" not in description.upper() and "CREDIT" not in description.upper() and "THANK YOU" not in description.upper():
-                                    amount = -amount
-                                
-                                # Skip section headers and summary lines
-                                skip_keywords = ["Payments", "Other Credits", "Purchases and Other Debits", "Total", "Invoice Number"]
-                                if not any(keyword in description for keyword in skip_keywords):
-                                    # Clean up description - keep meaningful parts
-                                    description = re.sub(r'STORE\s+\d+\s+', '', description)  # Remove "STORE 0678 "
-                                    description = re.sub(r'\s+[A-Z]{2}$', '', description)  # Remove state codes at end
-                                    
-                                    # Store this transaction temporarily to potentially add product details
-                                    pending_sync_transaction = [date, description.strip(), amount]
-                                    transactions.append(pending_sync_transaction)
-                            except Exception as e:
-                                pending_sync_transaction = None
-                                continue
-                        
-                        elif match_sync_detail:
-                            # This is a product detail line for the previous Synchrony transaction
-                            # Append to the description of the last transaction
-                            detail = line.strip()
-                            # Remove common prefixes like "-, -" or "-,-"
-                            detail = re.sub(r'^[-,\s]+', '', detail)
-                            if detail and len(detail) > 3:  # Only add meaningful details
-                                # Update the description in the last added transaction
-                                pending_sync_transaction[1] += " - " + detail
-                            continue
-                        
-                        elif not match_sync_detail and pending_sync_transaction:
-                            # No longer in detail lines, clear pending transaction
-                            pending_sync_transaction = None
-                        
-                        elif match_dcu:
-                            pending_sync_transaction = None  # Clear pending Synchrony transaction
-                            month_abbr = match_dcu.group(1)  # OCT
-                            day = match_dcu.group(2)         # 02
-                            description = match_dcu.group(3).strip()
-                            amount_or_withdrawal = match_dcu.group(4)  # Could be withdrawal or deposit
-                            balance = match_dcu.group(5)
-                            
-                            try:
-                                # Convert month abbreviation to number
-                                month_map = {'JAN': '01', 'FEB': '02', 'MAR': '03', 'APR': '04', 'MAY': '05', 'JUN': '06',
-                                           'JUL': '07', 'AUG': '08', 'SEP': '09', 'OCT': '10', 'NOV': '11', 'DEC': '12'}
-                                month_num = month_map.get(month_abbr, '01')
-                                
-                                # Use current year or statement year
-                                year = current_year if current_year else "2025"
-                                date_str = f"{month_num}/{day}/{year}"
-                                date = pd.to_datetime(date_str, format='%m/%d/%Y')
-                                
-                                # Parse amount - negative means withdrawal (expense), positive means deposit (income)
-                                amount = float(amount_or_withdrawal.replace(',', ''))
-                                
-                                # Skip certain transactions
-                                skip_keywords = ["PREVIOUS BALANCE", "NEW BALANCE", "DIVIDEND", "ANNUAL PERCENTAGE"]
-                                if not any(keyword in description.upper() for keyword in skip_keywords):
-                                    # Clean up description
-                                    description = re.sub(r'\s+\d{6}\s+', ' ', description)  # Remove date stamps like 251002
-                                    transactions.append([date, description.strip(), amount])
-                            except Exception as e:
-                                continue
-                        
-                        elif match_barclays:
-                            pending_sync_transaction = None  # Clear pending Synchrony transaction
-                            trans_month = match_barclays.group(1)  # Nov
-                            trans_day = match_barclays.group(2)    # 10
-                            post_month = match_barclays.group(3)   # Nov
-                            post_day = match_barclays.group(4)     # 12
-                            description = match_barclays.group(5).strip()
-                            # Group 6 is optional miles/points, group 7 is amount
-                            amount_str = match_barclays.group(7).replace('$', '').replace(',', '')
-                            
-                            try:
-                                # Use transaction date for the record
-                                year = current_year if current_year else "2025"
-                                trans_date_str = f"{trans_month} {trans_day} {year}"
-                                date = pd.to_datetime(trans_date_str, format='%b %d %Y')
-                                
-                                # Barclays shows purchases as positive, payments as negative
-                                # Convert purchases to negative (expenses)
-                                amount = float(amount_str)
-                                if amount > 0 and "PAYMENT" not in description.upper() and "CREDIT" not in description.upper():
-                                    amount = -amount
-                                
-                                # Skip summary lines and headers
-                                skip_keywords = ["Total", "card ending", "for this period", "No Payment", "No fees", "No interest"]
-                                if not any(keyword in description for keyword in skip_keywords):
-                                    # Clean up description - remove location codes
-                                    description = re.sub(r'\s+\d{3}-\d{3}-\d{4}', '', description)
-                                    description = re.sub(r'\s+[A-Z]{2}\s+USA$', '', description)
-                                    transactions.append([date, description.strip(), amount])
-                            except Exception as e:
-                                continue
-                        
-                        elif match_cap1:
-                            trans_month = match_cap1.group(1)  # Oct
-                            trans_day = match_cap1.group(2)    # 2
-                            post_month = match_cap1.group(3)   # Oct
-                            post_day = match_cap1.group(4)     # 4
-                            description = match_cap1.group(5).strip()
-                            amount_str = match_cap1.group(6).replace('$', '').replace(',', '')
-                            
-                            try:
-                                # Use transaction date for the record
-                                year = current_year if current_year else "2025"
-                                trans_date_str = f"{trans_month} {trans_day} {year}"
-                                date = pd.to_datetime(trans_date_str, format='%b %d %Y')
-                                
-                                # Capital One shows purchases as positive, payments as negative
-                                # Convert purchases to negative (expenses)
-                                amount = float(amount_str)
-                                if amount > 0 and "PAYMENT" not in description.upper() and "CREDIT" not in description.upper():
-                                    amount = -amount
-                                
-                                # Skip lines with card holder names, totals, exchange rates, and currency codes
-                                skip_keywords = ["#", "Total", "Exchange Rate", "INR", "USD", "EUR", "GBP", "CAD", "AUD", "JPY"]
-                                if not any(keyword in description for keyword in skip_keywords):
-                                    # Clean up description - remove location codes and phone numbers
-                                    description = re.sub(r'\s+\d{3}-\d{3}-\d{4}', '', description)
-                                    description = re.sub(r'\s+[A-Z]{2}\s+USA$', '', description)
-                                    transactions.append([date, description.strip(), amount])
-                            except Exception as e:
-                                continue
-                        
-                        elif match_amex:
-                            date_str = match_amex.group(1)
-                            description = match_amex.group(2).strip()
-                            amount_str = match_amex.group(3).replace('$', '').replace(',', '')
-                            
-                            try:
-                                date = pd.to_datetime(date_str, format='%m/%d/%y')
-                                
-                                # Amex shows purchases as positive, payments as negative
-                                # Convert purchases to negative (expenses)
-                                amount = float(amount_str)
-                                if amount > 0:
-                                    amount = -amount
-                                
-                                # Skip summary lines and section headers
-                                if "Total" not in description and "Summary" not in description and "Detail" not in description and "Card Ending" not in description:
-                                    # Clean up description
-                                    description = re.sub(r'\s+\d{3}-\d{3}-\d{4}', '', description)
-                                    description = re.sub(r'\s+\d{5,}', '', description)
-                                    transactions.append([date, description.strip(), amount])
-                            except Exception as e:
-                                continue
-                        
-                        elif match_chase and not match_discover:
-                            date_str = match_chase.group(1)
-                            description = match_chase.group(2).strip()
-                            amount_str = match_chase.group(3)
-                            
-                            try:
-                                year = current_year if current_year else "2025"
-                                full_date_str = f"{date_str}/{year}"
-                                date = pd.to_datetime(full_date_str, format='%m/%d/%Y')
-                                amount = float(amount_str)
-                                
-                                if "Order Number" not in description:
-                                    transactions.append([date, description, amount])
-                            except Exception as e:
-                                continue
-                        
-                        elif match_discover:
-                            date_str = match_discover.group(1)
-                            description = match_discover.group(2).strip()
-                            amount_str = match_discover.group(3).replace('$', '').replace(',', '')
-                            
-                            try:
-                                year = current_year if current_year else "2025"
-                                full_date_str = f"{date_str}/{year}"
-                                date = pd.to_datetime(full_date_str, format='%m/%d/%Y')
-                                
-                                # Discover shows payments as negative, purchases as positive
-                                # We want expenses as negative, so negate if positive
-                                amount = float(amount_str)
-                                if amount > 0 and "PAYMENT" not in description.upper() and "THANK YOU" not in description.upper():
-                                    amount = -amount  # Convert purchases to negative
-                                
-                                # Clean up description - remove phone numbers and extra location codes
-                                description = re.sub(r'\s+\d{3}-\d{3}-\d{4}', '', description)
-                                description = re.sub(r'\s+\d{5,}', '', description)
-                                description = re.sub(r'\s+(CA|NY|TX|FL|GA|IL|PA|OH|NC|MI|NJ|VA|WA|AZ|MA|TN|IN|MO|MD|WI|CO|MN|SC|AL|LA|KY|OR|OK|CT|UT|IA|NV|AR|MS|KS|NM|NE|WV|ID|HI|NH|ME|MT|RI|DE|SD|ND|AK|VT|WY)\s*$', '', description)
-                                
-                                transactions.append([date, description.strip(), amount])
-                            except Exception as e:
-                                continue
-                        
-                        elif match_apple:
-                            date_str = match_apple.group(1)
-                            description = match_apple.group(2).strip()
-                            daily_cash_percent = match_apple.group(3)  # e.g., "3%"
-                            daily_cash_amount = match_apple.group(4)   # e.g., "1.35"
-                            amount_str = match_apple.group(5).replace('$', '').replace(',', '')
-                            
-                            try:
-                                date = pd.to_datetime(date_str, format='%m/%d/%Y')
-                                # Apple Card shows charges as positive, so make them negative for consistency
-                                amount = -abs(float(amount_str))
-                                
-                                # Clean up description - remove extra location info
-                                if description:
-                                    # Remove state/country codes and extra info
-                                    description = re.sub(r'\s+\d{5,}\s+[A-Z]{2}\s+USA$', '', description)
-                                    description = re.sub(r'\s+\d{3}-\d{3}-\d{4}', '', description)
-                                    transactions.append([date, description.strip(), amount])
-                            except Exception as e:
-                                continue
-                        
-                        elif match_apple_payment:
-                            date_str = match_apple_payment.group(1)
-                            description = match_apple_payment.group(2).strip()
-                            amount_str = match_apple_payment.group(3).replace('$', '').replace(',', '')
-                            
-                            try:
-                                date = pd.to_datetime(date_str, format='%m/%d/%Y')
-                                amount = float(amount_str)
-                                # Make payments positive if they're showing as negative
-                                if amount < 0:
-                                    amount = abs(amount)
-                                
-                                transactions.append([date, description, amount])
-                            except Exception as e:
-                                continue
-    
-    if not transactions:
-        st.warning("⚠️ No transactions found in the PDF. Showing raw text for debugging:")
-        with st.expander("View PDF Content"):
-            st.text_area("PDF Content", raw_text, height=300)
-        return None, card_info
-    
-    # If we have Apple Card but no last 4 digits extracted, use a placeholder
-    if card_info['card_name'] == "Apple Card" and card_info['last_4_digits'] == '****':
-        # Try to extract from email or use a generic identifier
-        card_info['last_4_digits'] = 'AAPL'
-    
-    df = pd.DataFrame(transactions, columns=["Date", "Description", "Amount"])
-    df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
-    df["Amount"] = pd.to_numeric(df["Amount"], errors='coerce')
-    df = df.dropna(subset=["Date", "Amount"])
-    df = df.sort_values('Date').reset_index(drop=True)
-    
-    return df, card_info
+    metrics['net_balance'] = metrics['total_income'] - metrics['total_expenses']
+    daily_spending = cube.daily_spending()
+    if not daily_spending.empty:
+        non_payment_dates = cube.rollup("Date", payments=False)["Date"]
+        days_in_period = (non_payment_dates.max() - non_payment_dates.min()).days + 1
+        metrics.update(
+            avg_daily_spending=daily_spending["Amount"].mean(),
+            largest_expense=non_payment["Largest"],
+            days_in_period=days_in_period,
+            projected_monthly=(metrics['total_expenses'] / days_in_period) * 30 if days_in_period > 0 else 0)
+    return metrics
+
+TABLE_SORTS = {
+    "Date (Newest)": ('Date', False),
+    "Date (Oldest)": ('Date', True),
+    "Amount (High to Low)": ('Amount', False),
+    "Amount (Low to High)": ('Amount', True),
+}
 
-# Categorization function
-def categorize(description):
-    description_lower = description.lower()
-    
-    # ========== PRIORITY 1: Income & Payments (CHECK FIRST) ==========
-    payment_keywords = [
-        "payment thank you", "online payment", "autopay", "automatic payment",
-        "payment received", "payment - thank you", "mobile payment",
-        "internet payment", "ach deposit", "internet transfer",
-        "payroll", "salary", "direct deposit",
-        "statement credit", "adjustment credit", "fee reversal", 
-        "interest refund", "balance transfer", "electronic payment"
-    ]
-    # Exclude: Regular PayPal purchases should not be treated as payments
-    if any(keyword in description_lower for keyword in payment_keywords):
-        # But check if it's a PayPal purchase (not a payment)
-        if "paypal" in description_lower and any(merchant in description_lower for merchant in ["walmart", "adobe", "ebay"]):
-            pass  # Continue to regular categorization
-        else:
-            return "Income/Payments"
-    
-    # ========== PRIORITY 2: Groceries & Food ==========
-    # Grocery Stores
-    grocery_stores = [
-        "walmart", "wm supercenter", "wal-mart", "target", "costco", "sam's club",
-        "kroger", "publix", "whole foods", "trader joe", "safeway", "albertsons",
-        "aldi", "lidl", "food lion", "giant", "stop & shop", "wegmans",
-        "indifresh", "suvidha", "patel brothers", "indian grocery"
-    ]
-    if any(store in description_lower for store in grocery_stores):
-        return "Groceries"
-    
-    # Restaurants & Dining
-    restaurants = [
-        "restaurant", "cafe", "coffee", "starbucks", "dunkin", "mcdonald",
-        "burger", "pizza", "domino", "papa john", "chipotle", "taco bell",
-        "subway", "panera", "chick-fil-a", "wendy", "kfc", "arby",
-        "zaxby", "desi street", "biryani", "chutney", "flippin pizza",
-        "steakhouse", "grill", "bakery", "bar", "pub", "tap room",
-        "applebee", "chili", "olive garden", "red lobster", "outback",
-        "kilwins", "confections", "indi fresh", "jerusalem bakery",
-        "barleygarden", "brew deck", "craft burger"
-    ]
-    if any(restaurant in description_lower for restaurant in restaurants):
-        return "Food & Dining"
-    
-    # ========== PRIORITY 3: Bills & Utilities ==========
-    utilities = [
-        "utility", "electric", "power", "water", "gas", "natgas", "sawnee",
-        "georgia power", "at&t", "verizon", "t-mobile", "comcast", "xfinity",
-        "internet", "cable", "phone", "wireless", "apple.com/bill",
-        "sanitation", "waste", "trash", "garbage", "sewage"
-    ]
-    if any(util in description_lower for util in utilities):
-        return "Bills & Utilities"
-    
-    # ========== PRIORITY 4: Transportation ==========
-    transportation = [
-        "gas", "fuel", "shell", "exxon", "chevron", "bp", "mobil",
-        "uber", "lyft", "taxi", "parking", "transit", "toll",
-        "costco gas", "gas station", "natgas"
-    ]
-    if any(trans in description_lower for trans in transportation):
-        # Exception: Natural gas is a utility, not transportation
-        if "natgas" in description_lower or "georgia natural" in description_lower:
-            return "Bills & Utilities"
-        return "Transportation"
-    
-    # ========== PRIORITY 5: Healthcare ==========
-    healthcare = [
-        "pharmacy", "cvs", "walgreens", "rite aid", "doctor", "hospital",
-        "medical", "dental", "vision", "lab", "laboratory", "clinic",
-        "health", "medicine", "prescription", "inspire ob"
-    ]
-    if any(health in description_lower for health in healthcare):
-        return "Healthcare"
-    
-    # ========== PRIORITY 6: Home Improvement ==========
-    home_improvement = [
-        "home depot", "lowe", "lowes", "ace hardware", "true value",
-        "menards", "harbor freight", "lumber", "hardware",
-        "furring", "veneer", "valspar", "paint", "roller", "jigsaw"
-    ]
-    if any(store in description_lower for store in home_improvement):
-        return "Home Improvement"
-    
-    # ========== PRIORITY 7: Shopping (Retail & Online) ==========
-    # Online marketplaces
-    if "amazon" in description_lower or "amzn" in description_lower or "ebay" in description_lower:
-        return "Shopping"
-    
-    # Retail stores
-    retail_stores = [
-        "macy", "kohl", "jcpenney", "nordstrom", "dillard", "sears",
-        "ross", "tj maxx", "marshalls", "burlington", "target.com",
-        "h&m", "zara", "gap", "old navy", "banana republic",
-        "dollar tree", "dollar general", "five below", "big lots",
-        "hobby lobby", "michaels", "joann", "craft",
-        "best buy", "apple store", "microsoft store",
-        "rack room shoes", "foot locker", "nike", "adidas"
-    ]
-    if any(store in description_lower for store in retail_stores):
-        return "Shopping"
-    
-    # ========== PRIORITY 8: Subscriptions ==========
-    subscriptions = [
-        "netflix", "hulu", "disney", "prime video", "hbo", "paramount",
-        "spotify", "apple music", "youtube", "youtube premium",
-        "adobe", "microsoft 365", "office 365", "dropbox", "icloud",
-        "github", "playstation", "xbox", "nintendo", "steam",
-        "gym", "fitness", "active n fit"
-    ]
-    if any(sub in description_lower for sub in subscriptions):
-        return "Subscriptions"
-    
-    # ========== PRIORITY 9: Entertainment ==========
-    entertainment = [
-        "movie", "theater", "cinema", "amc", "regal", "cinemark",
-        "concert", "ticket", "event", "sports", "game"
-    ]
-    if any(ent in description_lower for ent in entertainment):
-        return "Entertainment"
+def table_order(filtered_df, sort_by):
+    """Row positions of filtered_df in the transaction table's sort order."""
+    column, ascending = TABLE_SORTS[sort_by]
+    order = np.argsort(filtered_df[column].to_numpy(), kind='stable')
+    return order if ascending else order[::-1]
+
+def merchant_insights(expenses_df):
+    """Merchant rows (payments and credits removed), per-merchant totals and top-10 breakdowns."""
+    merchant_table = get_merchant_table()
+    merchant_df = expenses_df[~expenses_df['Category'].isin(['Income/Payments'])]
     
-    # ========== PRIORITY 10: Professional Services ==========
-    services = [
-        "haircut", "salon", "barber", "spa", "massage",
-        "lawyer", "attorney", "accountant", "consultant",
-        "ahs.com", "warranty", "protection plan"
-    ]
-    if any(service in description_lower for service in services):
-        return "Professional Services"
+    # Also filter out common payment keywords in description
+    payment_keywords = ['payment thank you', 'online payment', 'autopay', 'credit', 'refund', 
+                       'cashback', 'rewards', 'adjustment', 'fee reversal']
+    merchant_df = merchant_df[~contains_any(merchant_df['Description'], payment_keywords)]
     
-    # ========== PRIORITY 11: Finance & Banking ==========
-    finance = [
-        "bank fee", "atm", "wire transfer", "money order",
-        "interest charged", "late fee", "annual fee",
-        "electronic payment", "ba electronic"
-    ]
-    if any(fin in description_lower for fin in finance):
-        return "Finance & Banking"
+    merchant_totals = merchant_df.groupby("Merchant_ID")["Amount"].agg(['sum', 'count', 'mean']).reset_index()
+    merchant_totals.columns = ['Merchant_ID', 'Total', 'Visits', 'Avg']
+    merchant_totals['Merchant'] = merchant_table.names(merchant_totals['Merchant_ID'])
+    merchant_totals['Loyalty Score'] = merchant_totals['Visits'] * merchant_totals['Total'] / 100
+    # Spend share is based on actual merchant spending, not including payments
+    merchant_totals['Spend %'] = (merchant_totals['Total'] / merchant_df['Amount'].sum() * 100).round(1)
+    merchant_totals = merchant_totals.sort_values('Total', ascending=False)
     
-    # ========== DEFAULT: Other ==========
-    return "Other"
+    top_10_ids = merchant_totals.head(10)['Merchant_ID'].tolist()
+    top_10_rows = merchant_df[merchant_df['Merchant_ID'].isin(top_10_ids)]
+    merchant_daily = top_10_rows.groupby(['Date', 'Merchant_ID'])['Amount'].sum().reset_index()
+    merchant_daily['Merchant'] = merchant_table.names(merchant_daily['Merchant_ID'])
+    weekdays = top_10_rows['Date'].dt.day_name().rename('DayOfWeek')
+    merchant_dow = top_10_rows.groupby([top_10_rows['Merchant_ID'], weekdays]).size().reset_index(name='Count')
+    merchant_dow['Merchant'] = merchant_table.names(merchant_dow['Merchant_ID'])
+    sunburst_data = top_10_rows.groupby(['Category', 'Merchant_ID'])['Amount'].sum().reset_index()
+    sunburst_data['Merchant'] = merchant_table.names(sunburst_data['Merchant_ID'])
+    return merchant_df, merchant_totals, merchant_daily, merchant_dow, sunburst_data
+
+# Category rules are re-read whenever category_rules.json changes
+category_rules = current_rules()
+if category_rules.error:
+    st.sidebar.warning(f"⚠️ Category rules not reloaded, still using the previous ones: {category_rules.error}")
 
 # Upload Multiple PDFs
 st.sidebar.header("📄 Upload Statements")
 uploaded_pdfs = st.sidebar.file_uploader("Upload credit card statements (PDF)", type=["pdf"], accept_multiple_files=True)
 
+keep_history = st.sidebar.toggle("💾 Keep history on this computer", value=True,
+                                 help="Save transactions locally so they are still here after a refresh")
+store = get_transaction_store() if keep_history else None
+if store is not None and store.count() > 0 and st.sidebar.button("🗑️ Clear saved history"):
+    store.clear()
+
 if uploaded_pdfs:
     all_transactions = []
     all_card_info = []
     
-    for pdf_file in uploaded_pdfs:
-        with st.spinner(f"Processing: {pdf_file.name}..."):
-            df_temp, card_info = extract_transactions_from_pdf(pdf_file)
-            if df_temp is not None and len(df_temp) > 0:
-                df_temp['Card'] = f"{card_info['card_name']} (...{card_info['last_4_digits']})"
-                df_temp['Card_Last4'] = card_info['last_4_digits']
-                all_transactions.append(df_temp)
-                all_card_info.append({**card_info, 'filename': pdf_file.name})
+    parallel_mode = st.sidebar.toggle("⚡ Parallel parsing", value=len(uploaded_pdfs) > 1,
+                                      help="Parse statements in a process pool using all CPU cores")
     
-    if all_transactions:
-        # Combine all dataframes
-        df = pd.concat(all_transactions, ignore_index=True)
+    if parallel_mode:
+        progress_bar = st.progress(0.0, text=f"Processing {len(uploaded_pdfs)} statement(s)...")
+        
+        def show_progress(done, total, name):
+            progress_bar.progress(done / total, text=f"Processed {done}/{total}: {name}")
         
-        # Detect and remove duplicates
-        initial_count = len(df)
-        df = df.drop_duplicates(subset=['Date', 'Description', 'Amount', 'Card_Last4'], keep='first')
-        duplicates_removed = initial_count - len(df)
+        parsed = ingest_statements([(pdf_file.name, pdf_file.getvalue()) for pdf_file in uploaded_pdfs],
+                                   cache=get_parse_cache(), on_progress=show_progress)
+        progress_bar.empty()
+    else:
+        parsed = []
+        for pdf_file in uploaded_pdfs:
+            with st.spinner(f"Processing: {pdf_file.name}..."):
+                df_temp, card_info = get_parse_cache().get_or_parse(
+                    pdf_file.getvalue(), partial(parse_pdf_bytes, page_workers=os.cpu_count() or 1))
+                parsed.append((df_temp, card_info, None))
+    
+    for file_idx, (pdf_file, (df_temp, card_info, error)) in enumerate(zip(uploaded_pdfs, parsed)):
+        if error:
+            st.sidebar.error(f"❌ Could not parse {pdf_file.name}: {error}")
+            continue
+        if df_temp is None or len(df_temp) == 0:
+            st.warning(f"⚠️ No transactions found in {pdf_file.name}. Showing raw text for debugging:")
+            with st.expander("View PDF Content"):
+                st.text_area("PDF Content", card_info.get('raw_text', ''), height=300, key=f"raw_text_{file_idx}")
+            continue
+        all_transactions.append((df_temp, card_info))
+        all_card_info.append({**card_info, 'filename': pdf_file.name})
+    
+    if all_transactions:
+        # Combine, de-duplicate overlapping statements and categorize
+        df, duplicates_removed, file_stats = consolidate_statements(
+            all_transactions, memo=get_description_memo(),
+            known=store.known_fingerprints() if store is not None else None)
         
         if duplicates_removed > 0:
             st.sidebar.success(f"✅ Removed {duplicates_removed} duplicate(s)")
         
-        # Add categories
-        df["Category"] = df["Description"].apply(categorize)
-        
-        # Fix amount signs: Payments/Credits should be positive (they reduce what you owe)
-        # Expenses should be negative (they increase what you owe)
-        # If a payment is currently negative, flip it to positive
-        df.loc[df["Category"] == "Income/Payments", "Amount"] = df.loc[df["Category"] == "Income/Payments", "Amount"].abs()
-        
-        df = df.sort_values('Date').reset_index(drop=True)
-        
         st.sidebar.success(f"✅ Loaded {len(df)} unique transactions from {len(all_card_info)} statement(s)")
+        with st.sidebar.expander("📑 Rows added per statement"):
+            st.dataframe(pd.DataFrame([{'Statement': info['filename'], 'Rows': stats['rows'], 'New': stats['new'],
+                                        'Duplicates': stats['duplicates']}
+                                       for info, stats in zip(all_card_info, file_stats)]), hide_index=True)
+        
+        if store is not None:
+            # Only transactions not stored yet are added, to the store and the archive
+            history_archive = sync_history_archive(store)
+            new_rows = df[store.is_new(df['Fingerprint'].tolist())]
+            added = store.upsert(new_rows, all_card_info)
+            history_archive.append(new_rows, store.revision)
+            st.sidebar.success(f"💾 Saved {added} new transaction(s); {store.count()} in history")
+            df = None  # the filtered slice of the whole history is loaded below
         
         # Debug info for card detection
         with st.expander("🔍 Debug: Card Detection Info"):
@@ -998,9 +264,13 @@ if uploaded_pdfs:
             "Card": ["Sample Card"] * 10,
             "Card_Last4": ["0000"] * 10
         })
-        df["Category"] = df["Description"].apply(categorize)
-        df.loc[df["Category"] == "Income/Payments", "Amount"] = df.loc[df["Category"] == "Income/Payments", "Amount"].abs()
+        categorize_transactions(df)
         all_card_info = []
+elif store is not None and store.count() > 0:
+    history_archive = sync_history_archive(store)
+    df = None  # the filtered slice is loaded below
+    all_card_info = store.statements()
+    st.sidebar.success(f"💾 Showing saved history ({store.count()} transactions)")
 else:
     st.info("👈 Upload your credit card statements to get started!")
     df = pd.DataFrame({
@@ -1010,10 +280,25 @@ else:
         "Card": ["Sample Card"] * 10,
         "Card_Last4": ["0000"] * 10
     })
-    df["Category"] = df["Description"].apply(categorize)
-    df.loc[df["Category"] == "Income/Payments", "Amount"] = df.loc[df["Category"] == "Income/Payments", "Amount"].abs()
+    categorize_transactions(df)
     all_card_info = []
 
+# Optional learned fallback for transactions no category rule matched
+guess_categories = st.sidebar.toggle(f"🤖 Guess categories for \"{category_rules.default}\"", value=False,
+                                     help="Train a small local model on your categorized transactions and use it to "
+                                          "categorize the ones the rules missed. Nothing leaves your machine.")
+
+# Identity of the loaded data; everything derived from it is cached under this plus the filter state
+merged_duplicates = st.session_state.setdefault('merged_duplicates', set())
+if df is None:
+    data_source = ("history", store.revision)
+elif 'Fingerprint' in df.columns:
+    data_source = ("upload", data_digest(df['Fingerprint']))
+else:
+    data_source = ("sample",)
+data_version = (data_source, category_rules.version, guess_categories, frozenset(merged_duplicates))
+results = get_result_cache()
+
 # Credit Card Summary Section
 if all_card_info:
     st.header("💳 Credit Card Overview")
@@ -1060,8 +345,18 @@ if all_card_info:
 # Sidebar filters
 st.sidebar.header("🔍 Filters")
 
+# Filter options come from the data in memory, or from the archive's catalog
+# so the saved history never has to be loaded in full
+if df is not None:
+    valid_dates = df["Date"].dropna()
+    category_options = df["Category"].unique()
+    card_options = df["Card"].unique() if 'Card' in df.columns else []
+else:
+    catalog = history_archive.catalog
+    valid_dates = pd.to_datetime(pd.Series([catalog['start'], catalog['end']])).dropna()
+    category_options, card_options = catalog['categories'], catalog['cards']
+
 # Automatically detect date range from transactions
-valid_dates = df["Date"].dropna()
 if len(valid_dates) > 0:
     auto_start = valid_dates.min().date()
     auto_end = valid_dates.max().date()
@@ -1073,49 +368,107 @@ else:
 
 start_date = st.sidebar.date_input("Start Date", auto_start)
 end_date = st.sidebar.date_input("End Date", auto_end)
-category_filter = st.sidebar.multiselect("Categories", df["Category"].unique(), default=df["Category"].unique())
+category_filter = st.sidebar.multiselect("Categories", category_options, default=category_options)
 
 # Card filter
-if 'Card' in df.columns:
-    card_filter = st.sidebar.multiselect("Cards", df["Card"].unique(), default=df["Card"].unique())
+if len(card_options) > 0:
+    card_filter = st.sidebar.multiselect("Cards", card_options, default=card_options)
 else:
     card_filter = []
 
-# Apply filters
-filtered_df = df[(df["Date"] >= pd.to_datetime(start_date)) & (df["Date"] <= pd.to_datetime(end_date))]
-filtered_df = filtered_df[filtered_df["Category"].isin(category_filter)]
-if card_filter and 'Card' in filtered_df.columns:
-    filtered_df = filtered_df[filtered_df["Card"].isin(card_filter)]
+view_key = (data_version, filter_state(start_date, end_date, category_filter, card_filter))
+prepare = partial(prepare_data, guess_categories=guess_categories, default_category=category_rules.default,
+                  merged_duplicates=merged_duplicates)
+if df is None:
+    # Only the partitions (month, card) and row groups (category) matching the filters are read.
+    # Rows the rules left in the default category stay in while guessing, as they may move.
+    pushed_categories = set(category_filter) | ({category_rules.default} if guess_categories else set())
+    if guess_categories:
+        # Trained once per history revision and rules version, then applied to each slice
+        model = results.get("history_model", (data_source, category_rules.version),
+                            partial(train_history_model, history_archive, category_rules.default))
+        prepare = partial(prepare, model=model)
+    data_key = view_key
+    df, guessed = results.get("data", data_key, lambda: prepare(
+        history_archive.load(start_date, end_date, categories=pushed_categories, cards=card_filter or None)))
+else:
+    data_key = data_version
+    df, guessed = results.get("data", data_key, partial(prepare, df))
+
+if guess_categories:
+    st.sidebar.caption(f"Categorized {guessed} transaction(s) with the learned model")
+
+merchant_table = get_merchant_table()
+
+# Near-duplicates (pending vs. posted dates, monthly vs. year-end wording) are proposed for review
+if 'Fingerprint' in df.columns:
+    if data_source[0] == "history":
+        # Pairs can straddle the date filter, so the whole stored history is searched
+        duplicate_pairs = results.get("duplicate_pairs", data_source, lambda: find_fuzzy_duplicates(store.load()))
+    else:
+        duplicate_pairs = results.get("duplicate_pairs", data_key, partial(find_fuzzy_duplicates, df))
+    # Pairs left unticked at an earlier merge were judged separate transactions; don't propose them again
+    rejected_duplicates = (store.rejected_duplicates() if store is not None
+                           else st.session_state.setdefault('rejected_duplicates', set()))
+    if rejected_duplicates:
+        rejected = [pair in rejected_duplicates
+                    for pair in zip(duplicate_pairs['Keep_Fingerprint'], duplicate_pairs['Drop_Fingerprint'])]
+        duplicate_pairs = duplicate_pairs[~np.array(rejected, dtype=bool)]
+    if len(duplicate_pairs) > 0:
+        with st.expander(f"🧹 Review {len(duplicate_pairs)} possible duplicate(s)"):
+            st.caption("Same card and amount a few days apart. Ticked rows look like the same transaction "
+                       "reported twice; merging keeps the earlier one. Rows left unticked are remembered "
+                       "as separate transactions and not proposed again.")
+            # Keyed on the listed pairs, so edits made to an earlier list never carry over to this one
+            reviewed = st.data_editor(
+                duplicate_pairs, hide_index=True,
+                key=f"duplicate_review_{data_digest(duplicate_pairs['Drop_Fingerprint'].to_numpy(dtype=np.int64))}",
+                disabled=[column for column in duplicate_pairs.columns if column != 'Merge'],
+                column_config={
+                    "Amount": st.column_config.NumberColumn("Amount", format="$%.2f"),
+                    "Keep_Fingerprint": None,
+                    "Drop_Fingerprint": None
+                }
+            )
+            if st.button("Merge selected"):
+                to_drop = reviewed.loc[reviewed['Merge'], 'Drop_Fingerprint'].tolist()
+                kept_apart = list(zip(reviewed.loc[~reviewed['Merge'], 'Keep_Fingerprint'].tolist(),
+                                      reviewed.loc[~reviewed['Merge'], 'Drop_Fingerprint'].tolist()))
+                if store is not None:
+                    store.merge_duplicates(to_drop)
+                    store.reject_duplicates(kept_apart)
+                else:
+                    rejected_duplicates.update(kept_apart)
+                merged_duplicates.update(to_drop)
+                st.rerun()
+
+# Apply filters through indexes built once per data version (date-sorted rows, category and card
+# bitmaps); a selection restricted only by dates comes back as a view of the indexed rows
+filter_index = results.get("filter_index", data_key, partial(FilterIndex, df))
+expense_index = results.get("expense_index", data_key, lambda: FilterIndex(expense_rows(df)))
+selection = dict(start=start_date, end=end_date, categories=category_filter, cards=card_filter or None)
+filtered_df = results.get("filtered", view_key, partial(filter_index.select, **selection))
+
+# One pass over the filtered rows; every total and chart below rolls up from this cube
+# (rollups are memoized on the cube, so they are cached along with it)
+cube = results.get("cube", view_key, partial(SpendingCube, filtered_df))
 
 # Summary Metrics - Enhanced
 st.header("📊 Financial Overview")
 
 # Filter out payment/credit transactions for accurate metrics
-non_payment_df = filtered_df[filtered_df["Category"] != "Income/Payments"].copy()
-payment_count = len(filtered_df) - len(non_payment_df)
+metrics = results.get("overview_metrics", view_key, partial(overview_metrics, cube))
+payment_count = metrics['payment_count']
 
 # Show info if payments were filtered
 if payment_count > 0:
     st.info(f"ℹ️ **{payment_count} payment/credit transactions** filtered out from metrics and charts (Card payments, refunds, credits, etc.)")
 
-# Calculate metrics (excluding payments)
-total_income = non_payment_df[non_payment_df["Amount"] > 0]["Amount"].sum()
-total_expenses = abs(non_payment_df[non_payment_df["Amount"] < 0]["Amount"].sum())
-net_balance = total_income - total_expenses
-transaction_count = len(non_payment_df)
-
-# Calculate additional insights
-expenses_df_temp = non_payment_df[non_payment_df["Amount"] < 0].copy()
-if not expenses_df_temp.empty:
-    avg_daily_spending = abs(expenses_df_temp.groupby("Date")["Amount"].sum().mean())
-    largest_expense = abs(expenses_df_temp["Amount"].min())
-    days_in_period = (non_payment_df["Date"].max() - non_payment_df["Date"].min()).days + 1
-    projected_monthly = (total_expenses / days_in_period) * 30 if days_in_period > 0 else 0
-else:
-    avg_daily_spending = 0
-    largest_expense = 0
-    days_in_period = 0
-    projected_monthly = 0
+# Metrics (excluding payments)
+total_income, total_expenses, net_balance = metrics['total_income'], metrics['total_expenses'], metrics['net_balance']
+transaction_count, avg_daily_spending = metrics['transaction_count'], metrics['avg_daily_spending']
+largest_expense, days_in_period = metrics['largest_expense'], metrics['days_in_period']
+projected_monthly = metrics['projected_monthly']
 
 # Display metrics in a modern card layout
 col1, col2, col3, col4, col5 = st.columns(5)
@@ -1153,8 +506,7 @@ st.divider()
 st.header("� Spending Trends & Analysis")
 
 # Prepare expenses data (exclude payment transactions)
-expenses_df = filtered_df[(filtered_df["Amount"] < 0) & (filtered_df["Category"] != "Income/Payments")].copy()
-expenses_df["Amount"] = abs(expenses_df["Amount"])
+expenses_df = results.get("expenses", view_key, partial(expense_index.select, **selection))
 
 # Row 1: Main trend lines
 col1, col2 = st.columns(2)
@@ -1162,7 +514,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("📅 Daily Spending Trend (All Cards)")
     if not expenses_df.empty:
-        daily_spending = expenses_df.groupby("Date")["Amount"].sum().reset_index()
+        daily_spending = cube.daily_spending()
         
         # Add 7-day moving average
         daily_spending['7-Day Avg'] = daily_spending['Amount'].rolling(window=7, min_periods=1).mean()
@@ -1196,7 +548,7 @@ with col1:
 with col2:
     st.subheader("📊 Category Trends Over Time")
     if not expenses_df.empty:
-        category_daily = expenses_df.groupby(['Date', 'Category'])['Amount'].sum().reset_index()
+        category_daily = cube.spending_by('Date', 'Category')
         
         fig_cat_trend = px.line(category_daily, 
                                x='Date', 
@@ -1215,17 +567,11 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("📆 Monthly Spending Comparison")
     if not filtered_df.empty:
-        monthly_df = filtered_df.copy()
-        monthly_df['Month'] = pd.to_datetime(monthly_df['Date']).dt.to_period('M').astype(str)
-        
-        monthly_income = monthly_df[monthly_df['Amount'] > 0].groupby('Month')['Amount'].sum().reset_index()
-        monthly_income.columns = ['Month', 'Income']
-        
-        monthly_expenses = monthly_df[monthly_df['Amount'] < 0].groupby('Month')['Amount'].sum().reset_index()
-        monthly_expenses['Amount'] = abs(monthly_expenses['Amount'])
-        monthly_expenses.columns = ['Month', 'Expenses']
+        monthly_df = cube.rollup('Date')
+        monthly_df['Month'] = monthly_df['Date'].dt.to_period('M').astype(str)
         
-        monthly_combined = pd.merge(monthly_income, monthly_expenses, on='Month', how='outer').fillna(0)
+        monthly_combined = monthly_df.groupby('Month')[['Received', 'Spent']].sum().reset_index()
+        monthly_combined.columns = ['Month', 'Income', 'Expenses']
         monthly_melted = monthly_combined.melt(id_vars='Month', var_name='Type', value_name='Amount')
         
         fig_monthly = px.bar(monthly_melted, 
@@ -1242,12 +588,7 @@ with col1:
 with col2:
     st.subheader("📅 Day of Week Analysis")
     if not expenses_df.empty:
-        expenses_df['DayOfWeek'] = expenses_df['Date'].dt.day_name()
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        
-        day_spending = expenses_df.groupby('DayOfWeek')['Amount'].agg(['sum', 'mean', 'count']).reset_index()
-        day_spending['DayOfWeek'] = pd.Categorical(day_spending['DayOfWeek'], categories=day_order, ordered=True)
-        day_spending = day_spending.sort_values('DayOfWeek')
+        day_spending = cube.spending_by_weekday()
         
         fig_dow = go.Figure()
         fig_dow.add_trace(go.Bar(
@@ -1268,14 +609,14 @@ with col2:
         st.info("No expense data available")
 
 # Row 3: Card-specific analysis if multiple cards
-if 'Card' in filtered_df.columns and len(filtered_df['Card'].unique()) > 1:
+if cube.cells['Card'].nunique() > 1:
     st.subheader("💳 Individual Card Analysis")
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**Spending Distribution by Card**")
-        card_expenses = expenses_df.groupby('Card')['Amount'].sum().reset_index()
+        card_expenses = cube.spending_by('Card')
         card_expenses = card_expenses.sort_values('Amount', ascending=False)
         
         fig_card_pie = px.pie(card_expenses, 
@@ -1287,7 +628,7 @@ if 'Card' in filtered_df.columns and len(filtered_df['Card'].unique()) > 1:
     
     with col2:
         st.markdown("**Card Usage Over Time**")
-        card_daily = expenses_df.groupby(['Date', 'Card'])['Amount'].sum().reset_index()
+        card_daily = cube.spending_by('Date', 'Card')
         
         fig_card_trend = px.area(card_daily,
                                 x='Date',
@@ -1298,9 +639,7 @@ if 'Card' in filtered_df.columns and len(filtered_df['Card'].unique()) > 1:
     
     # Card comparison table
     st.markdown("**Card Comparison Summary**")
-    card_summary = expenses_df.groupby('Card').agg({
-        'Amount': ['sum', 'mean', 'count']
-    }).round(2)
+    card_summary = cube.spending_by('Card').set_index('Card')[['Amount', 'Average', 'Count']].round(2)
     card_summary.columns = ['Total Spent', 'Avg Transaction', 'Transaction Count']
     card_summary = card_summary.sort_values('Total Spent', ascending=False)
     st.dataframe(card_summary, use_container_width=True)
@@ -1315,7 +654,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("**Expense Distribution**")
     if not expenses_df.empty:
-        category_totals = expenses_df.groupby("Category")["Amount"].sum().reset_index()
+        category_totals = cube.spending_by("Category")
         category_totals = category_totals.sort_values("Amount", ascending=False)
         
         fig_pie = px.pie(category_totals, 
@@ -1331,7 +670,7 @@ with col1:
 with col2:
     st.markdown("**Top Categories**")
     if not expenses_df.empty:
-        category_totals = expenses_df.groupby("Category")["Amount"].sum().reset_index()
+        category_totals = cube.spending_by("Category")
         category_totals = category_totals.sort_values("Amount", ascending=True)
         
         fig_bar = px.bar(category_totals, 
@@ -1366,7 +705,7 @@ with col1:
 with col2:
     st.markdown("**📅 Spending Stats**")
     if not expenses_df.empty:
-        days = (filtered_df['Date'].max() - filtered_df['Date'].min()).days + 1
+        days = (cube.cells['Date'].max() - cube.cells['Date'].min()).days + 1
         avg_daily = total_expenses / days if days > 0 else 0
         st.metric("Avg Daily", f"${avg_daily:.2f}")
         st.metric("Avg per Txn", f"${total_expenses/len(expenses_df):.2f}" if len(expenses_df) > 0 else "$0.00")
@@ -1376,8 +715,9 @@ with col2:
 with col3:
     st.markdown("**📊 Category Leaders**")
     if not expenses_df.empty:
-        top_cat = expenses_df.groupby('Category')['Amount'].sum().idxmax()
-        top_cat_amt = expenses_df.groupby('Category')['Amount'].sum().max()
+        category_spent = cube.spending_by('Category').set_index('Category')['Amount']
+        top_cat = category_spent.idxmax()
+        top_cat_amt = category_spent.max()
         st.metric("Top Category", top_cat)
         st.metric("Amount", f"${top_cat_amt:.2f}")
     else:
@@ -1407,15 +747,6 @@ st.divider()
 # Enhanced Visualizations with Tabs
 st.header("📈 Spending Trends & Insights")
 
-# Prepare data (exclude payment transactions)
-expenses_df = filtered_df[(filtered_df["Amount"] < 0) & (filtered_df["Category"] != "Income/Payments")].copy()
-expenses_df["Amount"] = abs(expenses_df["Amount"])
-
-if not expenses_df.empty:
-    expenses_df['DayOfWeek'] = expenses_df['Date'].dt.day_name()
-    expenses_df['WeekDay'] = expenses_df['Date'].dt.dayofweek
-    expenses_df['Month'] = expenses_df['Date'].dt.to_period('M').astype(str)
-
 # Budget goals in sidebar (MUST be defined before tabs that use it)
 st.sidebar.header("💵 Budget Goals")
 st.sidebar.markdown("*Set monthly budget limits per category*")
@@ -1431,17 +762,15 @@ for cat in sorted(df["Category"].unique()):
         key=f"budget_{cat}"
     )
 
-# Create tabs for organized viewing
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 Overview", "📅 Time Patterns", "🏷️ Categories", "💳 Cards", "🎯 Goals & Forecasts", "💰 Merchant Insights"])
-
-with tab1:
+# Tabs for organized viewing; each one is drawn by its render function
+def render_overview_tab():
     # Row 1: Main trends with enhancements
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**📈 Daily Spending with Anomaly Detection**")
         if not expenses_df.empty:
-            daily_spending = expenses_df.groupby("Date")["Amount"].sum().reset_index()
+            daily_spending = cube.daily_spending()
             daily_spending['7-Day MA'] = daily_spending['Amount'].rolling(window=7, min_periods=1).mean()
             daily_spending['14-Day MA'] = daily_spending['Amount'].rolling(window=14, min_periods=1).mean()
             
@@ -1504,10 +833,10 @@ with tab1:
     with col2:
         st.markdown("**⚡ Spending Pace Gauge**")
         if not expenses_df.empty:
-            days_elapsed = (filtered_df['Date'].max() - filtered_df['Date'].min()).days + 1
+            days_elapsed = (cube.cells['Date'].max() - cube.cells['Date'].min()).days + 1
             days_in_month = 30
             
-            total_spent = expenses_df['Amount'].sum()
+            total_spent = cube.totals(expenses=True)['Spent']
             expected_by_now = (total_spent / days_elapsed) * min(days_elapsed, days_in_month)
             
             # Gauge chart
@@ -1552,7 +881,7 @@ with tab1:
     with col1:
         st.markdown("**📊 Cumulative Spending with Budget Goal**")
         if not expenses_df.empty:
-            daily_spending = expenses_df.groupby("Date")["Amount"].sum().reset_index()
+            daily_spending = cube.daily_spending()
             daily_spending['Cumulative'] = daily_spending['Amount'].cumsum()
             
             # Calculate projected end-of-period
@@ -1578,7 +907,7 @@ with tab1:
                                         line=dict(color='#A78BFA', width=2, dash='dash')))
             
             # Budget goal line (if available from sidebar)
-            if 'budget_goals' in locals():
+            if budget_goals:
                 total_budget = sum(v for k, v in budget_goals.items() if k != "Income/Payments" and v > 0)
                 if total_budget > 0:
                     fig.add_trace(go.Scatter(x=[daily_spending['Date'].min(), daily_spending['Date'].max()],
@@ -1597,10 +926,11 @@ with tab1:
         st.markdown("**🎯 Category Momentum (% Change)**")
         if not expenses_df.empty and len(expenses_df) > 14:
             # Calculate first half vs second half spending
-            mid_date = expenses_df['Date'].min() + (expenses_df['Date'].max() - expenses_df['Date'].min()) / 2
+            category_daily = cube.spending_by('Date', 'Category')
+            mid_date = category_daily['Date'].min() + (category_daily['Date'].max() - category_daily['Date'].min()) / 2
             
-            first_half = expenses_df[expenses_df['Date'] <= mid_date].groupby('Category')['Amount'].sum()
-            second_half = expenses_df[expenses_df['Date'] > mid_date].groupby('Category')['Amount'].sum()
+            first_half = category_daily[category_daily['Date'] <= mid_date].groupby('Category')['Amount'].sum()
+            second_half = category_daily[category_daily['Date'] > mid_date].groupby('Category')['Amount'].sum()
             
             # Calculate % change
             momentum = pd.DataFrame({
@@ -1643,21 +973,18 @@ with tab1:
     # Full-width: Category trends area chart
     st.markdown("**🏷️ Category Spending Trends Over Time**")
     if not expenses_df.empty:
-        category_daily = expenses_df.groupby(['Date', 'Category'])['Amount'].sum().reset_index()
+        category_daily = cube.spending_by('Date', 'Category')
         fig = px.area(category_daily, x='Date', y='Amount', color='Category', height=350)
         fig.update_layout(hovermode='x unified')
         st.plotly_chart(fig, use_container_width=True)
 
-with tab2:
+def render_time_patterns_tab():
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**Day of Week Analysis**")
         if not expenses_df.empty:
-            day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            day_spending = expenses_df.groupby('DayOfWeek')['Amount'].agg(['mean', 'count']).reset_index()
-            day_spending['DayOfWeek'] = pd.Categorical(day_spending['DayOfWeek'], categories=day_order, ordered=True)
-            day_spending = day_spending.sort_values('DayOfWeek')
+            day_spending = cube.spending_by_weekday()
             
             fig = go.Figure()
             fig.add_trace(go.Bar(x=day_spending['DayOfWeek'], y=day_spending['mean'],
@@ -1675,8 +1002,10 @@ with tab2:
     with col2:
         st.markdown("**Weekday vs Weekend**")
         if not expenses_df.empty:
-            expenses_df['DayType'] = expenses_df['WeekDay'].apply(lambda x: 'Weekend' if x >= 5 else 'Weekday')
-            daytype_spending = expenses_df.groupby('DayType')['Amount'].agg(['sum', 'mean']).reset_index()
+            day_spending = cube.spending_by_weekday()
+            day_spending['DayType'] = day_spending['DayOfWeek'].isin(['Saturday', 'Sunday']).map({True: 'Weekend', False: 'Weekday'})
+            daytype_spending = day_spending.groupby('DayType')[['sum', 'count']].sum().reset_index()
+            daytype_spending['mean'] = daytype_spending['sum'] / daytype_spending['count']
             
             fig = go.Figure()
             fig.add_trace(go.Bar(name='Total', x=daytype_spending['DayType'], y=daytype_spending['sum'],
@@ -1690,12 +1019,13 @@ with tab2:
     
     st.markdown("**Spending Heatmap**")
     if not expenses_df.empty and len(expenses_df) > 7:
-        expenses_df['WeekNum'] = expenses_df['Date'].dt.isocalendar().week
-        heatmap_data = expenses_df.groupby(['WeekNum', 'DayOfWeek'])['Amount'].sum().reset_index()
+        heatmap_data = cube.daily_spending()
+        heatmap_data['WeekNum'] = heatmap_data['Date'].dt.isocalendar().week
+        heatmap_data['DayOfWeek'] = heatmap_data['Date'].dt.day_name()
+        heatmap_data = heatmap_data.groupby(['WeekNum', 'DayOfWeek'])['Amount'].sum().reset_index()
         heatmap_pivot = heatmap_data.pivot(index='WeekNum', columns='DayOfWeek', values='Amount').fillna(0)
         
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        heatmap_pivot = heatmap_pivot.reindex(columns=[d for d in day_order if d in heatmap_pivot.columns])
+        heatmap_pivot = heatmap_pivot.reindex(columns=[d for d in DAY_ORDER if d in heatmap_pivot.columns])
         
         fig = go.Figure(data=go.Heatmap(z=heatmap_pivot.values, x=heatmap_pivot.columns,
                                         y=[f"Week {w}" for w in heatmap_pivot.index],
@@ -1703,13 +1033,13 @@ with tab2:
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
 
-with tab3:
+def render_categories_tab():
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**Category Distribution**")
         if not expenses_df.empty:
-            category_totals = expenses_df.groupby("Category")["Amount"].sum().reset_index()
+            category_totals = cube.spending_by("Category")
             category_totals = category_totals.sort_values("Amount", ascending=False)
             
             fig = px.pie(category_totals, names="Category", values="Amount", hole=0.4, height=400)
@@ -1720,10 +1050,11 @@ with tab3:
     with col2:
         st.markdown("**Top 10 Merchants**")
         if not expenses_df.empty:
-            top_merchants = expenses_df.groupby("Description")["Amount"].sum().nlargest(10).reset_index()
+            top_merchants = expenses_df.groupby("Merchant_ID")["Amount"].sum().nlargest(10).reset_index()
+            top_merchants['Merchant'] = merchant_table.names(top_merchants['Merchant_ID'])
             
             fig = go.Figure()
-            fig.add_trace(go.Bar(y=top_merchants['Description'], x=top_merchants['Amount'],
+            fig.add_trace(go.Bar(y=top_merchants['Merchant'], x=top_merchants['Amount'],
                                 orientation='h', marker_color='#4ECDC4'))
             fig.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
             st.plotly_chart(fig, use_container_width=True)
@@ -1732,20 +1063,18 @@ with tab3:
     
     st.markdown("**Category Breakdown Table**")
     if not expenses_df.empty:
-        cat_summary = expenses_df.groupby("Category").agg({
-            'Amount': ['sum', 'mean', 'count']
-        }).round(2)
+        cat_summary = cube.spending_by("Category").set_index("Category")[['Amount', 'Average', 'Count']].round(2)
         cat_summary.columns = ['Total', 'Average', 'Count']
         cat_summary = cat_summary.sort_values('Total', ascending=False)
         st.dataframe(cat_summary, use_container_width=True)
 
-with tab4:
-    if 'Card' in filtered_df.columns and len(filtered_df['Card'].unique()) > 1:
+def render_cards_tab():
+    if cube.cells['Card'].nunique() > 1:
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("**Spending by Card**")
-            card_expenses = expenses_df.groupby('Card')['Amount'].sum().reset_index()
+            card_expenses = cube.spending_by('Card')
             card_expenses = card_expenses.sort_values('Amount', ascending=False)
             
             fig = px.pie(card_expenses, names='Card', values='Amount', hole=0.4, height=400)
@@ -1753,22 +1082,20 @@ with tab4:
         
         with col2:
             st.markdown("**Card Usage Over Time**")
-            card_daily = expenses_df.groupby(['Date', 'Card'])['Amount'].sum().reset_index()
+            card_daily = cube.spending_by('Date', 'Card')
             
             fig = px.area(card_daily, x='Date', y='Amount', color='Card', height=400)
             st.plotly_chart(fig, use_container_width=True)
         
         st.markdown("**Card Comparison**")
-        card_summary = expenses_df.groupby('Card').agg({
-            'Amount': ['sum', 'mean', 'count']
-        }).round(2)
+        card_summary = cube.spending_by('Card').set_index('Card')[['Amount', 'Average', 'Count']].round(2)
         card_summary.columns = ['Total Spent', 'Avg Transaction', 'Transaction Count']
         card_summary = card_summary.sort_values('Total Spent', ascending=False)
         st.dataframe(card_summary, use_container_width=True)
     else:
         st.info("Upload multiple card statements to see card comparison")
 
-with tab5:
+def render_goals_tab():
     st.subheader("🎯 Goals, Forecasts & Financial Health")
     
     col1, col2 = st.columns(2)
@@ -1778,8 +1105,8 @@ with tab5:
         if not expenses_df.empty:
             # Calculate budget metrics
             budget_data = []
-            for cat in expenses_df['Category'].unique():
-                spent = expenses_df[expenses_df['Category'] == cat]['Amount'].sum()
+            category_spent = cube.spending_by('Category').set_index('Category')['Amount']
+            for cat, spent in category_spent.items():
                 limit = budget_goals.get(cat, 0)
                 if limit > 0:
                     budget_data.append({
@@ -1830,7 +1157,7 @@ with tab5:
         st.markdown("**📈 Spending Forecast (Next 7 Days)**")
         if not expenses_df.empty and len(expenses_df) >= 7:
             # Simple forecast based on recent trend
-            daily_spending = expenses_df.groupby("Date")["Amount"].sum().reset_index()
+            daily_spending = cube.daily_spending()
             recent_avg = daily_spending['Amount'].tail(7).mean()
             
             # Generate forecast dates
@@ -1880,9 +1207,8 @@ with tab5:
         
         with col1:
             # Savings rate
-            income_df = filtered_df[filtered_df['Amount'] > 0]
-            total_income = income_df['Amount'].sum()
-            total_expenses = expenses_df['Amount'].sum()
+            total_income = cube.totals()['Received']
+            total_expenses = cube.totals(expenses=True)['Spent']
             savings_rate = ((total_income - total_expenses) / total_income * 100) if total_income > 0 else 0
             
             fig = go.Figure(go.Indicator(
@@ -2014,8 +1340,8 @@ with tab5:
                         
                         # Show which categories are over
                         over_cats = []
-                        for cat in expenses_df['Category'].unique():
-                            cat_spent = expenses_df[expenses_df['Category'] == cat]['Amount'].sum()
+                        category_spent = cube.spending_by('Category').set_index('Category')['Amount']
+                        for cat, cat_spent in category_spent.items():
                             cat_budget = budget_goals.get(cat, 0)
                             if cat_budget > 0 and cat_spent > cat_budget:
                                 over_cats.append((cat, cat_spent - cat_budget))
@@ -2029,7 +1355,7 @@ with tab5:
         
         with col3:
             # Category diversity (how spread out spending is)
-            cat_spending = expenses_df.groupby('Category')['Amount'].sum()
+            cat_spending = cube.spending_by('Category').set_index('Category')['Amount']
             diversity = len(cat_spending) / 15 * 100  # 15 = total categories
             
             fig = go.Figure(go.Indicator(
@@ -2093,8 +1419,9 @@ with tab5:
         
         with col4:
             # Transaction frequency score
-            days_active = expenses_df['Date'].nunique()
-            total_days = (expenses_df['Date'].max() - expenses_df['Date'].min()).days + 1
+            active_days = cube.daily_spending()['Date']
+            days_active = len(active_days)
+            total_days = (active_days.max() - active_days.min()).days + 1
             frequency_score = days_active / total_days * 100 if total_days > 0 else 0
             
             fig = go.Figure(go.Indicator(
@@ -2163,27 +1490,36 @@ with tab5:
     else:
         st.info("No expense data available")
 
-with tab6:
+# Changing the chart type reruns only this chart, not the whole dashboard
+@st.fragment
+def render_merchant_timeline(merchant_daily):
+    # Add selector for visualization type
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        chart_type = st.radio("Chart Type:", ["Line", "Area", "Scatter"], horizontal=True, key="merchant_chart_type")
+    
+    if chart_type == "Line":
+        fig = px.line(merchant_daily, x='Date', y='Amount', color='Merchant',
+                     markers=True, height=400)
+    elif chart_type == "Area":
+        fig = px.area(merchant_daily, x='Date', y='Amount', color='Merchant', height=400)
+    else:  # Scatter
+        fig = px.scatter(merchant_daily, x='Date', y='Amount', color='Merchant',
+                       size='Amount', height=400)
+    
+    fig.update_layout(hovermode='x unified', legend=dict(orientation="h", yanchor="bottom", y=-0.3))
+    st.plotly_chart(fig, use_container_width=True)
+
+def render_merchants_tab():
     st.subheader("💰 Merchant Insights & Spending Patterns")
     
     if not expenses_df.empty:
         # Filter out payments/credits/refunds from merchant analysis
-        merchant_df = expenses_df[~expenses_df['Category'].isin(['Income/Payments'])].copy()
-        
-        # Also filter out common payment keywords in description
-        payment_keywords = ['payment thank you', 'online payment', 'autopay', 'credit', 'refund', 
-                           'cashback', 'rewards', 'adjustment', 'fee reversal']
-        for keyword in payment_keywords:
-            merchant_df = merchant_df[~merchant_df['Description'].str.lower().str.contains(keyword, na=False)]
+        merchant_df, merchant_totals, merchant_daily, merchant_dow, sunburst_data = results.get(
+            "merchant_insights", view_key, partial(merchant_insights, expenses_df))
         
         if merchant_df.empty:
             st.info("No merchant data available after filtering payments/credits")
-        else:
-            # Calculate merchant metrics
-            merchant_totals = merchant_df.groupby("Description")["Amount"].agg(['sum', 'count', 'mean']).reset_index()
-            merchant_totals.columns = ['Merchant', 'Total', 'Visits', 'Avg']
-            merchant_totals['Loyalty Score'] = merchant_totals['Visits'] * merchant_totals['Total'] / 100
-            merchant_totals = merchant_totals.sort_values('Total', ascending=False)
         
         # Top section: Key insights cards
         st.markdown("### 📊 Key Merchant Insights")
@@ -2316,26 +1652,7 @@ with tab6:
         # Row 2: Spending trends over time
         st.markdown("**📈 Top 10 Merchants - Spending Timeline**")
         
-        # Add selector for visualization type
-        col1, col2 = st.columns([3, 1])
-        with col2:
-            chart_type = st.radio("Chart Type:", ["Line", "Area", "Scatter"], horizontal=True, key="merchant_chart_type")
-        
-        top_10_merchants = merchant_totals.head(10)['Merchant'].tolist()
-        merchant_timeline = merchant_df[merchant_df['Description'].isin(top_10_merchants)]
-        merchant_daily = merchant_timeline.groupby(['Date', 'Description'])['Amount'].sum().reset_index()
-        
-        if chart_type == "Line":
-            fig = px.line(merchant_daily, x='Date', y='Amount', color='Description',
-                         markers=True, height=400)
-        elif chart_type == "Area":
-            fig = px.area(merchant_daily, x='Date', y='Amount', color='Description', height=400)
-        else:  # Scatter
-            fig = px.scatter(merchant_daily, x='Date', y='Amount', color='Description',
-                           size='Amount', height=400)
-        
-        fig.update_layout(hovermode='x unified', legend=dict(orientation="h", yanchor="bottom", y=-0.3))
-        st.plotly_chart(fig, use_container_width=True)
+        render_merchant_timeline(merchant_daily)
         
         # Row 3: Detailed patterns
         st.markdown("**� Detailed Merchant Patterns**")
@@ -2343,12 +1660,9 @@ with tab6:
         
         with col1:
             st.markdown("*Visit Frequency Heatmap (Top 10)*")
-            merchant_dow = merchant_df.groupby(['Description', 'DayOfWeek']).size().reset_index(name='Count')
-            top_10_list = merchant_totals.head(10)['Merchant'].tolist()
-            merchant_dow_filtered = merchant_dow[merchant_dow['Description'].isin(top_10_list)]
             
             day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            pivot = merchant_dow_filtered.pivot(index='Description', columns='DayOfWeek', values='Count').fillna(0)
+            pivot = merchant_dow.pivot(index='Merchant', columns='DayOfWeek', values='Count').fillna(0)
             pivot = pivot.reindex(columns=[d for d in day_order if d in pivot.columns])
             
             # Reorder by total visits
@@ -2373,12 +1687,9 @@ with tab6:
             
             # Create a sunburst chart showing category > merchant breakdown
             if 'Category' in merchant_df.columns:
-                top_10_with_cat = merchant_df[merchant_df['Description'].isin(top_10_list)].copy()
-                sunburst_data = top_10_with_cat.groupby(['Category', 'Description'])['Amount'].sum().reset_index()
-                
                 fig = px.sunburst(
                     sunburst_data,
-                    path=['Category', 'Description'],
+                    path=['Category', 'Merchant'],
                     values='Amount',
                     height=450,
                     color='Amount',
@@ -2417,22 +1728,18 @@ with tab6:
         st.markdown("**📋 Complete Merchant Analysis Table**")
         
         # Create a rich dataframe with all metrics
-        merchant_table = merchant_totals.head(20).copy()
-        merchant_table['Total'] = merchant_table['Total'].apply(lambda x: f"${x:.2f}")
-        merchant_table['Avg'] = merchant_table['Avg'].apply(lambda x: f"${x:.2f}")
-        merchant_table['Visits'] = merchant_table['Visits'].astype(int)
-        merchant_table['Loyalty Score'] = merchant_table['Loyalty Score'].apply(lambda x: f"{x:.1f}")
+        merchant_summary = merchant_totals.head(20).copy()
+        merchant_summary['Total'] = merchant_summary['Total'].apply(lambda x: f"${x:.2f}")
+        merchant_summary['Avg'] = merchant_summary['Avg'].apply(lambda x: f"${x:.2f}")
+        merchant_summary['Visits'] = merchant_summary['Visits'].astype(int)
+        merchant_summary['Loyalty Score'] = merchant_summary['Loyalty Score'].apply(lambda x: f"{x:.1f}")
+        merchant_summary['Spend %'] = merchant_summary['Spend %'].apply(lambda x: f"{x:.1f}%")
         
-        # Calculate spend percentage (based on actual merchant spending, not including payments)
-        total_merchant_spend = merchant_df['Amount'].sum()
-        merchant_totals['Spend %'] = (merchant_totals['Total'] / total_merchant_spend * 100).round(1)
-        merchant_table['Spend %'] = merchant_totals.head(20)['Spend %'].apply(lambda x: f"{x:.1f}%")
-        
-        merchant_table = merchant_table.reset_index(drop=True)
-        merchant_table.index = merchant_table.index + 1
+        merchant_summary = merchant_summary.reset_index(drop=True)
+        merchant_summary.index = merchant_summary.index + 1
         
         st.dataframe(
-            merchant_table[['Merchant', 'Total', 'Visits', 'Avg', 'Spend %', 'Loyalty Score']],
+            merchant_summary[['Merchant', 'Total', 'Visits', 'Avg', 'Spend %', 'Loyalty Score']],
             use_container_width=True,
             height=400
         )
@@ -2440,18 +1747,47 @@ with tab6:
     else:
         st.info("No merchant data available")
 
+DASHBOARD_TABS = {
+    "📊 Overview": render_overview_tab,
+    "📅 Time Patterns": render_time_patterns_tab,
+    "🏷️ Categories": render_categories_tab,
+    "💳 Cards": render_cards_tab,
+    "🎯 Goals & Forecasts": render_goals_tab,
+    "💰 Merchant Insights": render_merchants_tab,
+}
+
+# The selected tab is kept under its own key so it survives reruns where the picker isn't drawn
+st.session_state.setdefault('active_tab', next(iter(DASHBOARD_TABS)))
+
+def remember_active_tab():
+    st.session_state.active_tab = st.session_state._active_tab
+
+lazy_tabs = st.sidebar.toggle("⚡ Render only the selected tab", value=True,
+                              help="Compute and draw just the tab you are looking at. Other tabs are "
+                                   "computed the first time you open them and cached after that.")
+if lazy_tabs:
+    st.session_state._active_tab = st.session_state.active_tab
+    st.radio("Dashboard tab", list(DASHBOARD_TABS), key="_active_tab", horizontal=True,
+             on_change=remember_active_tab, label_visibility="collapsed")
+    DASHBOARD_TABS[st.session_state.active_tab]()
+else:
+    tabs = st.tabs(list(DASHBOARD_TABS), default=st.session_state.active_tab)
+    for tab, render_tab in zip(tabs, DASHBOARD_TABS.values()):
+        with tab:
+            render_tab()
+
 st.divider()
 
 # Budget Tracking Section (moved to bottom)
 st.header("💰 Budget Management")
 
 # Budget tracking display (budget_goals already defined in sidebar above)
-for cat in sorted(filtered_df["Category"].unique()):
+category_flows = cube.rollup("Category").set_index("Category")
+for cat in category_flows.index:
     if cat == "Income/Payments":
         continue
         
-    cat_data = filtered_df[filtered_df["Category"] == cat]
-    spent = abs(cat_data[cat_data["Amount"] < 0]["Amount"].sum())
+    spent = category_flows.at[cat, "Spent"]
     limit = budget_goals.get(cat, 0)
     
     if limit > 0:
@@ -2496,9 +1832,9 @@ with col2:
 
 with col3:
     if budget_goals:
-        over_budget_cats = [cat for cat in filtered_df["Category"].unique() 
+        over_budget_cats = [cat for cat in category_flows.index
                            if budget_goals.get(cat, 0) > 0 and 
-                           abs(filtered_df[filtered_df["Category"] == cat]["Amount"].sum()) > budget_goals.get(cat, 0)]
+                           abs(category_flows.at[cat, "Received"] - category_flows.at[cat, "Spent"]) > budget_goals.get(cat, 0)]
         
         if over_budget_cats:
             st.error(f"⚠️ {len(over_budget_cats)} categor{'y' if len(over_budget_cats)==1 else 'ies'} over budget")
@@ -2512,65 +1848,79 @@ st.divider()
 # Transactions Table
 st.header("📋 Transaction Details")
 
-# Add search and additional filters
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    search_term = st.text_input("🔍 Search transactions", "")
+# Searching, filtering and sorting rerun only this table, against the cached filtered data
+@st.fragment
+def render_transaction_table(filtered_df, view_key):
+    # Add search and additional filters
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        search_term = st.text_input("🔍 Search transactions", "")
+    
+    with col2:
+        transaction_type = st.selectbox("Transaction Type", ["All", "Expenses (Negative)", "Payments/Credits (Positive)"])
+    
+    with col3:
+        sort_by = st.selectbox("Sort by", list(TABLE_SORTS))
+    
+    # Apply search and filters as one row mask; the search runs over unique descriptions only
+    keep = np.ones(len(filtered_df), dtype=bool)
+    if search_term:
+        codes, uniques = results.get("description_codes", view_key, partial(pd.factorize, filtered_df['Description']))
+        matches = pd.Series(uniques, dtype=object).str.contains(search_term, case=False).to_numpy(dtype=bool)
+        keep &= np.append(matches, False)[codes]
+    
+    if transaction_type == "Expenses (Negative)":
+        keep &= filtered_df['Amount'].to_numpy() < 0
+    elif transaction_type == "Payments/Credits (Positive)":
+        keep &= filtered_df['Amount'].to_numpy() > 0
+    
+    # Apply sorting (the sort order is computed once per data view)
+    order = results.get("table_order", (view_key, sort_by), partial(table_order, filtered_df, sort_by))
+    display_df = filtered_df.iloc[order[keep[order]]]
+    
+    # Keep Date and Amount as native types and let column_config format them
+    st.dataframe(
+        display_df, 
+        use_container_width=True, 
+        hide_index=True,
+        column_config={
+            "Amount": st.column_config.NumberColumn(
+                "Amount",
+                format="$%.2f",
+                help="Transaction amount"
+            ),
+            "Date": st.column_config.DateColumn(
+                "Date",
+                format="YYYY-MM-DD",
+                help="Transaction date"
+            ),
+            "Category_Confidence": st.column_config.ProgressColumn(
+                "Confidence",
+                min_value=0.0,
+                max_value=1.0,
+                help="1.0 for rule matches, otherwise the learned model's probability"
+            ),
+            "Fingerprint": None,
+            "Merchant_ID": None
+        }
+    )
+    
+    # Export option; the internal ID columns stay out of the file
+    csv = results.get("transactions_csv", (view_key, search_term, transaction_type, sort_by),
+                      lambda: display_df.drop(columns=['Fingerprint', 'Merchant_ID'], errors='ignore')
+                      .to_csv(index=False).encode('utf-8'))
+    st.download_button(
+        label="📥 Download Transactions as CSV",
+        data=csv,
+        file_name=f"transactions_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
+        mime="text/csv"
+    )
 
-with col2:
-    transaction_type = st.selectbox("Transaction Type", ["All", "Expenses (Negative)", "Payments/Credits (Positive)"])
+render_transaction_table(filtered_df, view_key)
 
-with col3:
-    sort_by = st.selectbox("Sort by", ["Date (Newest)", "Date (Oldest)", "Amount (High to Low)", "Amount (Low to High)"])
-
-# Apply search and filters
-display_df = filtered_df.copy()
-
-if search_term:
-    display_df = display_df[display_df['Description'].str.contains(search_term, case=False, na=False)]
-
-if transaction_type == "Expenses (Negative)":
-    display_df = display_df[display_df['Amount'] < 0]
-elif transaction_type == "Payments/Credits (Positive)":
-    display_df = display_df[display_df['Amount'] > 0]
-
-# Apply sorting
-if sort_by == "Date (Newest)":
-    display_df = display_df.sort_values('Date', ascending=False)
-elif sort_by == "Date (Oldest)":
-    display_df = display_df.sort_values('Date', ascending=True)
-elif sort_by == "Amount (High to Low)":
-    display_df = display_df.sort_values('Amount', ascending=False)
-elif sort_by == "Amount (Low to High)":
-    display_df = display_df.sort_values('Amount', ascending=True)
-
-# Format the display - keep Amount as numeric for proper sorting
-display_df_formatted = display_df.copy()
-display_df_formatted['Date'] = display_df_formatted['Date'].dt.strftime('%Y-%m-%d')
-# Keep Amount as float but use column_config to format display
-
-st.dataframe(
-    display_df_formatted, 
-    use_container_width=True, 
-    hide_index=True,
-    column_config={
-        "Amount": st.column_config.NumberColumn(
-            "Amount",
-            format="$%.2f",
-            help="Transaction amount"
-        ),
-        "Date": st.column_config.TextColumn(
-            "Date",
-            help="Transaction date"
-        )
-    }
-)
-
-# Export option
-st.download_button(
-    label="📥 Download Transactions as CSV",
-    data=display_df.to_csv(index=False).encode('utf-8'),
-    file_name=f"transactions_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
-    mime="text/csv"
-)
+# How well the derived-results cache is doing (counts cover every session of this server)
+cache_stats = results.stats()
+st.sidebar.caption(f"⚡ Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                   f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} entries, "
+                   f"{cache_stats['bytes'] / 2**20:.1f} MB")
@@ -0,0 +1,398 @@
+"""Rule-based transaction categorization.
+
+Kept free of Streamlit so the dashboard and the batch ingestion CLI share it.
+
+The rules live in ``category_rules.json`` (override with
+``BUDGET_TRACKER_RULES``) and are hot-reloaded: ``current_rules()`` notices
+when the file changes and recompiles it, so running sessions pick up edits
+on their next rerun. Each rule has:
+
+* ``category`` and, optionally, a numeric ``priority`` (lower wins; rules
+  without one keep their file order after those with one)
+* ``keywords``: plain substrings, matched case-insensitively
+* ``patterns``: regular expressions (RE2 syntax, no lookaround) matched
+  against the lowercased description
+* ``exceptions``: checked in order when the rule matches. One fires when
+  the description contains every ``when_all`` keyword and at least one
+  ``when_any`` keyword; it then either assigns its own ``category`` or,
+  with ``"skip": true``, lets lower-priority rules have a go.
+
+Each rule compiles into a single alternation and a whole column is
+categorized with one vectorized search per rule; the first matching rule
+wins, and descriptions matching nothing get ``default``.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, replace
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from descriptions import map_unique
+
+DEFAULT_RULES_PATH = Path(os.environ.get("BUDGET_TRACKER_RULES", Path(__file__).with_name("category_rules.json")))
+
+
+@dataclass(frozen=True)
+class RuleException:
+    when_all: tuple  # keywords that must all match
+    when_any: tuple  # keywords, one of which must match
+    category: str    # None skips the rule
+
+    @cached_property
+    def when_all_patterns(self):
+        return tuple(re.escape(keyword) for keyword in self.when_all)
+
+    @cached_property
+    def when_any_pattern(self):
+        return _keyword_pattern(self.when_any)
+
+
+@dataclass(frozen=True)
+class Rule:
+    category: str
+    keywords: tuple
+    patterns: tuple
+    exceptions: tuple
+
+    @cached_property
+    def pattern(self):
+        alternatives = [_keyword_pattern(self.keywords)] if self.keywords else []
+        return "|".join(alternatives + [f"(?:{pattern})" for pattern in self.patterns])
+
+    def terms(self):
+        return {('keyword', keyword) for keyword in self.keywords} | {('pattern', pattern) for pattern in self.patterns}
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    rules: tuple
+    default: str
+    version: str
+    path: Path = None
+    stamp: tuple = None
+    error: str = None  # set when a later edit of the file failed to load
+
+
+def _keyword_pattern(keywords):
+    return "|".join(re.escape(keyword) for keyword in keywords)
+
+
+# Every rule set compiled in this process, so a rules edit can be diffed
+# against the version the memoized categories were computed with
+_rules_by_version = {}
+
+
+def _check_pattern(pattern, where):
+    try:
+        re.compile(pattern)
+        # The vectorized path runs on Arrow, which uses RE2
+        pc.match_substring_regex(pa.array([""]), pattern)
+    except (re.error, pa.ArrowInvalid) as e:
+        raise ValueError(f"{where}: invalid pattern {pattern!r}: {e}") from None
+
+
+def _string_list(spec, key, where):
+    values = spec.get(key, [])
+    if not isinstance(values, list) or not all(isinstance(value, str) and value for value in values):
+        raise ValueError(f"{where}: '{key}' must be a list of non-empty strings")
+    return values
+
+
+def _priority(item):
+    index, rule_spec = item
+    priority = rule_spec.get("priority") if isinstance(rule_spec, dict) else None
+    return (0, priority, index) if isinstance(priority, (int, float)) else (1, 0, index)
+
+
+def compile_rules(spec, path=None, stamp=None):
+    """Compile a rules document (as loaded from JSON) into a ``RuleSet``."""
+    if not isinstance(spec, dict) or not isinstance(spec.get("rules"), list):
+        raise ValueError("rules file must be an object with a 'rules' list")
+    rules = []
+    for index, rule_spec in sorted(enumerate(spec["rules"]), key=_priority):
+        where = f"rule {index + 1}"
+        if not isinstance(rule_spec, dict) or not isinstance(rule_spec.get("category"), str):
+            raise ValueError(f"{where}: needs a 'category'")
+        where = f"rule {index + 1} ({rule_spec['category']})"
+
+        keywords = tuple(keyword.lower() for keyword in _string_list(rule_spec, "keywords", where))
+        patterns = tuple(_string_list(rule_spec, "patterns", where))
+        for pattern in patterns:
+            _check_pattern(pattern, where)
+        if not keywords and not patterns:
+            raise ValueError(f"{where}: needs 'keywords' or 'patterns'")
+
+        exceptions = []
+        for exception_spec in rule_spec.get("exceptions", []):
+            when_all = tuple(keyword.lower() for keyword in _string_list(exception_spec, "when_all", where))
+            when_any = tuple(keyword.lower() for keyword in _string_list(exception_spec, "when_any", where))
+            if not when_all and not when_any:
+                raise ValueError(f"{where}: an exception needs 'when_all' or 'when_any'")
+            if exception_spec.get("skip"):
+                category = None
+            elif isinstance(exception_spec.get("category"), str):
+                category = exception_spec["category"]
+            else:
+                raise ValueError(f"{where}: an exception needs a 'category' or \"skip\": true")
+            exceptions.append(RuleException(when_all, when_any, category))
+        rules.append(Rule(rule_spec["category"], keywords, patterns, tuple(exceptions)))
+
+    default = spec.get("default", "Other")
+    version = hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+    rule_set = RuleSet(tuple(rules), default, version, path, stamp)
+    _rules_by_version.setdefault(version, rule_set)
+    return rule_set
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_rules(path=DEFAULT_RULES_PATH):
+    path = Path(path)
+    stamp = _file_stamp(path)
+    try:
+        spec = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path.name}: {e}") from None
+    return compile_rules(spec, path, stamp)
+
+
+_rules_lock = threading.Lock()
+_loaded_rules = {}
+
+
+def current_rules(path=DEFAULT_RULES_PATH):
+    """The compiled rules in ``path``, recompiled whenever the file changes.
+
+    If an edit makes the file invalid, the last good rules stay in effect
+    and the returned ``RuleSet.error`` says what is wrong.
+    """
+    path = Path(path)
+    with _rules_lock:
+        previous = _loaded_rules.get(path)
+        try:
+            stamp = _file_stamp(path)
+        except OSError as e:
+            if previous is None:
+                raise
+            return replace(previous, error=str(e))
+        if previous is not None and previous.stamp == stamp:
+            return previous
+        try:
+            rules = load_rules(path)
+        except (OSError, ValueError) as e:
+            if previous is None:
+                raise
+            # Keep the new stamp so a broken file isn't re-parsed on every call
+            rules = replace(previous, stamp=stamp, error=str(e))
+        _loaded_rules[path] = rules
+        return rules
+
+
+_regex_cache = {}
+
+
+def _search(pattern, text):
+    regex = _regex_cache.get(pattern)
+    if regex is None:
+        regex = _regex_cache[pattern] = re.compile(pattern)
+    return regex.search(text) is not None
+
+
+def categorize(description, rules=None):
+    rules = rules or current_rules()
+    description_lower = description.lower()
+    for rule in rules.rules:
+        if not _search(rule.pattern, description_lower):
+            continue
+        category = rule.category
+        for exception in rule.exceptions:
+            if all(_search(pattern, description_lower) for pattern in exception.when_all_patterns) and (
+                    not exception.when_any or _search(exception.when_any_pattern, description_lower)):
+                category = exception.category
+                break
+        if category is None:
+            continue  # Skipped by an exception; fall through to lower-priority rules
+        return category
+    return rules.default
+
+
+def categorize_series(descriptions, rules=None):
+    """Vectorized ``categorize`` over a Series of descriptions; returns an object ndarray."""
+    rules = rules or current_rules()
+    # Arrow-backed strings run each alternation as one native regex pass over the column
+    lower = descriptions.fillna("").astype("string[pyarrow]").str.lower()
+
+    def contains(pattern):
+        return lower.str.contains(pattern).to_numpy(dtype=bool, na_value=False)
+
+    conditions, choices = [], []
+    for rule in rules.rules:
+        remaining = contains(rule.pattern)
+        for exception in rule.exceptions:
+            if not remaining.any():
+                break
+            hit = remaining.copy()
+            for pattern in exception.when_all_patterns:
+                hit &= contains(pattern)
+            if exception.when_any:
+                hit &= contains(exception.when_any_pattern)
+            if exception.category is not None:
+                conditions.append(hit)
+                choices.append(exception.category)
+            remaining &= ~hit
+        conditions.append(remaining)
+        choices.append(rule.category)
+    return np.select(conditions, np.array(choices, dtype=object), default=rules.default)
+
+
+class TermIndex:
+    """Inverted index from rule terms to the codes of the unique descriptions containing them.
+
+    A term is ``('keyword', text)`` or ``('pattern', regex)``. Postings are
+    built the first time a term is asked for and extended as descriptions
+    are added, so each (term, description) pair is only ever tested once.
+    """
+
+    def __init__(self):
+        self.descriptions = []
+        self._codes = {}
+        self._lower_chunks = []
+        self._postings = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _match(term, lower):
+        kind, text = term
+        if kind == 'keyword':
+            mask = pc.match_substring(lower, text)
+        else:
+            mask = pc.match_substring_regex(lower, text)
+        return np.flatnonzero(mask.to_numpy(zero_copy_only=False))
+
+    def add(self, descriptions):
+        with self._lock:
+            new = [description for description in dict.fromkeys(descriptions) if description not in self._codes]
+            if not new:
+                return
+            start = len(self.descriptions)
+            self._codes.update((description, start + offset) for offset, description in enumerate(new))
+            self.descriptions.extend(new)
+            lower = pc.utf8_lower(pa.array(new, pa.string()))
+            for term, codes in self._postings.items():
+                self._postings[term] = np.concatenate([codes, start + self._match(term, lower)])
+            self._lower_chunks.append(lower)
+
+    def codes(self, term):
+        with self._lock:
+            if term not in self._postings:
+                lower = pa.chunked_array(self._lower_chunks, pa.string())
+                self._postings[term] = self._match(term, lower) if len(lower) else np.array([], dtype=np.int64)
+            return self._postings[term]
+
+    def code_of(self, description):
+        return self._codes[description]
+
+
+_term_index = TermIndex()
+
+
+def _identified(rules):
+    # Rules have no ids; a category plus its occurrence number stands in for one
+    seen = {}
+    identified = []
+    for rule in rules:
+        seen[rule.category] = seen.get(rule.category, 0) + 1
+        identified.append(((rule.category, seen[rule.category]), rule))
+    return identified
+
+
+def changed_terms(old_rules, new_rules):
+    """Terms whose matching descriptions may be categorized differently under ``new_rules``."""
+    old, new = _identified(old_rules.rules), _identified(new_rules.rules)
+    old_by_id, new_by_id = dict(old), dict(new)
+
+    # Rules that changed position relative to the rules both sets share
+    old_order = [rule_id for rule_id, _ in old if rule_id in new_by_id]
+    new_order = [rule_id for rule_id, _ in new if rule_id in old_by_id]
+    moved = {rule_id for pair in zip(old_order, new_order) if pair[0] != pair[1] for rule_id in pair}
+
+    terms = set()
+    for rule_id in old_by_id.keys() | new_by_id.keys():
+        old_rule, new_rule = old_by_id.get(rule_id), new_by_id.get(rule_id)
+        if old_rule is None or new_rule is None or rule_id in moved or old_rule.exceptions != new_rule.exceptions:
+            # Anything this rule matches (before or after) may now land elsewhere
+            terms |= (old_rule.terms() if old_rule else set()) | (new_rule.terms() if new_rule else set())
+        else:
+            terms |= old_rule.terms() ^ new_rule.terms()
+    return terms
+
+
+def recategorize(categories, old_rules, new_rules, index=_term_index):
+    """Carry ``{description: category}`` computed under ``old_rules`` over to ``new_rules``.
+
+    Only descriptions containing a term that changed between the two rule
+    sets (found through ``index``) are categorized again. Returns the
+    updated dict and the set of categories whose rows changed.
+    """
+    descriptions = list(categories)
+    index.add(descriptions)
+    affected = set()
+    for term in changed_terms(old_rules, new_rules):
+        affected.update(index.codes(term))
+    codes = np.array([index.code_of(description) for description in descriptions], dtype=np.int64)
+    recheck = np.isin(codes, np.fromiter(affected, dtype=np.int64, count=len(affected)))
+    if new_rules.default != old_rules.default:
+        # Descriptions no rule matched take the default
+        recheck |= np.array([category == old_rules.default for category in categories.values()], dtype=bool)
+
+    updated = dict(categories)
+    involved = set()
+    if recheck.any():
+        rechecked = [description for description, flag in zip(descriptions, recheck) if flag]
+        for description, category in zip(rechecked, categorize_series(pd.Series(rechecked, dtype=object), new_rules)):
+            category = str(category)
+            if category != categories[description]:
+                involved.update((categories[description], category))
+                updated[description] = category
+    return updated, involved
+
+
+def _migrate_categories(categories, old_version, new_version):
+    old_rules, new_rules = _rules_by_version.get(old_version), _rules_by_version.get(new_version)
+    if old_rules is None or new_rules is None:
+        return None  # Rules from another process; recompute from scratch
+    updated, _ = recategorize(categories, old_rules, new_rules)
+    return updated
+
+
+def categorize_transactions(df, memo=None, rules=None):
+    """Add a ``Category`` column to ``df`` and fix payment signs, in place.
+
+    Only unique descriptions are categorized; with a ``DescriptionMemo`` only
+    the ones it hasn't seen, and after a rules edit only those the edit can
+    affect.
+    """
+    rules = rules or current_rules()
+    compute = lambda uniques: categorize_series(uniques, rules)
+    if memo is not None:
+        df["Category"] = memo.map(df["Description"], "category", compute, rules.version, rules.default,
+                                  migrate=_migrate_categories)
+    else:
+        df["Category"] = map_unique(df["Description"], compute, rules.default)
+
+    # Fix amount signs: Payments/Credits should be positive (they reduce what you owe)
+    # Expenses should be negative (they increase what you owe)
+    # If a payment is currently negative, flip it to positive
+    df.loc[df["Category"] == "Income/Payments", "Amount"] = df.loc[df["Category"] == "Income/Payments", "Amount"].abs()
+    return df
@@ -0,0 +1,126 @@
+"""Per-description work done once per unique string instead of once per row.
+
+Statement history repeats the same few hundred merchant strings, so
+descriptions are factorized into integer codes plus a dictionary of unique
+strings; a function runs over the uniques only and is broadcast back by
+code. ``DescriptionMemo`` additionally persists derived values (such as the
+category) per description across sessions, so new uploads only pay for
+descriptions that have never been seen.
+"""
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_MEMO_PATH = Path(os.environ.get("BUDGET_TRACKER_DESCRIPTION_MEMO",
+                                        Path.home() / ".budget_tracker" / "descriptions.parquet"))
+
+_VERSIONS_KEY = b"versions"
+
+
+def map_unique(descriptions, func, fill_value=None):
+    """Apply ``func`` (Series of unique strings -> array-like) and broadcast back per row.
+
+    Rows with a missing description get ``fill_value``.
+    """
+    codes, uniques = pd.factorize(descriptions)
+    values = np.asarray(func(pd.Series(uniques, dtype=object)))
+    # One extra slot at the end for code -1 (missing descriptions)
+    return np.append(values, fill_value)[codes]
+
+
+def contains_any(descriptions, keywords):
+    """Case-insensitive "description contains any of ``keywords``" as a row mask."""
+    pattern = "|".join(re.escape(keyword.lower()) for keyword in keywords)
+    return map_unique(descriptions, lambda uniques: uniques.str.lower().str.contains(pattern).to_numpy(dtype=bool),
+                      fill_value=False)
+
+
+class DescriptionMemo:
+    """Persistent description -> value dictionaries, one per named column.
+
+    Each column carries a version (e.g. a hash of the rules that produced
+    it). When the caller's version changes, an optional ``migrate(values,
+    old_version, new_version)`` carries the stored values over (returning
+    None if it can't); otherwise they are dropped and recomputed on demand.
+    """
+
+    def __init__(self, path=DEFAULT_MEMO_PATH):
+        self.path = Path(path)
+        self._columns = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            table = pq.read_table(self.path)
+        except (FileNotFoundError, OSError, pa.ArrowInvalid):
+            return
+        versions = json.loads((table.schema.metadata or {}).get(_VERSIONS_KEY, b"{}"))
+        df = table.to_pandas()
+        for column, version in versions.items():
+            if column not in df.columns:
+                continue
+            known = df[df[column].notna()]
+            self._columns[column] = dict(zip(known["description"], known[column]))
+            self._versions[column] = version
+
+    def _save(self):
+        frame = pd.DataFrame({column: pd.Series(values, dtype=object) for column, values in self._columns.items()})
+        frame.index.name = "description"
+        table = pa.Table.from_pandas(frame.reset_index(), preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_VERSIONS_KEY] = json.dumps(self._versions).encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+
+        # Write to a temp file first so a concurrent reader never sees a partial file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, uniques, column, compute, version, migrate=None):
+        """Return ``column``'s values for ``uniques``, calling ``compute`` only on unseen ones."""
+        uniques = pd.Series(uniques, dtype=object)
+        with self._lock:
+            changed = False
+            old_version = self._versions.get(column)
+            if old_version != version:
+                stored = self._columns.get(column)
+                migrated = migrate(stored, old_version, version) if migrate and stored else None
+                self._columns[column] = migrated if migrated is not None else {}
+                self._versions[column] = version
+                changed = migrated is not None
+            known = self._columns[column]
+            values = uniques.map(known).to_numpy(dtype=object)
+            missing = pd.isna(values)
+            if missing.any():
+                new_uniques = uniques[missing]
+                computed = np.asarray(compute(new_uniques), dtype=object)
+                values[missing] = computed
+                known.update(zip(new_uniques, computed))
+                changed = True
+            if changed:
+                self._save()
+            return values
+
+    def map(self, descriptions, column, compute, version, fill_value=None, migrate=None):
+        """Per-row ``column`` values for a Series of descriptions, via the unique strings."""
+        return map_unique(descriptions, lambda uniques: self.lookup(uniques, column, compute, version, migrate),
+                          fill_value)
+
+    def clear(self):
+        with self._lock:
+            self._columns.clear()
+            self._versions.clear()
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
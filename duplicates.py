@@ -0,0 +1,128 @@
+"""Fuzzy duplicate detection across overlapping statements.
+
+Exact fingerprint matching misses the same purchase reported twice with a
+slightly different description (a monthly statement vs. a year-end summary)
+or a different date (transaction date vs. post date; Barclays and Capital
+One print both but only one is kept). Candidates are blocked by card and
+exact amount within a small date window, found with one sort plus a few
+shifted comparisons, so only rows that could plausibly be the same
+transaction are ever compared. Descriptions are scored only inside those
+blocks. The result is a table of proposed merges for the user to review.
+Only pairs whose wording nearly matches and whose numbers don't disagree are
+pre-ticked: two purchases of the same amount at two branches of a chain
+("STARBUCKS STORE 1234" / "STARBUCKS STORE 5678") are real, and merging
+deletes one from the store for good.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from merchants import normalize_merchants
+
+DEFAULT_DATE_WINDOW = 3  # days
+DEFAULT_MIN_SIMILARITY = 0.5
+AUTO_MERGE_SIMILARITY = 0.8
+
+_DIGITS = re.compile(r"\d+")
+
+
+def _trigrams(description):
+    text = " " + " ".join(_DIGITS.sub(" ", description.lower()).split()) + " "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def conflicting_numbers(left, right):
+    """True if both descriptions carry numbers (store, terminal or reference IDs) and they differ."""
+    left, right = set(_DIGITS.findall(left)), set(_DIGITS.findall(right))
+    return bool(left) and bool(right) and left != right
+
+
+def description_similarity(left, right):
+    """Jaccard similarity of the two descriptions' character trigrams (digits ignored)."""
+    left, right = _trigrams(left), _trigrams(right)
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def candidate_pairs(df, date_window=DEFAULT_DATE_WINDOW):
+    """Row-position pairs (i, j) with the same card and amount, at most ``date_window`` days apart."""
+    cents = np.round(df['Amount'].to_numpy(dtype=np.float64) * 100).astype(np.int64)
+    card = pd.factorize(df['Card_Last4'])[0]
+    days = df['Date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+    order = np.lexsort((days, cents, card))
+    card, cents, days = card[order], cents[order], days[order]
+
+    left, right = [], []
+    # Blocks are contiguous and date-sorted: if no row matches its k-th
+    # neighbour, none can match a farther one
+    for k in range(1, len(order)):
+        same = (card[k:] == card[:-k]) & (cents[k:] == cents[:-k]) & (days[k:] - days[:-k] <= date_window)
+        if not same.any():
+            break
+        positions = np.flatnonzero(same)
+        left.append(order[positions])
+        right.append(order[positions + k])
+    if not left:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    return np.concatenate(left), np.concatenate(right)
+
+
+def find_fuzzy_duplicates(df, date_window=DEFAULT_DATE_WINDOW, min_similarity=DEFAULT_MIN_SIMILARITY):
+    """Proposed merges: one row per candidate pair scoring at least ``min_similarity``.
+
+    ``df`` needs Date, Description, Amount, Card, Card_Last4 and Fingerprint.
+    The earlier row of each pair is kept. Pairs that only resolve to the
+    same canonical merchant are listed but left for the user to decide;
+    ``Merge`` is pre-ticked only for very similar descriptions without
+    conflicting numbers.
+    """
+    columns = ['Merge', 'Similarity', 'Days_Apart', 'Card', 'Amount', 'Keep_Date', 'Keep_Description',
+               'Drop_Date', 'Drop_Description', 'Keep_Fingerprint', 'Drop_Fingerprint']
+    left, right = candidate_pairs(df, date_window)
+    if len(left) == 0:
+        return pd.DataFrame(columns=columns)
+    dates = df['Date'].to_numpy()
+    earlier = dates[left] <= dates[right]
+    keep, drop = np.where(earlier, left, right), np.where(earlier, right, left)
+
+    descriptions = df['Description'].to_numpy(dtype=object)
+    keep_descriptions, drop_descriptions = descriptions[keep], descriptions[drop]
+    # Score each distinct description pair once; recurring charges repeat them a lot
+    scores = {}
+    for pair in zip(keep_descriptions, drop_descriptions):
+        if pair not in scores:
+            scores[pair] = (description_similarity(*pair), conflicting_numbers(*pair))
+    scored = [scores[pair] for pair in zip(keep_descriptions, drop_descriptions)]
+    similarity = np.array([score for score, _ in scored])
+    conflicting = np.array([conflict for _, conflict in scored], dtype=bool)
+    likely_same = ~conflicting & (similarity >= AUTO_MERGE_SIMILARITY)
+    uniques = pd.unique(np.concatenate([keep_descriptions, drop_descriptions]))
+    merchant = dict(zip(uniques, normalize_merchants(pd.Series(uniques, dtype=object))))
+    same_merchant = np.array([merchant[a] == merchant[b] for a, b in zip(keep_descriptions, drop_descriptions)])
+    identical = keep_descriptions == drop_descriptions
+    # The same description on different days is as likely a repeat purchase as a duplicate
+    similarity = np.where(identical, similarity, np.maximum(similarity, np.where(same_merchant, min_similarity, 0.0)))
+
+    pairs = pd.DataFrame({
+        'Merge': ~identical & likely_same,
+        'Similarity': similarity.round(2),
+        'Days_Apart': np.abs((dates[drop] - dates[keep]).astype('timedelta64[D]').astype(np.int64)),
+        'Card': df['Card'].to_numpy(dtype=object)[keep],
+        'Amount': df['Amount'].to_numpy()[keep],
+        'Keep_Date': dates[keep],
+        'Keep_Description': keep_descriptions,
+        'Drop_Date': dates[drop],
+        'Drop_Description': drop_descriptions,
+        'Keep_Fingerprint': df['Fingerprint'].to_numpy()[keep],
+        'Drop_Fingerprint': df['Fingerprint'].to_numpy()[drop],
+    })
+    pairs = pairs[pairs['Similarity'] >= min_similarity]
+    # A row is dropped at most once, in favour of its most similar partner
+    pairs = pairs.sort_values(['Similarity', 'Days_Apart'], ascending=[False, True])
+    pairs = pairs.drop_duplicates('Drop_Fingerprint')
+    pairs = pairs[~pairs['Keep_Fingerprint'].isin(pairs['Drop_Fingerprint'])]
+    # Proposed merges first, then the ones left for the user
+    pairs = pairs.sort_values(['Merge', 'Similarity', 'Keep_Date'], ascending=[False, False, True])
+    return pairs[columns].reset_index(drop=True)
@@ -0,0 +1,80 @@
+"""Indexed date / category / card filtering for the dashboard's sidebar filters.
+
+Applying the filters as boolean masks compares every row against the date
+range and the category and card selections on every rerun, and each masked
+result is a fresh copy. ``FilterIndex`` is built once per data version:
+rows are kept in date order, so a date range is two binary searches and a
+contiguous run of rows, and each category and card gets a packed bitmap
+(one bit per row, in that order). A filter combination resolves to row
+positions by OR-ing the selected values' bitmaps over just the bytes of the
+date range and AND-ing categories with cards; a field whose every value is
+selected is skipped. When nothing but the date range restricts the rows,
+the result is a slice of the stored frame, i.e. a view rather than a copy.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _bitmaps(values):
+    """Packed bitmap per distinct value of an array (None/NaN values get none)."""
+    codes, uniques = pd.factorize(values)
+    return {value: np.packbits(codes == code) for code, value in enumerate(uniques)}
+
+
+class FilterIndex:
+    """Sorted date index plus per-category and per-card bitmaps over a frame's rows."""
+
+    def __init__(self, df):
+        dates = df['Date'].to_numpy(dtype='datetime64[ns]')
+        # Most sources (the archive, the store) already load in date order
+        if not (np.diff(dates.view(np.int64)) >= 0).all() or pd.isna(dates).any():
+            order = np.argsort(dates, kind='stable')
+            df, dates = df.iloc[order], dates[order]
+        self.frame = df
+        self._dates = dates
+        self._category_bitmaps = _bitmaps(df['Category'].to_numpy())
+        self._card_bitmaps = _bitmaps(df['Card'].to_numpy()) if 'Card' in df.columns else {}
+
+    @property
+    def categories(self):
+        return list(self._category_bitmaps)
+
+    @property
+    def cards(self):
+        return list(self._card_bitmaps)
+
+    def _date_range(self, start, end):
+        # NaT sorts last and compares greater than any end date, so it never lands inside
+        lo = 0 if start is None else int(np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start)), 'left'))
+        hi = len(self._dates) if end is None else int(np.searchsorted(self._dates, np.datetime64(pd.Timestamp(end)), 'right'))
+        return lo, max(lo, hi)
+
+    def positions(self, start=None, end=None, categories=None, cards=None):
+        """Rows (positions in ``frame``) dated within [start, end] with one of the given categories and cards.
+
+        ``None`` means no restriction for that field. Returns a ``slice``
+        when the result is one contiguous run, otherwise an int array.
+        """
+        lo, hi = self._date_range(start, end)
+        first_byte, last_byte = lo // 8, -(-hi // 8)
+        selected = None
+        for values, bitmaps in ((categories, self._category_bitmaps), (cards, self._card_bitmaps)):
+            if values is None or not bitmaps:
+                continue
+            wanted = [bitmaps[value] for value in set(values) if value in bitmaps]
+            if len(wanted) == len(bitmaps):
+                continue
+            field = np.zeros(last_byte - first_byte, dtype=np.uint8)
+            for bitmap in wanted:
+                field |= bitmap[first_byte:last_byte]
+            selected = field if selected is None else selected & field
+        if selected is None:
+            return slice(lo, hi)
+        offset = first_byte * 8
+        bits = np.unpackbits(selected)[lo - offset:hi - offset]
+        return lo + np.flatnonzero(bits)
+
+    def select(self, start=None, end=None, categories=None, cards=None):
+        """The filtered rows of ``frame``: a view when only the date range applies, otherwise a copy."""
+        rows = self.positions(start, end, categories, cards)
+        return self.frame.iloc[rows]
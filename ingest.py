@@ -0,0 +1,301 @@
+"""Parallel statement ingestion.
+
+Uploaded PDFs are parsed in a process pool so a batch of statements uses
+every core instead of one. Results come back in the original upload order.
+A PDF that raises, hangs past its deadline, or kills its worker process is
+reported as a failed file instead of taking the whole batch down.
+
+Also runnable headless, without Streamlit, to ingest a folder or archive::
+
+    python ingest.py statements/ -o transactions.csv
+    python ingest.py statements.zip -o transactions.parquet
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from categorizer import DEFAULT_RULES_PATH, categorize_transactions, load_rules
+from classifier import DEFAULT_MIN_CONFIDENCE, classify_uncategorized
+from descriptions import DescriptionMemo
+from parse_cache import ParseCache
+from store import DEFAULT_STORE_PATH, TransactionStore, transaction_fingerprints
+from statement_parser import PARSER_VERSION, parse_pdf_bytes
+
+# Seconds a single statement may take before it is treated as pathological
+DEFAULT_TIMEOUT = 120
+# Seconds between checks of running statements against the timeout
+POLL_INTERVAL = 0.25
+
+
+def _default_workers():
+    return max(1, os.cpu_count() or 1)
+
+
+def _kill_workers(executor):
+    # ProcessPoolExecutor has no public way to stop a running task
+    for process in list((executor._processes or {}).values()):
+        if process.is_alive():
+            process.terminate()
+
+
+def _run_pool(jobs, parser, max_workers, timeout, on_done):
+    """Parse ``jobs`` ([(index, pdf_bytes)]), at most ``max_workers`` at a time.
+
+    Each concurrent slot is a single-process pool of its own, so a statement
+    that runs past ``timeout`` (counted from when its slot picked it up) or
+    kills its process is charged to that statement alone: only its process is
+    terminated, the other slots keep working, and the slot is replaced for the
+    next job. A fresh slot's clock starts once its process has answered a
+    warm-up call, so interpreter start-up isn't billed to the statement.
+    Returns the indices whose worker died.
+    """
+    # spawn keeps workers clean of the Streamlit server's threads and state
+    context = multiprocessing.get_context("spawn")
+    queued = list(reversed(jobs))  # popped from the end, so jobs start in upload order
+    running = {}  # future -> [index, started (None until the slot is warm), executor, warm-up future]
+    idle = []
+    crashed = []
+    try:
+        while queued or running:
+            while queued and len(running) < max_workers:
+                index, pdf_bytes = queued.pop()
+                if idle:
+                    executor, warm_up = idle.pop(), None
+                else:
+                    executor = ProcessPoolExecutor(max_workers=1, mp_context=context)
+                    warm_up = executor.submit(os.getpid)
+                # A page-level pool would be a grandchild _kill_workers can't reach
+                future = executor.submit(parser, pdf_bytes, 1)
+                running[future] = [index, None if warm_up else time.monotonic(), executor, warm_up]
+            warming = [entry[3] for entry in running.values() if entry[1] is None]
+            done, _ = wait([*running, *warming], timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for entry in running.values():
+                if entry[1] is None and entry[3].done():
+                    entry[1] = now
+            for future in done:
+                if future not in running:
+                    continue
+                index, _, executor, _ = running.pop(future)
+                try:
+                    on_done(index, future.result(), None)
+                except BrokenProcessPool:
+                    crashed.append(index)
+                    executor.shutdown(wait=False)
+                    continue
+                except Exception as e:
+                    on_done(index, None, f"{type(e).__name__}: {e}")
+                idle.append(executor)
+            for future, (index, started, executor, _) in list(running.items()):
+                if started is not None and now - started > timeout and not future.done():
+                    del running[future]
+                    on_done(index, None, f"Timed out after {timeout}s")
+                    _kill_workers(executor)
+                    executor.shutdown(wait=False, cancel_futures=True)
+    finally:
+        for executor in idle + [entry[2] for entry in running.values()]:
+            executor.shutdown(wait=False, cancel_futures=True)
+    return crashed
+
+
+def ingest_statements(files, cache=None, parser=parse_pdf_bytes, max_workers=None,
+                      timeout=DEFAULT_TIMEOUT, on_progress=None):
+    """Parse ``files`` ([(name, pdf_bytes)]) in parallel.
+
+    ``parser(pdf_bytes, page_workers)`` runs in the worker processes, always
+    with ``page_workers=1``; ``timeout`` is the number of seconds each file
+    may take.
+    Returns a list of ``(df, card_info, error)`` in the same order as ``files``;
+    ``error`` is None on success. Cache hits are served in-process and only
+    misses are sent to the pool. ``on_progress(done, total, name)`` is called
+    from the calling thread as each file finishes.
+    """
+    max_workers = max_workers or _default_workers()
+    results = [None] * len(files)
+    done_count = 0
+
+    def on_done(index, result, error, from_cache=False):
+        nonlocal done_count
+        name, pdf_bytes = files[index]
+        if error is None:
+            df, card_info = result
+            if cache is not None and not from_cache and df is not None and len(df) > 0:
+                cache.put(cache.key_for(pdf_bytes), df, card_info)
+            results[index] = (df, card_info, None)
+        else:
+            results[index] = (None, None, error)
+        done_count += 1
+        if on_progress:
+            on_progress(done_count, len(files), name)
+
+    jobs = []
+    for index, (name, pdf_bytes) in enumerate(files):
+        cached = cache.get(cache.key_for(pdf_bytes)) if cache is not None else None
+        if cached is not None:
+            on_done(index, cached, None, from_cache=True)
+        else:
+            jobs.append((index, pdf_bytes))
+
+    if jobs:
+        crashed = _run_pool(jobs, parser, max_workers, timeout, on_done)
+        # A worker can also die for reasons outside its file (the OOM killer picking
+        # it, say), so a crashed file gets one more try before it is reported
+        pending_bytes = dict(jobs)
+        for index in crashed:
+            if _run_pool([(index, pending_bytes[index])], parser, max_workers, timeout, on_done):
+                on_done(index, None, "Parser process crashed")
+
+    return results
+
+
+def consolidate_statements(statements, memo=None, rules=None, known=None):
+    """Combine parsed statements ([(df, card_info)]) into one categorized frame.
+
+    Returns ``(df, duplicates_removed, file_stats)``. Each row gets a stable
+    ``Fingerprint`` (taken before categorization adjusts payment signs) and
+    rows repeated across overlapping statements of the same card are kept
+    once. ``file_stats`` has a ``{'rows', 'new', 'duplicates'}`` dict per
+    statement, where a row is new unless it already appeared earlier in the
+    batch or its fingerprint is in ``known`` (e.g. the store's fingerprint
+    index). ``memo`` (a ``DescriptionMemo``) remembers categories of
+    descriptions seen before; ``rules`` defaults to the current category
+    rules file.
+    """
+    frames = []
+    file_stats = []
+    seen = set()
+    known = known if known is not None else set()
+    for df, card_info in statements:
+        df = df.copy()
+        df['Card'] = f"{card_info['card_name']} (...{card_info['last_4_digits']})"
+        df['Card_Last4'] = card_info['last_4_digits']
+        df['Fingerprint'] = transaction_fingerprints(df)
+        fingerprints = df['Fingerprint'].tolist()
+        # Hash lookups only: O(1) per row against the batch so far and the history
+        first = ~df['Fingerprint'].duplicated().to_numpy()
+        first &= np.fromiter((fingerprint not in seen for fingerprint in fingerprints), dtype=bool, count=len(df))
+        seen.update(fingerprints)
+        new = sum(1 for fingerprint, keep in zip(fingerprints, first) if keep and fingerprint not in known)
+        file_stats.append({'rows': len(df), 'new': new, 'duplicates': len(df) - new})
+        frames.append(df[first])
+    df = pd.concat(frames, ignore_index=True)
+    duplicates_removed = sum(stats['rows'] for stats in file_stats) - len(df)
+    
+    categorize_transactions(df, memo, rules)
+    return df.sort_values('Date').reset_index(drop=True), duplicates_removed, file_stats
+
+
+def _is_pdf(name):
+    return name.lower().endswith(".pdf")
+
+
+def read_statement_files(source):
+    """Load ``[(name, pdf_bytes)]`` from a directory, .zip or tar archive."""
+    source = Path(source)
+    if source.is_dir():
+        paths = sorted(path for path in source.rglob("*") if path.is_file() and _is_pdf(path.name))
+        return [(str(path.relative_to(source)), path.read_bytes()) for path in paths]
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = sorted(name for name in archive.namelist() if _is_pdf(name) and not name.endswith("/"))
+            return [(name, archive.read(name)) for name in names]
+    if tarfile.is_tarfile(source):
+        with tarfile.open(source, "r:*") as archive:
+            members = sorted((m for m in archive.getmembers() if m.isfile() and _is_pdf(m.name)), key=lambda m: m.name)
+            return [(member.name, archive.extractfile(member).read()) for member in members]
+    raise ValueError(f"{source} is not a directory, zip or tar archive")
+
+
+def write_dataset(df, output):
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.suffix == ".parquet":
+        df.to_parquet(output, index=False)
+    else:
+        df.to_csv(output, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse a folder or archive of statement PDFs into one categorized dataset.")
+    parser.add_argument("source", help="directory, .zip or .tar(.gz/.bz2/.xz) of statement PDFs")
+    parser.add_argument("-o", "--output", default="transactions.csv", help="output .csv or .parquet (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--rules", default=DEFAULT_RULES_PATH, help="category rules file (default: %(default)s)")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="seconds allowed per statement (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore the on-disk parse cache and description memo, e.g. when measuring throughput")
+    parser.add_argument("--classify-other", nargs="?", type=float, const=DEFAULT_MIN_CONFIDENCE, default=None,
+                        metavar="MIN_CONFIDENCE",
+                        help="categorize rows no rule matched with a model trained on the others "
+                             "(default confidence: %(const)s)")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_PATH, default=None, metavar="PATH",
+                        help="also add the transactions to the dashboard's history (default: %(const)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        rules = load_rules(args.rules)
+        files = read_statement_files(args.source)
+    except (OSError, ValueError, zipfile.BadZipFile, tarfile.TarError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if not files:
+        print(f"error: no PDF files found in {args.source}", file=sys.stderr)
+        return 2
+
+    cache = None if args.no_cache else ParseCache(PARSER_VERSION)
+    start = time.perf_counter()
+    results = ingest_statements(files, cache=cache, max_workers=args.workers, timeout=args.timeout)
+    elapsed = time.perf_counter() - start
+
+    statements = []
+    stored_card_info = []
+    page_count = 0
+    failed = 0
+    for (name, _), (df, card_info, error) in zip(files, results):
+        if error:
+            print(f"failed: {name}: {error}", file=sys.stderr)
+            failed += 1
+            continue
+        page_count += card_info.get('page_count', 0)
+        if df is None or len(df) == 0:
+            print(f"no transactions: {name}", file=sys.stderr)
+            continue
+        statements.append((df, card_info))
+        stored_card_info.append({**card_info, 'filename': name})
+
+    row_count = sum(len(df) for df, _ in statements)
+    print(f"Parsed {len(files) - failed}/{len(files)} statement(s): {page_count} pages, {row_count} rows in {elapsed:.2f}s "
+          f"({page_count / elapsed:.1f} pages/s, {row_count / elapsed:.1f} rows/s)")
+    if not statements:
+        print("error: no transactions extracted", file=sys.stderr)
+        return 1
+
+    store = TransactionStore(args.store) if args.store is not None else None
+    df, duplicates_removed, file_stats = consolidate_statements(
+        statements, memo=None if args.no_cache else DescriptionMemo(), rules=rules,
+        known=store.known_fingerprints() if store is not None else None)
+    for stats, card_info in zip(file_stats, stored_card_info):
+        print(f"  {card_info['filename']}: {stats['rows']} rows, {stats['new']} new, {stats['duplicates']} duplicate(s)")
+    if args.classify_other is not None:
+        guessed = classify_uncategorized(df, default=rules.default, min_confidence=args.classify_other)
+        print(f"Categorized {guessed} of {rules.default!r} row(s) with the learned model")
+    write_dataset(df, args.output)
+    print(f"Wrote {len(df)} transactions to {args.output} ({duplicates_removed} duplicate(s) removed)")
+    if store is not None:
+        added = store.upsert(df, stored_card_info)
+        print(f"Added {added} new transaction(s) to {args.store}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
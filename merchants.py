@@ -0,0 +1,155 @@
+"""Canonical merchants for raw statement descriptions.
+
+Issuers decorate the same merchant differently ("AMAZON MKTPL*AB12CD",
+"AMZN Mktp US*XY34", "Amazon.com*ZZ99"), so grouping by ``Description``
+splits one merchant into many. ``normalize_merchants`` reduces descriptions
+to a merchant key with one ordered list of token rules, applied as
+vectorized regex replacements over a column of unique descriptions.
+``MerchantTable`` assigns each key a small integer ID that is persisted, so
+IDs stay stable across sessions and charts can group on an int column
+instead of long strings.
+"""
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from descriptions import map_unique
+
+DEFAULT_MERCHANTS_PATH = Path(os.environ.get("BUDGET_TRACKER_MERCHANTS",
+                                             Path.home() / ".budget_tracker" / "merchants.parquet"))
+
+# Bump when the rules below change; memoized description -> key results are then recomputed
+NORMALIZER_VERSION = 1
+
+_STATES = ("al|ak|az|ar|ca|co|ct|de|fl|ga|hi|id|il|in|ia|ks|ky|la|me|md|ma|mi|mn|ms|mo|mt|ne|nv|nh|nj|nm|ny|"
+           "nc|nd|oh|ok|or|pa|ri|sc|sd|tn|tx|ut|vt|va|wa|wv|wi|wy|dc")
+
+# Applied in order to the lowercased description
+TOKEN_RULES = [
+    (r"^(sq|tst|sp|pp|py|in|ckc|gglpay|paypal)\s*\*\s*", ""),   # payment processor prefixes
+    (r"^(pos|dbt|debit|checkcard|recurring)\s+", ""),             # bank card-purchase prefixes
+    (r"\*.*$", ""),                                              # reference codes after '*'
+    (r"\b\d{3}[-. ]\d{3}[-. ]\d{4}\b", " "),                     # phone numbers
+    (r"\.(com|net|org)\b", " "),                                 # domains
+    (r"\b(store|str|no)\s*#?\s*\d+", " "),                       # store numbers
+    (r"#\s*\d+", " "),
+    (r"\b\w*\d\w*\b", " "),                                      # date stamps, zips, codes
+    (r"\s(" + _STATES + r")\s+usa\s*$", " "),                    # "CA USA" location suffix
+    (r"\busa\s*$", " "),
+    (r"[^a-z&]+", " "),
+    (r"\b(mktp|mktpl|mktplace|marketplace|us|inc|llc|corp|co|com|online|purchase)\b", " "),
+    (r"^\s*the\s", " "),
+    (r"\s(" + _STATES + r")\s*$", " "),                          # trailing state code
+    (r"\s+", " "),
+]
+
+# Known merchants whose key starts with one of several spellings; the first match wins
+ALIASES = [
+    (r"^(?:amazon|amzn)\b", "amazon"),
+    (r"^(?:wal mart|walmart|wm supercenter)\b", "walmart"),
+    (r"^(?:uber eats|ubereats)\b", "uber eats"),
+    (r"^uber\b", "uber"),
+    (r"^lyft\b", "lyft"),
+    (r"^home depot\b", "home depot"),
+    (r"^(?:lowes|lowe s)\b", "lowe's"),
+    (r"^costco\b", "costco"),
+    (r"^(?:target|tgt)\b", "target"),
+    (r"^starbucks\b", "starbucks"),
+    (r"^netflix\b", "netflix"),
+    (r"^(?:apple|itunes)\b", "apple"),
+    (r"^google\b", "google"),
+    (r"^kroger\b", "kroger"),
+    (r"^cvs\b", "cvs"),
+    (r"^walgreens\b", "walgreens"),
+    (r"^shell\b", "shell"),
+]
+
+MAX_KEY_TOKENS = 3
+
+
+def normalize_merchants(descriptions):
+    """Merchant key for each description in a Series (vectorized; pass unique descriptions)."""
+    keys = pd.Series(descriptions, dtype="string[pyarrow]").str.lower()
+    for pattern, replacement in TOKEN_RULES:
+        keys = keys.str.replace(pattern, replacement, regex=True)
+    keys = keys.str.strip()
+    canonical = pd.Series(pd.NA, index=keys.index, dtype="string[pyarrow]")
+    for pattern, merchant in ALIASES:
+        canonical = canonical.mask(canonical.isna() & keys.str.contains(pattern, regex=True).fillna(False), merchant)
+    keys = canonical.fillna(keys.str.split(" ", n=MAX_KEY_TOKENS).str[:MAX_KEY_TOKENS].str.join(" "))
+    # Nothing left (e.g. a description that was all codes): fall back to the raw text
+    raw = pd.Series(descriptions, dtype="string[pyarrow]").str.lower().str.strip()
+    return keys.mask(keys.isna() | (keys == ""), raw).to_numpy(dtype=object)
+
+
+class MerchantTable:
+    """Persistent merchant key -> integer ID assignment, plus display names.
+
+    IDs are dense (0, 1, 2, ...), index ``names`` directly and are never
+    reused, so a Merchant_ID column stays valid across sessions.
+    """
+
+    def __init__(self, path=DEFAULT_MERCHANTS_PATH):
+        self.path = Path(path)
+        self.keys = []
+        self._ids = {}
+        self._names = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            table = pq.read_table(self.path)
+        except (FileNotFoundError, OSError, pa.ArrowInvalid):
+            return
+        self.keys = table.column("key").to_pylist()
+        self._ids = {key: merchant_id for merchant_id, key in enumerate(self.keys)}
+
+    def _save(self):
+        table = pa.table({"key": pa.array(self.keys, pa.string())})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, self.path)
+
+    def ids(self, keys):
+        """IDs for an array of merchant keys, assigning (and saving) new ones as needed."""
+        with self._lock:
+            new = [key for key in dict.fromkeys(keys) if key not in self._ids]
+            if new:
+                self._ids.update((key, len(self.keys) + offset) for offset, key in enumerate(new))
+                self.keys.extend(new)
+                self._names = None
+                self._save()
+            return np.fromiter((self._ids[key] for key in keys), dtype=np.int32, count=len(keys))
+
+    def names(self, merchant_ids):
+        """Display names for an array of merchant IDs."""
+        if self._names is None:
+            # Short single words are usually acronyms (CVS, BP)
+            names = [key.upper() if len(key) <= 3 else " ".join(word.capitalize() for word in key.split())
+                     for key in self.keys]
+            self._names = np.array(names + ["Unknown"], dtype=object)
+        # -1 (no description) lands on the trailing "Unknown"
+        return self._names[np.asarray(merchant_ids)]
+
+
+def merchant_ids(descriptions, table, memo=None):
+    """Merchant ID per row of a description Series; -1 where the description is missing.
+
+    With a ``DescriptionMemo`` the description -> key normalization is
+    remembered across sessions too.
+    """
+    def compute(uniques):
+        if memo is not None:
+            keys = memo.lookup(uniques, "merchant", normalize_merchants, NORMALIZER_VERSION)
+        else:
+            keys = normalize_merchants(uniques)
+        return table.ids(keys)
+
+    return map_unique(descriptions, compute, fill_value=-1).astype(np.int32)
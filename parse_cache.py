@@ -0,0 +1,122 @@
+"""On-disk cache of parsed statements.
+
+Each parsed PDF is stored as a single Parquet file named after the SHA-256 of
+the PDF bytes plus the parser version. The transactions DataFrame is the
+table body and the ``card_info`` dict travels in the file's schema metadata,
+so a cache hit never touches pdfplumber. Total cache size is bounded and the
+least recently used entries are evicted first (file mtime is refreshed on
+every hit).
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("BUDGET_TRACKER_CACHE_DIR", Path.home() / ".budget_tracker" / "parse_cache"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+_CARD_INFO_KEY = b"card_info"
+_DATE_FIELDS = ("statement_date", "due_date")
+
+
+def _encode_card_info(card_info):
+    encoded = {}
+    for key, value in card_info.items():
+        if key in _DATE_FIELDS and value is not None:
+            value = pd.Timestamp(value).isoformat()
+        encoded[key] = value
+    return json.dumps(encoded).encode("utf-8")
+
+
+def _decode_card_info(raw):
+    card_info = json.loads(raw.decode("utf-8"))
+    for key in _DATE_FIELDS:
+        if card_info.get(key):
+            card_info[key] = pd.Timestamp(card_info[key])
+    return card_info
+
+
+class ParseCache:
+    def __init__(self, parser_version, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.parser_version = str(parser_version)
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key_for(self, pdf_bytes):
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        return f"{digest}-v{self.parser_version}"
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.parquet"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            table = pq.read_table(path)
+        except (FileNotFoundError, OSError, pa.ArrowInvalid):
+            return None
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        card_info = _decode_card_info(table.schema.metadata[_CARD_INFO_KEY])
+        return table.to_pandas(), card_info
+
+    def put(self, key, df, card_info):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_CARD_INFO_KEY] = _encode_card_info(card_info)
+        table = table.replace_schema_metadata(metadata)
+
+        # Write to a temp file first so concurrent readers never see a partial entry
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def get_or_parse(self, pdf_bytes, parser):
+        """Return ``(df, card_info)`` for ``pdf_bytes``, parsing only on a cache miss."""
+        key = self.key_for(pdf_bytes)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        df, card_info = parser(pdf_bytes)
+        # Only successful parses are cached; failures keep showing their debug output
+        if df is not None and len(df) > 0:
+            self.put(key, df, card_info)
+        return df, card_info
+
+    def evict(self):
+        entries = []
+        for path in self.cache_dir.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        # Oldest access time first
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for path in self.cache_dir.glob("*.parquet"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,99 @@
+"""Bounded LRU cache for frames and values derived from the loaded data.
+
+Every widget interaction reruns the whole dashboard script, and without
+caching each rerun rebuilds the filtered frames, the aggregate cube, the
+metric row and the merchant tables even when neither the data nor the
+filters changed (flipping a chart-type radio, say). ``ResultCache``
+remembers those results under a key made of the data version and the
+normalized filter state, so an unchanged (version, filters) pair is a
+dictionary lookup. Entries are evicted least recently used first once their
+estimated size passes a memory budget, and hit/miss/eviction counters show
+how well it is doing.
+
+Cached values are shared between reruns (and sessions): callers must not
+modify them in place.
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = int(os.environ.get("BUDGET_TRACKER_RESULT_CACHE_MB", 512)) * 2**20
+
+
+def data_digest(values):
+    """Short content digest of a numeric array (e.g. the Fingerprint column), for data version IDs."""
+    values = np.ascontiguousarray(np.asarray(values))
+    return hashlib.blake2b(values.view(np.uint8), digest_size=16).hexdigest()
+
+
+def filter_state(start_date, end_date, categories, cards):
+    """Hashable, order-independent form of the sidebar filter selection."""
+    return (pd.Timestamp(start_date), pd.Timestamp(end_date), tuple(sorted(categories)), tuple(sorted(cards)))
+
+
+def estimated_size(value):
+    """Rough byte size of a cached value; frames count their column buffers, not the shared strings."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(index=True, deep=False)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimated_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimated_size(item) for item in value.values())
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimated_size(vars(value))
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Process-wide memo of derived results, bounded by ``max_bytes`` with LRU eviction."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # (name, key) -> (value, size), least recently used first
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, name, key, compute):
+        """The cached ``name`` result for ``key`` (hashable), calling ``compute()`` on a miss."""
+        entry_key = (name, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = compute()
+        size = estimated_size(value)
+        with self._lock:
+            # Something too big to fit is returned but not kept
+            if size <= self.max_bytes and entry_key not in self._entries:
+                self._entries[entry_key] = (value, size)
+                self._size += size
+                while self._size > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._size -= evicted_size
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self._entries), "bytes": self._size}
@@ -0,0 +1,232 @@
+"""Local SQLite store of every transaction and statement seen so far.
+
+The dashboard used to start from nothing on every browser refresh. Now
+consolidated transactions are upserted here and the full history is read
+back on each load. Rows are keyed by a fingerprint of
+(date, description, amount, card last 4), the same identity duplicate
+removal uses, so uploading a statement again adds only the rows that are
+not stored yet. The stored fingerprints are also kept in an in-memory hash
+set, so incoming rows are checked against the whole history in O(1) each
+without touching SQLite. ``revision`` changes on every write, so callers can
+cache the loaded frame until the store actually changes.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_PATH = Path(os.environ.get("BUDGET_TRACKER_STORE",
+                                         Path.home() / ".budget_tracker" / "transactions.sqlite3"))
+
+FINGERPRINT_COLUMNS = ['Date', 'Description', 'Amount', 'Card_Last4']
+_DATE_FIELDS = ("statement_date", "due_date")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    fingerprint INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount REAL NOT NULL,
+    card TEXT NOT NULL,
+    card_last4 TEXT NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions(date);
+CREATE INDEX IF NOT EXISTS transactions_card ON transactions(card, date);
+CREATE INDEX IF NOT EXISTS transactions_category ON transactions(category, date);
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY,
+    card TEXT NOT NULL,
+    filename TEXT,
+    card_info TEXT NOT NULL,
+    UNIQUE (card, filename)
+);
+CREATE TABLE IF NOT EXISTS merged_duplicates (fingerprint INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS rejected_duplicates (
+    keep_fingerprint INTEGER NOT NULL,
+    drop_fingerprint INTEGER NOT NULL,
+    PRIMARY KEY (keep_fingerprint, drop_fingerprint)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('revision', 0);
+"""
+
+
+def transaction_fingerprints(df):
+    """Stable 64-bit fingerprint per row of ``FINGERPRINT_COLUMNS``, as an int64 array.
+
+    Hashes a canonical text form (ISO date, description, amount in cents,
+    last 4), so the value survives pandas/numpy upgrades and process restarts.
+    """
+    dates = df['Date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(str)
+    cents = np.round(df['Amount'].to_numpy(dtype=np.float64) * 100).astype(np.int64).astype(str)
+    keys = (pd.Series(dates, index=df.index) + "\x1f" + df['Description'].astype(str) + "\x1f"
+            + cents + "\x1f" + df['Card_Last4'].astype(str))
+    return np.fromiter((int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+                        for key in keys), dtype=np.int64, count=len(keys))
+
+
+def _encode_card_info(card_info):
+    encoded = {key: value for key, value in card_info.items() if key != 'raw_text'}
+    for key in _DATE_FIELDS:
+        if encoded.get(key) is not None:
+            encoded[key] = pd.Timestamp(encoded[key]).isoformat()
+    return json.dumps(encoded)
+
+
+def _decode_card_info(raw):
+    card_info = json.loads(raw)
+    for key in _DATE_FIELDS:
+        card_info[key] = pd.Timestamp(card_info[key]) if card_info.get(key) else None
+    return card_info
+
+
+def _card_label(card_info):
+    return f"{card_info['card_name']} (...{card_info['last_4_digits']})"
+
+
+class TransactionStore:
+    """One SQLite connection, reused for the life of the process (safe across threads)."""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._loaded = (None, None)  # (revision, frame) of the last load
+        self._fingerprints = None  # set of stored fingerprints, read on first use
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA cache_size=-65536")  # 64 MB, keeps index pages hot during big upserts
+            self._conn.executescript(_SCHEMA)
+
+    @property
+    def revision(self):
+        with self._lock:
+            return self._revision()
+
+    def _revision(self):
+        return self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    def known_fingerprints(self):
+        """The fingerprint index: a set of every stored transaction's fingerprint."""
+        with self._lock:
+            return self._known_fingerprints()
+
+    def _known_fingerprints(self):
+        if self._fingerprints is None:
+            self._fingerprints = {fingerprint for (fingerprint,) in self._conn.execute(
+                "SELECT fingerprint FROM transactions UNION ALL SELECT fingerprint FROM merged_duplicates")}
+        return self._fingerprints
+
+    def is_new(self, fingerprints):
+        """Boolean mask of the fingerprints not stored yet."""
+        known = self.known_fingerprints()
+        return np.fromiter((fingerprint not in known for fingerprint in fingerprints), dtype=bool,
+                           count=len(fingerprints))
+
+    def upsert(self, df, statements=()):
+        """Store new rows of a consolidated frame (needs a ``Fingerprint`` column) and statements.
+
+        Rows already stored are left alone (categories are recomputed on
+        load anyway). Returns the number of transactions that were new.
+        """
+        # Inserting in key order keeps the primary key B-tree appends local
+        df = df[self.is_new(df['Fingerprint'].tolist())].sort_values('Fingerprint')
+        rows = zip(df['Fingerprint'].tolist(),
+                   df['Date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(str).tolist(),
+                   df['Description'].tolist(), df['Amount'].tolist(), df['Card'].tolist(),
+                   df['Card_Last4'].astype(str).tolist(), df['Category'].tolist())
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            # Re-saving an unchanged statement is not a write, so the revision (and caches keyed on it) survive
+            self._conn.executemany(
+                "INSERT INTO statements (card, filename, card_info) VALUES (?, ?, ?) "
+                "ON CONFLICT (card, filename) DO UPDATE SET card_info = excluded.card_info "
+                "WHERE card_info != excluded.card_info",
+                [(_card_label(info), info.get('filename'), _encode_card_info(info)) for info in statements])
+            statements_changed = self._conn.total_changes - before
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT INTO transactions (fingerprint, date, description, amount, card, card_last4, category) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (fingerprint) DO NOTHING", rows)
+            added = self._conn.total_changes - before
+            if added or statements_changed:
+                self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+            self._known_fingerprints().update(df['Fingerprint'].tolist())
+        return added
+
+    def merge_duplicates(self, fingerprints):
+        """Delete transactions the user confirmed as duplicates of other stored ones.
+
+        Their fingerprints stay in the index, so uploading the same
+        statement again doesn't bring them back.
+        """
+        fingerprints = [(int(fingerprint),) for fingerprint in fingerprints]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO merged_duplicates VALUES (?)", fingerprints)
+            self._conn.executemany("DELETE FROM transactions WHERE fingerprint = ?", fingerprints)
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+
+    def reject_duplicates(self, pairs):
+        """Remember (keep, drop) fingerprint pairs the user reviewed and kept as separate transactions.
+
+        Only the review list reads these, so the revision is left alone.
+        """
+        pairs = [(int(keep), int(drop)) for keep, drop in pairs]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO rejected_duplicates VALUES (?, ?)", pairs)
+
+    def rejected_duplicates(self):
+        """Set of (keep, drop) fingerprint pairs that are not duplicates."""
+        with self._lock:
+            return set(self._conn.execute("SELECT keep_fingerprint, drop_fingerprint FROM rejected_duplicates"))
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def load(self):
+        """The full transaction history, sorted by date, in the dashboard's column layout.
+
+        The frame is only read from SQLite again after a write; otherwise a
+        copy of the previous one is returned.
+        """
+        with self._lock:
+            revision = self._revision()
+            if self._loaded[0] != revision:
+                rows = self._conn.execute("SELECT date, description, amount, card, card_last4, category, fingerprint "
+                                          "FROM transactions ORDER BY date").fetchall()
+                df = pd.DataFrame(rows, columns=['Date', 'Description', 'Amount', 'Card', 'Card_Last4', 'Category',
+                                                 'Fingerprint'])
+                df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d')
+                self._loaded = (revision, df)
+            return self._loaded[1].copy()
+
+    def statements(self):
+        """card_info of the latest stored statement of each card."""
+        with self._lock:
+            rows = self._conn.execute("SELECT card_info FROM statements ORDER BY id").fetchall()
+        latest = {}
+        for (raw,) in rows:
+            card_info = _decode_card_info(raw)
+            card = _card_label(card_info)
+            previous = latest.get(card)
+            if previous is None or (card_info.get('statement_date') or pd.Timestamp.min) >= (previous.get('statement_date') or pd.Timestamp.min):
+                latest[card] = card_info
+        return list(latest.values())
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions")
+            self._conn.execute("DELETE FROM statements")
+            self._conn.execute("DELETE FROM merged_duplicates")
+            self._conn.execute("DELETE FROM rejected_duplicates")
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+            self._fingerprints = set()
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The app's modules live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import TransactionStore, transaction_fingerprints  # noqa: E402
+
+CATEGORIES = ["Groceries", "Dining", "Transportation", "Other"]
+CARDS = {"Chase Freedom (...1234)": "1234", "Discover It (...5678)": "5678"}
+
+
+@pytest.fixture
+def transactions():
+    """500 synthetic transactions over the first half of 2025, on two cards."""
+    rows = 500
+    rng = np.random.default_rng(7)
+    cards = rng.choice(list(CARDS), rows)
+    df = pd.DataFrame({
+        "Date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 180, rows), unit="D"),
+        "Description": [f"MERCHANT {i}" for i in range(rows)],
+        "Amount": np.round(-rng.uniform(1, 250, rows), 2),
+        "Card": cards,
+        "Card_Last4": [CARDS[card] for card in cards],
+        "Category": rng.choice(CATEGORIES, rows),
+    })
+    df["Fingerprint"] = transaction_fingerprints(df)
+    return df
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TransactionStore(tmp_path / "transactions.sqlite3")
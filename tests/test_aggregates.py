@@ -0,0 +1,87 @@
+"""SpendingCube rollups against the per-chart groupbys they replaced."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import DAY_ORDER, PAYMENTS_CATEGORY, SpendingCube
+
+
+@pytest.fixture
+def frame(transactions):
+    # Mixed signs, with payments and refunds, as a statement frame has them
+    rng = np.random.default_rng(11)
+    df = transactions.copy()
+    df["Amount"] = np.round(rng.uniform(-250, 120, len(df)), 2)
+    payments = rng.random(len(df)) < 0.1
+    df.loc[payments, "Category"] = PAYMENTS_CATEGORY
+    df.loc[payments, "Amount"] = df.loc[payments, "Amount"].abs()
+    return df
+
+
+def expenses(df):
+    spent = df[(df["Amount"] < 0) & (df["Category"] != PAYMENTS_CATEGORY)].copy()
+    spent["Amount"] = spent["Amount"].abs()
+    return spent
+
+
+def assert_values_equal(actual, expected):
+    np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float), rtol=1e-9)
+
+
+def test_overview_totals(frame):
+    cube = SpendingCube(frame)
+    non_payment = frame[frame["Category"] != PAYMENTS_CATEGORY]
+    totals = cube.totals(payments=False)
+    assert totals["Count"] == len(non_payment)
+    assert_values_equal(totals["Received"], non_payment.loc[non_payment["Amount"] > 0, "Amount"].sum())
+    assert_values_equal(totals["Spent"], abs(non_payment.loc[non_payment["Amount"] < 0, "Amount"].sum()))
+    assert cube.totals()["Count"] - totals["Count"] == (frame["Category"] == PAYMENTS_CATEGORY).sum()
+    assert_values_equal(cube.totals(expenses=True)["Largest"], expenses(frame)["Amount"].max())
+
+
+def test_daily_spending(frame):
+    expected = expenses(frame).groupby("Date")["Amount"].sum().reset_index()
+    actual = SpendingCube(frame).daily_spending()
+    assert actual["Date"].tolist() == expected["Date"].tolist()
+    assert_values_equal(actual["Amount"], expected["Amount"])
+
+
+@pytest.mark.parametrize("dimensions", [("Category",), ("Card",), ("Date", "Category"), ("Date", "Card")])
+def test_spending_by(frame, dimensions):
+    expected = expenses(frame).groupby(list(dimensions))["Amount"].agg(["sum", "mean", "count"]).reset_index()
+    actual = SpendingCube(frame).spending_by(*dimensions)
+    for dimension in dimensions:
+        assert actual[dimension].tolist() == expected[dimension].tolist()
+    assert_values_equal(actual["Amount"], expected["sum"])
+    assert_values_equal(actual["Average"], expected["mean"])
+    assert actual["Count"].tolist() == expected["count"].tolist()
+
+
+def test_spending_by_weekday(frame):
+    spent = expenses(frame)
+    spent["DayOfWeek"] = pd.Categorical(spent["Date"].dt.day_name(), categories=DAY_ORDER, ordered=True)
+    expected = spent.groupby("DayOfWeek", observed=True)["Amount"].agg(["sum", "mean", "count"]).reset_index()
+    actual = SpendingCube(frame).spending_by_weekday()
+    assert actual["DayOfWeek"].astype(str).tolist() == expected["DayOfWeek"].astype(str).tolist()
+    for column in ("sum", "mean", "count"):
+        assert_values_equal(actual[column], expected[column])
+
+
+def test_monthly_income_and_expenses(frame):
+    monthly = SpendingCube(frame).rollup("Date")
+    monthly = monthly.groupby(monthly["Date"].dt.to_period("M"))[["Received", "Spent"]].sum()
+    month = frame["Date"].dt.to_period("M")
+    assert_values_equal(monthly["Received"], frame[frame["Amount"] > 0].groupby(month)["Amount"].sum())
+    assert_values_equal(monthly["Spent"], -frame[frame["Amount"] < 0].groupby(month)["Amount"].sum())
+
+
+def test_rollups_are_fresh_copies(frame):
+    cube = SpendingCube(frame)
+    cube.spending_by("Category")["Amount"] = 0
+    assert cube.spending_by("Category")["Amount"].gt(0).all()
+
+
+def test_frame_without_cards_or_rows():
+    empty = SpendingCube(pd.DataFrame({"Date": pd.to_datetime([]), "Category": [], "Amount": []}))
+    assert empty.totals()["Count"] == 0
+    assert empty.daily_spending().empty
@@ -0,0 +1,123 @@
+"""Rule compilation, hot reload and vectorized categorization."""
+import copy
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from categorizer import (DEFAULT_RULES_PATH, TermIndex, categorize, categorize_series, changed_terms, compile_rules,
+                         current_rules, load_rules, recategorize)
+
+DESCRIPTIONS = [
+    "STARBUCKS STORE 1234", "KROGER 442", "SHELL OIL 57444", "PAYPAL *WALMART COM", "PAYPAL ONLINE PAYMENT",
+    "AUTOPAY PAYMENT THANK YOU", "GEORGIA NATURAL GAS", "COSTCO GAS 0042", "NETFLIX.COM", "UBER *TRIP",
+    "THE HOME DEPOT 0931", "CVS PHARMACY 0211", "TRADER JOE S 552", "DELTA AIR LINES", "UNKNOWN MERCHANT 77",
+    "", "Mixed Case Kroger", "wm supercenter #12",
+]
+
+SPEC = {
+    "default": "Misc",
+    "rules": [
+        {"category": "Shopping", "keywords": ["amazon", "target"]},
+        {"category": "Coffee", "keywords": ["starbucks"], "priority": 1},
+        {"category": "Fuel", "patterns": [r"\bgas\b", r"shell\s+oil"],
+         "exceptions": [{"when_any": ["natural"], "category": "Utilities"},
+                        {"when_all": ["costco"], "skip": True}]},
+        {"category": "Warehouse", "keywords": ["costco"]},
+    ],
+}
+
+
+def test_vectorized_matches_scalar_categorize_with_the_shipped_rules():
+    rules = load_rules(DEFAULT_RULES_PATH)
+    expected = [categorize(description, rules) for description in DESCRIPTIONS]
+    assert categorize_series(pd.Series(DESCRIPTIONS, dtype=object), rules).tolist() == expected
+
+
+def test_priority_exceptions_and_skips():
+    rules = compile_rules(SPEC)
+    assert [rule.category for rule in rules.rules] == ["Coffee", "Shopping", "Fuel", "Warehouse"]
+    descriptions = ["STARBUCKS AT TARGET", "SHELL OIL 57444", "GEORGIA NATURAL GAS", "COSTCO GAS 0042", "NETFLIX"]
+    expected = ["Coffee", "Fuel", "Utilities", "Warehouse", "Misc"]
+    assert [categorize(description, rules) for description in descriptions] == expected
+    assert categorize_series(pd.Series(descriptions, dtype=object), rules).tolist() == expected
+
+
+@pytest.mark.parametrize("spec, message", [
+    ({"rules": [{"keywords": ["x"]}]}, "needs a 'category'"),
+    ({"rules": [{"category": "A"}]}, "needs 'keywords' or 'patterns'"),
+    ({"rules": [{"category": "A", "patterns": ["(unclosed"]}]}, "invalid pattern"),
+    ({"rules": [{"category": "A", "patterns": ["(?=lookahead)"]}]}, "invalid pattern"),
+    ({"rules": [{"category": "A", "keywords": ["x"], "exceptions": [{"when_any": ["y"]}]}]}, "'category' or"),
+    ({"rules": {}}, "'rules' list"),
+])
+def test_invalid_rules_are_rejected(spec, message):
+    with pytest.raises(ValueError, match=message):
+        compile_rules(spec)
+
+
+def test_version_follows_content_only():
+    assert compile_rules(SPEC).version == compile_rules(json.loads(json.dumps(SPEC))).version
+    edited = dict(SPEC, default="Other")
+    assert compile_rules(edited).version != compile_rules(SPEC).version
+
+
+def test_current_rules_hot_reloads_and_keeps_the_last_good_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(SPEC))
+    first = current_rules(path)
+    assert current_rules(path) is first
+
+    path.write_text(json.dumps(dict(SPEC, default="Everything Else")))
+    os.utime(path, ns=(first.stamp[0] + 10**9, first.stamp[0] + 10**9))
+    reloaded = current_rules(path)
+    assert reloaded.default == "Everything Else" and reloaded.error is None
+
+    path.write_text("{ not json")
+    os.utime(path, ns=(first.stamp[0] + 2 * 10**9, first.stamp[0] + 2 * 10**9))
+    broken = current_rules(path)
+    assert broken.version == reloaded.version
+    assert broken.error
+
+
+def edited(change):
+    spec = copy.deepcopy(SPEC)
+    change(spec)
+    return spec
+
+
+EDITS = {
+    "keyword added": lambda spec: spec["rules"][0]["keywords"].append("netflix"),
+    "keyword removed": lambda spec: spec["rules"][0]["keywords"].remove("target"),
+    "pattern changed": lambda spec: spec["rules"][2].update(patterns=[r"\bgas\b"]),
+    "rules reordered": lambda spec: spec["rules"].reverse(),
+    "priority changed": lambda spec: spec["rules"][3].update(priority=0),
+    "exception edited": lambda spec: spec["rules"][2]["exceptions"].pop(1),
+    "rule added": lambda spec: spec["rules"].append({"category": "Health", "keywords": ["cvs"]}),
+    "rule removed": lambda spec: spec["rules"].pop(0),
+    "default renamed": lambda spec: spec.update(default="Unsorted"),
+}
+
+
+@pytest.mark.parametrize("edit", EDITS)
+def test_incremental_recategorization_matches_a_full_pass(edit):
+    old_rules, new_rules = compile_rules(SPEC), compile_rules(edited(EDITS[edit]))
+    descriptions = DESCRIPTIONS + ["AMAZON MKTPL*AB12CD", "TARGET 0042", "STARBUCKS AT TARGET", "SHELL OIL AT TARGET",
+                                   "STARBUCKS COSTCO", "NATGAS GEORGIA NATURAL"]
+    categories = {description: categorize(description, old_rules) for description in descriptions}
+
+    updated, involved = recategorize(categories, old_rules, new_rules, index=TermIndex())
+
+    expected = {description: categorize(description, new_rules) for description in descriptions}
+    assert updated == expected
+    moved = [description for description in descriptions if expected[description] != categories[description]]
+    assert moved, "edit should move at least one description"
+    assert involved == {categories[d] for d in moved} | {expected[d] for d in moved}
+
+
+def test_unrelated_edit_touches_only_its_terms():
+    old_rules = compile_rules(SPEC)
+    new_rules = compile_rules(edited(EDITS["keyword added"]))
+    assert changed_terms(old_rules, new_rules) == {("keyword", "netflix")}
+    assert changed_terms(old_rules, old_rules) == set()
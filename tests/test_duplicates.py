@@ -0,0 +1,52 @@
+"""Fuzzy duplicate proposals."""
+import pandas as pd
+
+from duplicates import find_fuzzy_duplicates
+from store import TransactionStore
+
+
+def transactions(*rows):
+    df = pd.DataFrame(rows, columns=["Date", "Description", "Amount"])
+    df["Date"] = pd.to_datetime(df["Date"])
+    df["Card"] = "Chase Freedom (...1234)"
+    df["Card_Last4"] = "1234"
+    df["Fingerprint"] = range(1, len(df) + 1)
+    return df
+
+
+def proposals(df):
+    pairs = find_fuzzy_duplicates(df)
+    return {(keep, drop): merge for keep, drop, merge in
+            zip(pairs["Keep_Description"], pairs["Drop_Description"], pairs["Merge"])}
+
+
+def test_reworded_transaction_is_pre_ticked():
+    df = transactions(("2025-10-01", "AMAZON MKTPLACE PMTS", -20.0),
+                      ("2025-10-03", "AMAZON MKTPLACE PMTS WA", -20.0))
+    assert proposals(df) == {("AMAZON MKTPLACE PMTS", "AMAZON MKTPLACE PMTS WA"): True}
+
+
+def test_same_chain_different_store_is_listed_but_not_pre_ticked():
+    df = transactions(("2025-10-01", "STARBUCKS STORE 1234", -5.75),
+                      ("2025-10-02", "STARBUCKS STORE 5678", -5.75))
+    assert proposals(df) == {("STARBUCKS STORE 1234", "STARBUCKS STORE 5678"): False}
+
+
+def test_repeat_purchase_is_not_pre_ticked():
+    df = transactions(("2025-10-01", "NETFLIX.COM", -15.49), ("2025-10-03", "NETFLIX.COM", -15.49))
+    assert not any(proposals(df).values())
+
+
+def test_pairs_need_same_card_amount_and_window():
+    df = transactions(("2025-10-01", "UBER TRIP", -12.0), ("2025-10-02", "UBER TRIP HELP", -12.5),
+                      ("2025-10-20", "UBER TRIP HELP", -12.0))
+    assert proposals(df) == {}
+
+
+def test_rejected_pairs_persist(tmp_path):
+    path = tmp_path / "transactions.sqlite3"
+    store = TransactionStore(path)
+    revision = store.revision
+    store.reject_duplicates([(1, 2), (1, 2), (3, 4)])
+    assert store.revision == revision
+    assert TransactionStore(path).rejected_duplicates() == {(1, 2), (3, 4)}
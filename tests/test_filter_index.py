@@ -0,0 +1,54 @@
+"""Indexed sidebar filters against plain boolean masks."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from filter_index import FilterIndex
+
+SELECTIONS = [
+    dict(),
+    dict(start="2025-02-10", end="2025-04-20"),
+    dict(start="2025-03-01", end="2025-03-31", categories=["Dining", "Other"]),
+    dict(categories=["Groceries"], cards=["Discover It (...5678)"]),
+    dict(start="2025-01-15", end="2025-06-30", categories=["Transportation", "Dining"],
+         cards=["Chase Freedom (...1234)"]),
+    dict(start="2025-05-01", end="2025-04-01"),
+    dict(categories=[]),
+    dict(categories=["No Such Category"]),
+]
+
+
+def masked(df, start=None, end=None, categories=None, cards=None):
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df["Date"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df["Date"] <= pd.Timestamp(end)
+    if categories is not None:
+        mask &= df["Category"].isin(categories)
+    if cards is not None:
+        mask &= df["Card"].isin(cards)
+    return df[mask]
+
+
+@pytest.mark.parametrize("selection", SELECTIONS)
+def test_select_matches_boolean_masks(transactions, selection):
+    shuffled = transactions.sample(frac=1, random_state=3)
+    index = FilterIndex(shuffled)
+    expected = masked(shuffled.sort_values("Date", kind="stable"), **selection)
+    pd.testing.assert_frame_equal(index.select(**selection), expected)
+
+
+def test_missing_dates_never_match_a_range(transactions):
+    transactions.loc[transactions.index[:5], "Date"] = pd.NaT
+    index = FilterIndex(transactions)
+    selected = index.select(start="2025-01-01", end="2025-12-31")
+    assert len(selected) == len(transactions) - 5
+    assert selected["Date"].notna().all()
+
+
+def test_date_only_selection_is_a_contiguous_slice(transactions):
+    index = FilterIndex(transactions.sort_values("Date"))
+    rows = index.positions(start="2025-02-01", end="2025-02-28", categories=index.categories, cards=index.cards)
+    assert isinstance(rows, slice)
+    assert np.array_equal(index.frame.iloc[rows]["Date"].dt.month.unique(), [2])
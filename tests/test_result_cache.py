@@ -0,0 +1,68 @@
+"""ResultCache hits, LRU eviction and the memory budget."""
+import numpy as np
+import pandas as pd
+
+from result_cache import ResultCache, data_digest, estimated_size, filter_state
+
+
+def array(megabytes):
+    return np.zeros(megabytes * 2**20, dtype=np.uint8)
+
+
+def test_hit_returns_the_cached_value_without_computing():
+    cache = ResultCache()
+    calls = []
+    compute = lambda: calls.append(1) or pd.DataFrame({"x": [1, 2]})
+    first = cache.get("frame", ("v1", "filters"), compute)
+    assert cache.get("frame", ("v1", "filters"), compute) is first
+    assert cache.get("frame", ("v2", "filters"), compute) is not first
+    assert len(calls) == 2
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_least_recently_used_entries_are_evicted_past_the_budget():
+    cache = ResultCache(max_bytes=3 * 2**20 + 4096)
+    for key in "abc":
+        cache.get("array", key, lambda: array(1))
+    cache.get("array", "a", lambda: array(1))  # "a" is now the most recently used
+    cache.get("array", "d", lambda: array(1))
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= cache.max_bytes
+    recomputed = []
+    for key in "acd":
+        cache.get("array", key, lambda: recomputed.append(key) or array(1))
+    assert recomputed == []
+    cache.get("array", "b", lambda: recomputed.append("b") or array(1))
+    assert recomputed == ["b"]
+
+
+def test_values_larger_than_the_budget_are_returned_but_not_kept():
+    cache = ResultCache(max_bytes=2**20)
+    value = cache.get("array", "big", lambda: array(2))
+    assert len(value) == 2 * 2**20
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+
+def test_clear_resets_entries_but_keeps_counters():
+    cache = ResultCache()
+    cache.get("value", 1, lambda: 1)
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+    assert cache.stats()["misses"] == 1
+
+
+def test_size_estimates_cover_nested_results():
+    frame = pd.DataFrame({"x": np.arange(1000, dtype=np.int64)})
+    assert estimated_size(frame) >= 8000
+    assert estimated_size((frame, array(1))) >= 8000 + 2**20
+    assert estimated_size({"frame": frame}) >= 8000
+
+
+def test_keys_are_normalized():
+    assert filter_state("2025-01-01", "2025-01-31", ["b", "a"], ["y", "x"]) == \
+        filter_state(pd.Timestamp("2025-01-01"), pd.Timestamp("2025-01-31"), ("a", "b"), ("x", "y"))
+    assert data_digest(np.array([1, 2, 3])) == data_digest([1, 2, 3])
+    assert data_digest(np.array([1, 2, 3])) != data_digest(np.array([3, 2, 1]))
@@ -0,0 +1,161 @@
+"""Statement text to transactions, without going through pdfplumber."""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+import statement_parser
+from statement_parser import (SIGN_ALWAYS_EXPENSE, SIGN_AS_IS, SIGN_CREDIT, SIGN_EXPENSE, RawTransaction,
+                              build_transactions_frame, classify_line, iter_statement_rows, match_transaction_line,
+                              new_card_info)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from synthetic_statements import LAYOUTS, generate_statement  # noqa: E402
+
+
+def parse_pages(pages):
+    card_info = new_card_info()
+    rows = [row for page_rows in iter_statement_rows(pages, card_info) for row in page_rows]
+    return build_transactions_frame(rows), card_info
+
+
+def test_issuer_named_in_a_transaction_does_not_drop_rows():
+    # "DCU" in a merchant name must not restrict the rest of the page to DCU's layout
+    page = ("Statement Period 10/14/25 - 11/13/25\n"
+            "Account Ending 1234\n"
+            "Transactions\n"
+            "10/15 TRANSFER FROM DCU 25.00\n"
+            "10/16 STARBUCKS STORE 1234 5.75\n"
+            "10/17 KROGER #123 42.10\n")
+    df, _ = parse_pages([page])
+    assert df["Description"].tolist() == ["TRANSFER FROM DCU", "STARBUCKS STORE 1234", "KROGER #123"]
+    assert df["Date"].dt.strftime("%m/%d").tolist() == ["10/15", "10/16", "10/17"]
+
+
+@pytest.mark.parametrize("issuer", sorted(LAYOUTS))
+def test_every_issuer_layout_parses_all_rows(issuer):
+    statement = generate_statement(issuer, pages=3, lines_per_page=30, seed=1)
+    df, card_info = parse_pages(statement.page_texts())
+    assert len(df) == statement.expected_rows
+    assert card_info["card_name"] != "Unknown Card"
+
+
+@pytest.mark.parametrize("issuer", sorted(LAYOUTS))
+def test_issuer_dispatch_matches_trying_every_layout(monkeypatch, issuer):
+    pages = generate_statement(issuer, pages=2, lines_per_page=30, seed=2).page_texts()
+    dispatched, dispatched_info = parse_pages(pages)
+    monkeypatch.setattr(statement_parser, "ISSUER_LINE_FORMATS", {})
+    unrestricted, unrestricted_info = parse_pages(pages)
+    pd.testing.assert_frame_equal(dispatched, unrestricted)
+    assert dispatched_info == unrestricted_info
+
+
+@pytest.mark.parametrize("line, kind", [
+    ("10/15 STARBUCKS STORE 1234 5.75", "mm/dd"),
+    ("1/5 KROGER 442 $12.00", "mm/dd"),
+    ("OCT02 POS PURCHASE 12.00 1,000.00", "mmmdd"),
+    ("Nov 10 Nov 12 DELTA AIR LINES $300.00", "mon d mon d"),
+    ("10/15/25 NETFLIX.COM 15.49", "mm/dd/yy"),
+    ("10/15/2025 UBER *TRIP 2% $0.24 $12.00", "mm/dd/yyyy"),
+    ("Total Fees Charged This Period $0.00", None),
+    ("12/2025 statement", None),
+    ("", None),
+])
+def test_classify_line_by_leading_token(line, kind):
+    assert classify_line(line) == kind
+
+
+def test_lines_outside_the_allowed_layouts_are_not_matched():
+    line = "10/15/25 NETFLIX.COM 15.49"
+    assert match_transaction_line(line, ("mm/dd",)) == (None, None)
+    assert match_transaction_line(line)[0] == "amex"
+
+
+CHASE_HEADER = ["Chase Prime Visa", "Account Number: XXXX XXXX XXXX 1234", "Opening/Closing Date 10/14/25 - 11/13/25",
+                "Payment Due Date: 12/10/25", "New Balance $994.09", "Minimum Payment Due: $40.00",
+                "Credit Access Line $10,000"]
+CHASE_ROWS = ["October 2025", "PURCHASE", "10/15 STARBUCKS STORE 1234 5.75"]
+
+
+def test_header_fields_from_the_first_page():
+    _, card_info = parse_pages(["\n".join(CHASE_HEADER + CHASE_ROWS)])
+    assert card_info["last_4_digits"] == "1234"
+    assert card_info["statement_date"] == pd.Timestamp("2025-11-13")
+    assert card_info["due_date"] == pd.Timestamp("2025-12-10")
+    assert (card_info["new_balance"], card_info["minimum_payment"], card_info["credit_limit"]) == (994.09, 40.0, 10000.0)
+
+
+def test_header_split_over_the_first_pages_is_still_read():
+    first = [line for line in CHASE_HEADER if not line.startswith("Minimum Payment")]
+    _, card_info = parse_pages(["\n".join(first + CHASE_ROWS), "Minimum Payment Due: $40.00"])
+    assert card_info["minimum_payment"] == 40.0
+
+
+def test_header_lookalikes_past_the_header_pages_are_ignored():
+    # Past HEADER_PAGES only transactions are read, even while header fields are still missing
+    first = [line for line in CHASE_HEADER if not line.startswith("Credit Access Line")]
+    pages = ["\n".join(first + CHASE_ROWS)] + ["10/16 KROGER 442 12.00"] * (statement_parser.HEADER_PAGES - 1)
+    pages.append("New Balance $1.00\nCredit Access Line $99,999\n10/17 SHELL OIL 57444 40.00")
+    df, card_info = parse_pages(pages)
+    assert card_info["new_balance"] == 994.09
+    assert card_info["credit_limit"] == 0.0
+    assert len(df) == len(pages)
+
+
+def test_frame_build_parses_each_date_format_and_applies_signs():
+    rows = [
+        RawTransaction("10/15/2025", "%m/%d/%Y", "PURCHASE", "12.50", SIGN_EXPENSE),
+        RawTransaction("10/16/25", "%m/%d/%y", "REFUND", "-3.00", SIGN_AS_IS),
+        RawTransaction("Oct 17 2025", "%b %d %Y", "FEE", "-2.00", SIGN_ALWAYS_EXPENSE),
+        RawTransaction("10/18/2025", "%m/%d/%Y", "PAYMENT", "-100.00", SIGN_CREDIT),
+        RawTransaction("10/19/2025", "%m/%d/%Y", "ALREADY NEGATIVE", "-7.25", SIGN_EXPENSE),
+    ]
+    df = build_transactions_frame(rows)
+    assert df["Date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-10-15", "2025-10-16", "2025-10-17",
+                                                           "2025-10-18", "2025-10-19"]
+    assert df["Amount"].tolist() == [-12.5, -3.0, -2.0, 100.0, -7.25]
+
+
+def test_frame_build_drops_rows_whose_date_or_amount_does_not_parse():
+    rows = [
+        RawTransaction("02/29/2025", "%m/%d/%Y", "NOT A LEAP YEAR", "1.00", SIGN_AS_IS),
+        RawTransaction("02/28/2025", "%m/%d/%Y", "BAD AMOUNT", "1.0.0", SIGN_AS_IS),
+        RawTransaction("02/28/2025", "%m/%d/%Y", "KEPT", "1.00", SIGN_AS_IS),
+    ]
+    assert build_transactions_frame(rows)["Description"].tolist() == ["KEPT"]
+
+
+SYNCHRONY_HEADER = ["Lowe's Synchrony Bank lowes.com", "Account Number ending in 698 0", "November 2025",
+                    "Transaction Detail"]
+
+
+def test_synchrony_detail_lines_join_their_row_across_pages():
+    pages = ["\n".join(SYNCHRONY_HEADER + ["10/28 70556 STORE 0678 CUMMING GA $163.03"]),
+             "-, - COLLATED 23G, 18G BRADS\n10/29 70557 STORE 0678 CUMMING GA $12.00"]
+    df, _ = parse_pages(pages)
+    assert df["Description"].tolist() == ["CUMMING - COLLATED 23G, 18G BRADS", "CUMMING"]
+    assert df["Amount"].tolist() == [-163.03, -12.0]
+
+
+def test_synchrony_row_with_an_invalid_date_never_goes_pending():
+    # 02/29 doesn't exist in 2025: the row must not collect detail lines or hold back the page's rows
+    pages = ["\n".join(SYNCHRONY_HEADER + ["10/28 70555 STORE 0678 CUMMING GA $5.00",
+                                           "02/29 70556 STORE 0678 CUMMING GA $163.03"]),
+             "-, - COLLATED 23G BRADS\n10/29 70557 STORE 0678 CUMMING GA $12.00\n-, - WOOD GLUE"]
+    per_page = [[row.description for row in rows] for rows in iter_statement_rows(pages, new_card_info())]
+    assert per_page == [["CUMMING"], ["CUMMING - WOOD GLUE"]]
+
+
+def test_statement_without_usable_rows_keeps_every_page_for_debugging(monkeypatch):
+    # Page 1's row has a date that doesn't exist, so it is read but dropped when the frame is built
+    pages = ["Statement Period 10/14/25 - 11/13/25\nAccount Ending 1234\nTransactions\n02/30 KROGER #123 42.10",
+             "Interest Charge Calculation",
+             "Important Changes to Your Account Terms"]
+    monkeypatch.setattr(statement_parser, "iter_page_texts", lambda pdf_file, page_workers=1: iter(pages))
+    df, card_info = statement_parser.extract_transactions_from_pdf("statement.pdf")
+    assert df is None
+    assert [f"--- Page {n} ---" in card_info["raw_text"] for n in (1, 2, 3)] == [True, True, True]
+    raw_pages = []
+    assert list(statement_parser.iter_transactions("statement.pdf", raw_pages=raw_pages)) == []
+    assert len(raw_pages) == 3
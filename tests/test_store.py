@@ -0,0 +1,35 @@
+"""Transaction store upserts and the cross-session fingerprint index."""
+import pandas as pd
+
+from store import TransactionStore
+
+
+def test_upsert_is_idempotent(store, transactions):
+    statements = [{"card_name": "Chase Freedom", "last_4_digits": "1234", "filename": "jan.pdf"}]
+
+    assert store.upsert(transactions, statements) == len(transactions)
+    revision, loaded = store.revision, store.load()
+    assert store.upsert(transactions, statements) == 0
+    assert store.revision == revision
+    assert store.count() == len(transactions)
+    pd.testing.assert_frame_equal(store.load(), loaded)
+
+
+def test_known_fingerprints_survive_reopening(tmp_path, transactions):
+    path = tmp_path / "transactions.sqlite3"
+    TransactionStore(path).upsert(transactions.iloc[:300])
+
+    reopened = TransactionStore(path)
+    assert reopened.known_fingerprints() == set(transactions["Fingerprint"].iloc[:300])
+    assert reopened.is_new(transactions["Fingerprint"].tolist()).tolist() == [False] * 300 + [True] * 200
+    assert reopened.upsert(transactions) == 200
+
+
+def test_merged_duplicates_stay_out(store, transactions):
+    store.upsert(transactions)
+    merged = transactions["Fingerprint"].iloc[:10].tolist()
+    store.merge_duplicates(merged)
+
+    assert store.count() == len(transactions) - 10
+    assert store.upsert(transactions) == 0
+    assert not store.load()["Fingerprint"].isin(merged).any()